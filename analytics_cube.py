@@ -0,0 +1,211 @@
+"""
+Cubo de agregados para las páginas de análisis (financiero, logística, ventas): en vez de
+leer todos los pedidos con sus items, los envíos y recalcular seis meses en cada pedido,
+la app puede leer analytics_cube.json. Ninguna página lo lee todavía, así que la
+extracción solo lo genera con --cubo (o ANALYTICS_CUBE=1).
+
+Una celda por mes × cliente (client_old_id) × marca × tipo de producto × estado:
+    revenue, cost, profit, items, units   items de los pedidos (unit_price/unit_cost por
+                                          cantidad, la ganancia de la hoja)
+    orders                                pedidos distintos con items en la celda
+    shipment_revenue, shipment_cost,      envíos (price_total, cost_total) por mes de
+    shipments                             date_shipped, cliente y estado; sin marca ni tipo
+El mes es 'AAAA-MM' (None si no hay fecha); el estado es el del item (o el del pedido) y
+el del envío.
+
+Debajo del cubo hay una tabla de hechos por pedido (pedido × marca × tipo × estado) y
+por envío, guardada en FACTS_FILE. Con los *_delta.json de la extracción solo se
+rearman los hechos de las altas, cambios y bajas, y solo se reagrupan los meses que
+tocan (los de antes y los de ahora de cada registro); las demás celdas se copian del
+cubo anterior. Se rearma todo si no hay cubo o delta, si el delta es completo o si
+cambiaron productos (la marca y el tipo salen de products_seed.json).
+
+Con filtro de días los seeds son parciales: los pedidos que no están no se tocan.
+"""
+
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from seed_writer import write_json
+from stage_trace import traced
+
+CUBE_FILE = 'analytics_cube.json'
+FACTS_FILE = '.analytics_facts.json'
+
+DIMENSIONS = ['month', 'client_old_id', 'brand', 'type', 'status']
+ORDER_MEASURES = ['revenue', 'cost', 'profit', 'items', 'units']
+SHIPMENT_MEASURES = ['shipment_revenue', 'shipment_cost', 'shipments']
+MEASURES = [*ORDER_MEASURES, 'orders', *SHIPMENT_MEASURES]
+
+def _month(dates):
+    s = pd.Series(dates, dtype=object)
+    return s.where(s.notna(), None).map(lambda d: str(d)[:7] if d else None).to_numpy(dtype=object)
+
+# --- Hechos ---
+
+def order_facts(orders, products):
+    """Hechos de los pedidos: una fila por pedido × marca × tipo × estado."""
+    items = [(o['order_number'], o.get('date'), o.get('client_old_id'), o.get('status'), i)
+             for o in orders for i in (o.get('items') or ())]
+    number, date, client, order_status, item = zip(*items) if items else ((),) * 5
+    quantity = np.array([i.get('quantity') or 0 for i in item], dtype=float)
+    df = pd.DataFrame({
+        'order_number': np.array(number, dtype='int64'),
+        'month': _month(date),
+        'client_old_id': pd.array(client, dtype='Int64'),
+        'sku': np.array([i.get('sku') for i in item], dtype=object),
+        'status': np.array([i.get('status') or s for i, s in zip(item, order_status)], dtype=object),
+        'revenue': np.array([i.get('unit_price') or 0 for i in item], dtype=float) * quantity,
+        'cost': np.array([i.get('unit_cost') or 0 for i in item], dtype=float) * quantity,
+        'profit': np.array([i.get('profit') or 0 for i in item], dtype=float),
+        'items': 1,
+        'units': quantity,
+    })
+    # Marca y tipo: un join por SKU contra el catálogo
+    catalog = pd.DataFrame({'sku': [p.get('sku') for p in products], 'brand': [p.get('brand') for p in products],
+                            'type': [p.get('type') for p in products]}, dtype=object)
+    df = df.merge(catalog.drop_duplicates('sku', keep='last'), on='sku', how='left')
+    return (df.groupby(['order_number', *DIMENSIONS], dropna=False, sort=False)[ORDER_MEASURES]
+              .sum().reset_index())
+
+def shipment_facts(shipments):
+    """Hechos de los envíos: una fila por envío."""
+    return pd.DataFrame({
+        'shipment_number': pd.array([s.get('shipment_number') for s in shipments], dtype='Int64'),
+        'month': _month([s.get('date_shipped') for s in shipments]),
+        'client_old_id': pd.array([s.get('old_client_id') for s in shipments], dtype='Int64'),
+        'status': np.array([s.get('status') for s in shipments], dtype=object),
+        'shipment_revenue': np.array([s.get('price_total') or 0 for s in shipments], dtype=float),
+        'shipment_cost': np.array([s.get('cost_total') or 0 for s in shipments], dtype=float),
+        'shipments': 1,
+    })
+
+def _frame(columns, ints=()):
+    df = pd.DataFrame(columns)
+    for col in ints:
+        df[col] = pd.array(df[col], dtype='Int64')
+    return df
+
+def _columns(df):
+    return {col: [None if pd.isna(v) else v for v in df[col].tolist()] for col in df.columns}
+
+def load_facts(output_dir):
+    try:
+        with open(os.path.join(output_dir, FACTS_FILE), encoding='utf-8') as f:
+            facts = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {'orders': _frame(facts['orders'], ['order_number', 'client_old_id']),
+            'shipments': _frame(facts['shipments'], ['shipment_number', 'client_old_id'])}
+
+def _replace(previous, new, key, changed, deleted, partial):
+    """
+    Hechos actualizados y los meses que cambiaron. changed=None: `new` trae todos los
+    registros (o, si partial, todos los de la ventana) en lugar de un delta.
+    """
+    if previous is None:
+        return new, None
+    if changed is None:
+        drop = previous[key].isin(new[key].dropna()) if partial else pd.Series(True, index=previous.index)
+    else:
+        drop = previous[key].isin(list(changed) + list(deleted))
+    drop = drop.to_numpy(dtype=bool)
+    months = set(previous['month'][drop]) | set(new['month'])
+    kept = previous[~drop]
+    return (pd.concat([kept, new], ignore_index=True) if len(kept) else new.reset_index(drop=True)), months
+
+# --- Cubo ---
+
+def _sorted(cells):
+    return cells.sort_values(DIMENSIONS, na_position='first', kind='stable').reset_index(drop=True)
+
+def _in_months(df, months):
+    mask = df['month'].isin([m for m in months if m is not None])
+    if None in months:
+        mask |= df['month'].isna()
+    return mask.to_numpy(dtype=bool)
+
+def build_cube(orders, shipments):
+    """Celdas del cubo a partir de los hechos de pedidos y envíos."""
+    # Mismo orden de suma venga de una corrida completa o incremental (los centavos redondeados no bailan)
+    orders = orders.sort_values('order_number', kind='stable')
+    shipments = shipments.sort_values('shipment_number', kind='stable')
+    grouped = orders.groupby(DIMENSIONS, dropna=False)
+    sales = grouped[ORDER_MEASURES].sum()
+    sales['orders'] = grouped['order_number'].nunique()
+    logistics = (shipments.assign(brand=None, type=None)
+                 .groupby(DIMENSIONS, dropna=False)[SHIPMENT_MEASURES].sum())
+    cube = pd.concat([sales, logistics]).groupby(level=DIMENSIONS, dropna=False).sum(min_count=0)
+    cube = cube.reindex(columns=MEASURES, fill_value=0).fillna(0).reset_index()
+    for col in ['items', 'units', 'orders', 'shipments']:
+        cube[col] = cube[col].astype('int64')
+    for col in ['revenue', 'cost', 'profit', 'shipment_revenue', 'shipment_cost']:
+        cube[col] = cube[col].astype(float).round(2)
+    return _sorted(cube)
+
+def load_cube(output_dir):
+    try:
+        with open(os.path.join(output_dir, CUBE_FILE), encoding='utf-8') as f:
+            return _frame(json.load(f)['cells'], ['client_old_id'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _delta_keys(deltas, name):
+    delta = (deltas or {}).get(name)
+    if delta is None or delta['full']:
+        return None, ()
+    return [r[delta['key']] for r in delta['inserts'] + delta['updates']], delta['deletes']
+
+@traced('cube', count_in=False)
+def update_cube(output_dir, orders, shipments, products, deltas=None, partial=False):
+    """
+    Actualiza FACTS_FILE y CUBE_FILE. `orders` y `shipments` son los registros que hay que
+    (re)procesar: los del seed completo, o solo altas y cambios si vienen `deltas`
+    ({nombre del seed: delta} de seed_delta.py). Devuelve (meses reagrupados o None si se
+    rearmó todo, celdas del cubo).
+    """
+    previous = load_facts(output_dir)
+    cube = load_cube(output_dir)
+    products_delta = (deltas or {}).get('products_seed.json')
+    products_changed = products_delta is None or any(products_delta[k] for k in ('inserts', 'updates', 'deletes'))
+    if previous is None or cube is None or deltas is None or products_changed:
+        # Hechos nuevos de todo lo que se recibió (con ventana: se conservan los de afuera)
+        order_changed = ship_changed = None
+        order_deleted = ship_deleted = ()
+        rebuild = True
+    else:
+        order_changed, order_deleted = _delta_keys(deltas, 'orders_seed.json')
+        ship_changed, ship_deleted = _delta_keys(deltas, 'shipments_seed.json')
+        rebuild = order_changed is None or ship_changed is None
+
+    if order_changed is not None:
+        wanted = set(order_changed)
+        orders = [o for o in orders if o['order_number'] in wanted]
+    if ship_changed is not None:
+        wanted = set(ship_changed)
+        shipments = [s for s in shipments if s['shipment_number'] in wanted]
+
+    new_orders = order_facts(orders, products)
+    new_shipments = shipment_facts(shipments)
+    previous = previous or {}
+    facts_orders, order_months = _replace(previous.get('orders'), new_orders, 'order_number',
+                                          order_changed, order_deleted, partial)
+    facts_shipments, ship_months = _replace(previous.get('shipments'), new_shipments, 'shipment_number',
+                                            ship_changed, ship_deleted, partial)
+
+    months = None if rebuild or order_months is None or ship_months is None else order_months | ship_months
+    if months is None:
+        cells = build_cube(facts_orders, facts_shipments)
+    else:
+        fresh = build_cube(facts_orders[_in_months(facts_orders, months)],
+                           facts_shipments[_in_months(facts_shipments, months)])
+        cells = _sorted(pd.concat([cube[~_in_months(cube, months)], fresh], ignore_index=True))
+
+    write_json(os.path.join(output_dir, FACTS_FILE),
+               {'orders': _columns(facts_orders), 'shipments': _columns(facts_shipments)}, 'compact')
+    write_json(os.path.join(output_dir, CUBE_FILE),
+               {'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'dimensions': DIMENSIONS, 'measures': MEASURES, 'cells': _columns(cells)}, 'compact')
+    return (sorted(months, key=str) if months is not None else None), cells
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de lectura BD → DataFrame para la exportación a Excel (db_read.py):
+fetchall() (lo que hacía export_to_excel.py) vs. cursor del servidor vs. COPY.
+
+Pensado para correr contra un PostgreSQL local con el esquema de Prisma
+(`npx prisma db push` + seed). Por cada entidad de EXPORT_QUERIES y cada método
+reporta filas, tiempo y pico de memoria Python (tracemalloc), y verifica que
+cursor y COPY den el mismo DataFrame.
+
+Uso:
+    EXPORT_DATABASE_URL=postgresql://localhost/importaciones \\
+        python3 benchmarks/bench_db_read.py [--entidad orders] [--itersize N] [--json]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+import psycopg2
+from db_read import EXPORT_QUERIES, ITERSIZE, read_entity
+
+def _read_fetchall(conn, entity):
+    with conn.cursor() as cur:
+        cur.execute(EXPORT_QUERIES[entity]['sql'])
+        rows = cur.fetchall()
+        return pd.DataFrame(rows, columns=[d[0] for d in cur.description])
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, round(elapsed, 3), round(peak / (1024 * 1024), 1)
+
+def _pop_option(args, name, default):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+def main():
+    args = sys.argv[1:]
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    entity = _pop_option(args, '--entidad', None)
+    itersize = int(_pop_option(args, '--itersize', ITERSIZE))
+    url = os.getenv('EXPORT_DATABASE_URL') or os.getenv('DATABASE_URL')
+    if not url:
+        sys.exit("Definí EXPORT_DATABASE_URL (p.ej. postgresql://localhost/importaciones)")
+
+    conn = psycopg2.connect(url)
+    results = []
+    try:
+        for name in ([entity] if entity else list(EXPORT_QUERIES)):
+            _, t_all, mem_all = _measure(lambda: _read_fetchall(conn, name))
+            df_cur, t_cur, mem_cur = _measure(lambda: read_entity(conn, name, 'cursor', itersize))
+            df_copy, t_copy, mem_copy = _measure(lambda: read_entity(conn, name, 'copy'))
+            conn.rollback()
+            try:
+                pd.testing.assert_frame_equal(df_cur, df_copy, check_dtype=False)
+                same = True
+            except AssertionError:
+                same = False
+            results.append({'entity': name, 'rows': len(df_copy), 'same': same,
+                            'fetchall': {'s': t_all, 'mb': mem_all},
+                            'cursor': {'s': t_cur, 'mb': mem_cur},
+                            'copy': {'s': t_copy, 'mb': mem_copy}})
+    finally:
+        conn.close()
+
+    if as_json:
+        print(json.dumps({'itersize': itersize, 'results': results}))
+        return
+
+    print(f"⚡ Lectura BD → DataFrame (itersize {itersize}; segundos / MB pico Python)")
+    print(f"{'entidad':<13}{'filas':>9}{'fetchall':>16}{'cursor':>16}{'copy':>16}  iguales")
+    for r in results:
+        cells = ''.join(f"{r[m]['s']:>9} /{r[m]['mb']:>5}" for m in ('fetchall', 'cursor', 'copy'))
+        print(f"{r['entity']:<13}{r['rows']:>9}{cells}  {'sí' if r['same'] else 'NO'}")
+
+if __name__ == "__main__":
+    main()
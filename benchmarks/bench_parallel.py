@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extract_consolidated.py: extracción serial vs. --paralelo (una hoja por proceso).
+
+Cada corrida es un proceso aparte con --forzar y la caché Parquet desactivada (SHEET_CACHE=0),
+así se mide el parseo completo del .xlsx. Los seeds se escriben en un directorio temporal,
+no en webapp/prisma. Reporta la mediana del tiempo de pared de N repeticiones y la cantidad
+de CPUs: la ganancia del modo paralelo depende de tener varios núcleos.
+
+Uso:
+    python3 benchmarks/bench_parallel.py [ruta.xlsx] [--repeticiones N] [--dias D] [--json]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+DEFAULT_XLSX = os.path.join(ROOT, 'VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx')
+
+def _child(mode, path, days):
+    import extract_consolidated as ec
+
+    out_dir = tempfile.mkdtemp(prefix='bench_parallel_')
+    ec.excel_path = path
+    ec.output_dir = out_dir
+    sys.argv = ['extract_consolidated.py', str(days), '--forzar'] + (['--paralelo'] if mode == 'parallel' else [])
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    start = time.perf_counter()
+    try:
+        ec.extract_all()
+    finally:
+        sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'mode': mode, 'seconds': round(elapsed, 3)}))
+
+def _pop_option(args, name, default):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == '--child':
+        _child(args[1], args[2], int(args[3]))
+        return
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    repeats = int(_pop_option(args, '--repeticiones', 3))
+    days = int(_pop_option(args, '--dias', 0))
+    path = args[0] if args else DEFAULT_XLSX
+
+    env = dict(os.environ, SHEET_CACHE='0')
+    results = []
+    for mode in ['serial', 'parallel']:
+        times = []
+        for _ in range(repeats):
+            out = subprocess.run([sys.executable, __file__, '--child', mode, path, str(days)],
+                                 capture_output=True, text=True, check=True, env=env)
+            times.append(json.loads(out.stdout.strip().splitlines()[-1])['seconds'])
+        results.append({'mode': mode, 'median_s': round(statistics.median(times), 3),
+                        'min_s': min(times), 'max_s': max(times), 'runs': times})
+
+    speedup = results[0]['median_s'] / results[1]['median_s'] if results[1]['median_s'] else None
+    if as_json:
+        print(json.dumps({'cpus': os.cpu_count(), 'days': days, 'results': results,
+                          'speedup': round(speedup, 2) if speedup else None}))
+        return
+
+    print(f"⚡ Extracción serial vs. paralela ({os.path.basename(path)}, {os.cpu_count()} CPUs, {repeats} corridas)")
+    print(f"{'modo':<10}{'mediana s':>11}{'mín s':>9}{'máx s':>9}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['median_s']:>11}{r['min_s']:>9}{r['max_s']:>9}")
+    if speedup:
+        print(f"Aceleración: x{speedup:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción Excel → seeds por etapa, sobre libros sintéticos de varios
+tamaños (ver synthetic_workbook.py; se generan una vez y quedan en .cache/bench/).
+
+Por cada tamaño (filas de DETA_VENTAS) corre un proceso aparte que mide cuatro etapas
+de extract_consolidated.py, con la caché Parquet desactivada:
+    parse      WorkbookReader.read_sheet de las cinco hojas (xlsx → DataFrames)
+    clean      *_columns / order_headers / order_items_frame (limpieza por columna)
+    join       assemble_orders (items agrupados + merge con cabeceras) y los registros
+    serialize  write_seed de los cuatro seeds en un directorio temporal
+De cada etapa: tiempo de pared, tiempo de CPU, RSS al terminar y pico de RSS (ru_maxrss)
+del proceso hasta ese punto.
+
+Con --scripts mide además los scripts sueltos (extract_clients.py, extract_products.py,
+extract_shipments.py, extract_orders.py), cada uno en su proceso, apuntando sus
+excel_path/output_path al libro sintético. extract_suppliers.py no se mide: el libro
+sintético no tiene hoja PROVEEDORES.
+
+El resultado va en JSON (--salida, por defecto .cache/bench/pipeline_<fecha>.json) para
+comparar corridas: con --base anterior.json marca las etapas que empeoraron más que
+--tolerancia (fracción, por defecto 0.2) y sale con código 1 si hay alguna.
+
+Uso:
+    python3 benchmarks/bench_pipeline.py [--filas 10000,100000,1000000] [--scripts]
+        [--salida resultado.json] [--base anterior.json] [--tolerancia 0.2] [--json]
+"""
+
+import datetime as dt
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT, '.cache', 'bench')
+DEFAULT_SIZES = '10000,100000'
+STAGES = ('parse', 'clean', 'join', 'serialize')
+SHEETS = ['CLIENTES', 'ARTICULOS TECNO', 'CABE_ENVIOS', 'CABE_VENTAS', 'DETA_VENTAS']
+# script -> función de entrada
+SCRIPTS = {
+    'extract_clients': 'extract_clients',
+    'extract_products': 'extract_products',
+    'extract_shipments': 'extract_shipments',
+    'extract_orders': 'extract_orders',
+}
+
+def _peak_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        # Sin /proc (macOS): el pico es la mejor aproximación disponible
+        return _peak_mb()
+
+class _Stages:
+    """Mide etapas consecutivas: tiempo de pared y de CPU, RSS y pico de RSS."""
+
+    def __init__(self):
+        self.results = {}
+
+    def run(self, name, fn):
+        wall, cpu = time.perf_counter(), time.process_time()
+        value = fn()
+        self.results[name] = {
+            's': round(time.perf_counter() - wall, 3),
+            'cpu_s': round(time.process_time() - cpu, 3),
+            'rss_mb': round(_rss_mb(), 1),
+            'peak_mb': round(_peak_mb(), 1),
+        }
+        return value
+
+def _child_pipeline(path):
+    import extraction
+    from extraction.cleaners import to_records
+    from seed_writer import write_seed
+    from workbook_reader import WorkbookReader
+
+    base = round(_peak_mb(), 1)
+    stages = _Stages()
+    now = dt.datetime.now()
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        wb = WorkbookReader(path, cache=None)
+        frames = stages.run('parse', lambda: {name: wb.read_sheet(name) for name in SHEETS})
+
+        def clean():
+            headers, _ = extraction.order_headers(frames['CABE_VENTAS'], 0, now)
+            return {
+                'clients': extraction.clients_columns(frames['CLIENTES']),
+                'products': extraction.products_columns(frames['ARTICULOS TECNO']),
+                'shipments': extraction.shipments_columns(frames['CABE_ENVIOS'], 0, now),
+                'headers': headers,
+                'items': extraction.order_items_frame(frames['DETA_VENTAS']),
+            }
+        columns = stages.run('clean', clean)
+        seeds = stages.run('join', lambda: {
+            'clients_seed.json': to_records(columns['clients']),
+            'products_seed.json': to_records(columns['products']),
+            'shipments_seed.json': to_records(columns['shipments']),
+            'orders_seed.json': extraction.assemble_orders(columns['headers'], columns['items']),
+        })
+        out_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+        stages.run('serialize', lambda: [write_seed(os.path.join(out_dir, name), data) for name, data in seeds.items()])
+        wb.close()
+    finally:
+        sys.stdout = stdout
+    rows = {name: len(df) for name, df in frames.items()}
+    records = {name: len(data) for name, data in seeds.items()}
+    print(json.dumps({'base_mb': base, 'rows': rows, 'records': records, 'stages': stages.results}))
+
+def _child_script(script, path):
+    import importlib
+
+    module = importlib.import_module(script)
+    module.excel_path = path
+    module.output_path = os.path.join(tempfile.mkdtemp(prefix='bench_pipeline_'), f'{script}.json')
+    base = round(_peak_mb(), 1)
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        getattr(module, SCRIPTS[script])()
+    finally:
+        sys.stdout = stdout
+    ok = os.path.exists(module.output_path)
+    print(json.dumps({'s': round(time.perf_counter() - wall, 3), 'cpu_s': round(time.process_time() - cpu, 3),
+                      'base_mb': base, 'peak_mb': round(_peak_mb(), 1), 'ok': ok}))
+
+def _run_child(*args):
+    env = dict(os.environ, SHEET_CACHE='0')
+    out = subprocess.run([sys.executable, __file__, '--child', *args],
+                         capture_output=True, text=True, check=True, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _pop_option(args, name, default):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import numpy as np
+    import pandas as pd
+    return {
+        'date': dt.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def compare(current, base, tolerance):
+    """Etapas (y scripts) que tardan más que (1 + tolerance) veces lo de la corrida base."""
+    previous = {r['detail_rows']: r for r in base.get('results', [])}
+    regressions = []
+    for r in current['results']:
+        old = previous.get(r['detail_rows'])
+        if old is None:
+            continue
+        timings = [(f'etapa {s}', r['stages'][s]['s'], old['stages'].get(s, {}).get('s')) for s in r['stages']]
+        timings += [(f'script {s}', v['s'], old.get('scripts', {}).get(s, {}).get('s'))
+                    for s, v in r.get('scripts', {}).items()]
+        for name, now, before in timings:
+            if before and now > before * (1 + tolerance):
+                regressions.append({'detail_rows': r['detail_rows'], 'what': name,
+                                    'base_s': before, 's': now, 'ratio': round(now / before, 2)})
+    return regressions
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == '--child':
+        if args[1] == 'pipeline':
+            _child_pipeline(args[2])
+        else:
+            _child_script(args[2], args[3])
+        return
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    with_scripts = '--scripts' in args
+    if with_scripts:
+        args.remove('--scripts')
+    sizes = [int(n) for n in _pop_option(args, '--filas', DEFAULT_SIZES).split(',')]
+    base_path = _pop_option(args, '--base', None)
+    tolerance = float(_pop_option(args, '--tolerancia', 0.2))
+    output = _pop_option(args, '--salida', None) or os.path.join(
+        CACHE_DIR, f"pipeline_{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+
+    from synthetic_workbook import ensure_workbook
+
+    results = []
+    for n in sizes:
+        start = time.perf_counter()
+        path = ensure_workbook(CACHE_DIR, n)
+        generated_s = round(time.perf_counter() - start, 1)
+        if not as_json:
+            print(f"📊 {n} filas de detalle ({os.path.getsize(path) / 1048576:.1f} MB"
+                  f"{f', generado en {generated_s} s' if generated_s >= 0.1 else ''})...", flush=True)
+        result = dict(detail_rows=n, xlsx_mb=round(os.path.getsize(path) / 1048576, 1), **_run_child('pipeline', path))
+        if with_scripts:
+            result['scripts'] = {script: _run_child('script', script, path) for script in SCRIPTS}
+        results.append(result)
+
+    report = {'meta': _metadata(), 'results': results}
+    if base_path:
+        with open(base_path, encoding='utf-8') as f:
+            report['base'] = base_path
+            report['regressions'] = compare(report, json.load(f), tolerance)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if as_json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print(f"\n⚡ Extracción por etapa (segundos pared / CPU, MB RSS / pico)")
+        print(f"{'filas':>9}  " + ''.join(f'{s:>24}' for s in STAGES) + f"{'total':>9}")
+        for r in results:
+            cells = ''.join(f"{st['s']:>6}/{st['cpu_s']:<6} {st['rss_mb']:>5}/{st['peak_mb']:<5}"
+                            for st in (r['stages'][s] for s in STAGES))
+            total = round(sum(st['s'] for st in r['stages'].values()), 2)
+            print(f"{r['detail_rows']:>9}  {cells}{total:>9}")
+        if with_scripts:
+            print(f"\n📜 Scripts sueltos (segundos pared, MB pico)")
+            for r in results:
+                print(f"{r['detail_rows']:>9}  " + '  '.join(
+                    f"{s}: {v['s']} s / {v['peak_mb']} MB{'' if v['ok'] else ' (sin salida)'}"
+                    for s, v in r['scripts'].items()))
+        for reg in report.get('regressions', []):
+            print(f"⚠️ {reg['detail_rows']} filas, {reg['what']}: {reg['base_s']} s → {reg['s']} s (x{reg['ratio']})")
+        print(f"\n💾 {output}")
+    if report.get('regressions'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
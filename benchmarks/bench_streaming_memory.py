@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria: DETA_VENTAS con xl.parse (hoja completa) vs. lectura por lotes.
+
+Cada modo corre en un proceso aparte y reporta su pico de RSS (ru_maxrss), descontando
+lo que ya ocupa el intérprete con pandas/openpyxl importados.
+
+Uso:
+    python3 benchmarks/bench_streaming_memory.py [ruta.xlsx] [--batch N]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+DEFAULT_XLSX = os.path.join(ROOT, 'VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx')
+SHEET = 'DETA_VENTAS'
+
+def _peak_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _child(mode, path, batch):
+    import pandas as pd
+    import openpyxl  # noqa: F401  (base comparable entre modos)
+    from extraction import build_order_items
+    from workbook_reader import WorkbookReader
+
+    base = _peak_mb()
+    start = time.perf_counter()
+    rows = 0
+    if mode == 'xl_parse':
+        xl = pd.ExcelFile(path)
+        raw = xl.parse(SHEET, header=None, nrows=15)
+        h = next((i for i, r in raw.iterrows()
+                  if {'SKU', 'INV-REM'} & {str(x).upper().strip() for x in r.values}), 0)
+        df = xl.parse(SHEET, header=h)
+        df.columns = [str(c).upper().strip() for c in df.columns]
+        build_order_items(df)
+        rows = len(df)
+    else:
+        wb = WorkbookReader(path)
+        for df in wb.iter_batches(SHEET, batch_size=batch):
+            # Se descartan los items: solo medimos el costo de leer y limpiar la hoja
+            build_order_items(df)
+            rows += len(df)
+        wb.close()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'mode': mode, 'rows': rows, 'seconds': round(elapsed, 3),
+                      'peak_rss_mb': round(_peak_mb(), 1), 'delta_rss_mb': round(_peak_mb() - base, 1)}))
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == '--child':
+        _child(args[1], args[2], int(args[3]))
+        return
+    batch = 5000
+    if '--batch' in args:
+        i = args.index('--batch')
+        batch = int(args[i + 1])
+        del args[i:i + 2]
+    path = args[0] if args else DEFAULT_XLSX
+
+    print(f"📏 Pico de memoria leyendo {SHEET} de {os.path.basename(path)} (lotes de {batch} filas)")
+    results = []
+    for mode in ['xl_parse', 'stream']:
+        out = subprocess.run([sys.executable, __file__, '--child', mode, path, str(batch)],
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'modo':<10}{'filas':>10}{'seg':>9}{'pico RSS MB':>14}{'Δ RSS MB':>11}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['rows']:>10}{r['seconds']:>9}{r['peak_rss_mb']:>14}{r['delta_rss_mb']:>11}")
+
+if __name__ == "__main__":
+    main()
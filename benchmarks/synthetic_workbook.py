@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Generador de libros .xlsx sintéticos con la estructura de la planilla real, para medir
+la extracción con volúmenes que la planilla todavía no tiene (10k a 1M filas de detalle).
+
+Lo que se reproduce de la planilla:
+    - hojas CLIENTES, ARTICULOS TECNO, CABE_ENVIOS, CABE_VENTAS y DETA_VENTAS con las
+      mismas columnas (incluidos los nombres repetidos, 'PESO'/'TIPO' en CABE_ENVIOS y
+      'FECHA' en DETA_VENTAS);
+    - en CABE_ENVIOS, CABE_VENTAS y DETA_VENTAS tres filas de notas/fórmulas antes del
+      encabezado (fila 4), que el lector tiene que detectar;
+    - montos mezclados: números, textos "$1,234", celdas vacías y errores '#DIV/0!';
+    - fechas como número de serie con formato de fecha, textos en sharedStrings;
+    - estados con las variantes que normaliza status_rules.py y SKUs repetidos.
+
+Proporciones para N filas de DETA_VENTAS: N/3 pedidos, N/20 envíos y
+max(300, N/100) clientes y max(1000, N/100) artículos.
+
+El XML se escribe directo al zip (sin openpyxl) para generar 1M de filas en segundos.
+Mismo N y misma semilla dan el mismo libro (las fechas se cuentan hacia atrás desde hoy,
+para que el filtro de días de la extracción tenga datos).
+
+Uso:
+    python3 benchmarks/synthetic_workbook.py salida.xlsx [--filas N] [--semilla S]
+"""
+
+import datetime as dt
+import os
+import sys
+import time
+import zipfile
+from xml.sax.saxutils import escape
+import numpy as np
+
+HEADERS = {
+    'CLIENTES': ['COD_CLI', 'NOMBRE Y APELLIDO', 'TIPO CLI', 'TIPO_PROD', 'TELEFONO', 'MAIL', 'EMPRESA',
+                 'CP', 'DIRECCION', 'LOCALIDAD', 'PAIS', 'PCIA-STATE'],
+    'ARTICULOS TECNO': ['SKU', 'NOMBRE ARTICULO', 'COLOR/GRADE', 'TIPO', 'MODELO', 'MARCA', 'PESO KG',
+                        'ESTADO', 'ULT CPRA', 'ACTIVO', 'WEBPAGE', 'LP1', 'LP2', 'LP3'],
+    'CABE_ENVIOS': ['NRO ENVIO', 'CLIENTE', 'COD CLI', 'FORWARDER', 'FECHA SAL', 'FECHA LLEG', 'PESO', 'TIPO',
+                    'CANT ART', 'VALOR KG', 'PRECIO X ART', 'COSTO TOT', 'TIPO CARGA', 'PESO', 'VALOR UN',
+                    'ENVIO COB', 'VENTA X KG', 'GANANCIA', 'INVOICE', 'TIPO', 'PAGO?', 'OBSERVACION',
+                    'SEMANA', 'LLEGO?', 'COMI BSAS'],
+    'CABE_VENTAS': ['NRO_PEDIDO', 'CLIENTE', 'NRO CLI', 'FECHA', 'MES', 'TIPO_MER', 'CANT ITEM', 'TOTAL USD',
+                    'GAN USD', '%', 'PAGO', 'SALDO', 'METODO', 'OBSERVACIONES'],
+    'DETA_VENTAS': ['FECHA', 'INV-REM', 'TIPO_VTA', 'COD CLI', 'NOMBRE', 'SKU', 'CANT', 'DETALLE', 'COLOR',
+                    'ENVIO Nro', 'VTA UNI', 'TOTAL', 'ESTADO', 'INV TOT', 'COSTO', 'ENVIO', 'GANANCIA', '%',
+                    'SUPPLIER', 'INVOICE', 'COSTO X ART', 'PESO UN', 'PESO X ART', 'OBSERVA', 'FECHA'],
+}
+# Filas previas al encabezado, como en la planilla (notas, rangos, fórmulas)
+PREAMBLE = {
+    'CABE_ENVIOS': [{7: 'ARRAYFORMULA(SI(ESBLANCO($B$5:B),"",BUSCARX($B$5:B,CLIENTES!B:B,CLIENTES!A:A,"")))'}, {}, {}],
+    'CABE_VENTAS': [{0: '             '}, {}, {}],
+    'DETA_VENTAS': [{}, {10: '1Qt6q5rpPBwn2Bu3Z5Tz7ztS1EI2dKXk00td2V-T2mM8', 24: '12/1899'},
+                    {10: 'LISTA DE PRECIOS!A4:A', 14: 'LISTA DE PRECIOS !C4:C', 23: 'LISTA DE PRECIOS!B4:B'}],
+}
+
+STATUSES = ['', 'ENCARGADO', 'ENCARGADO MIAMI', 'SALIENDO', 'LLEGO BSAS', 'EN BSAS', 'EN TRANSITO',
+            'ENTREGADO', 'FINALIZADO', 'CANCELADO', 2023]
+FORWARDERS = ['UNLIMITED', 'TOP CARGO', 'MIAMI BOX', 'EXPRESS AR']
+SALE_TYPES = ['CELL-NEW', 'CELL-USED', 'REPUESTOS', 'FOTOGRAFIA', 'ASIS-CELL']
+METHODS = ['USDT', 'EFECTIVO', 'TRANSFERENCIA', 'ZELLE', '']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+          'October', 'November', 'December']
+EXCEL_EPOCH = dt.date(1899, 12, 30)
+
+class Date(int):
+    """Número de serie de Excel que se escribe con formato de fecha."""
+
+class Error(str):
+    """Valor de error de Excel (#DIV/0!, #N/A...)."""
+
+def _col_letter(i):
+    name = ''
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        name = chr(65 + r) + name
+    return name
+
+class _SharedStrings:
+    def __init__(self):
+        self.index = {}
+
+    def get(self, s):
+        idx = self.index.get(s)
+        if idx is None:
+            idx = self.index[s] = len(self.index)
+        return idx
+
+    def xml(self):
+        items = ''.join(f'<si><t xml:space="preserve">{escape(s)}</t></si>' for s in self.index)
+        return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'count="{len(self.index)}" uniqueCount="{len(self.index)}">{items}</sst>')
+
+def _row_xml(r, values, letters, strings):
+    cells = []
+    for c, v in enumerate(values):
+        if v is None or v == '':
+            continue
+        ref = f'{letters[c]}{r}'
+        if isinstance(v, Date):
+            cells.append(f'<c r="{ref}" s="1"><v>{int(v)}</v></c>')
+        elif isinstance(v, Error):
+            cells.append(f'<c r="{ref}" t="e"><v>{v}</v></c>')
+        elif isinstance(v, str):
+            cells.append(f'<c r="{ref}" t="s"><v>{strings.get(v)}</v></c>')
+        else:
+            cells.append(f'<c r="{ref}"><v>{v}</v></c>')
+    return f'<row r="{r}">{"".join(cells)}</row>'
+
+def _write_sheet(zf, part, name, rows, strings):
+    header = HEADERS[name]
+    letters = [_col_letter(i) for i in range(len(header))]
+    preamble = PREAMBLE.get(name, [])
+    with zf.open(part, 'w', force_zip64=True) as f:
+        f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                b'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheetData>')
+        r = 1
+        for extra in preamble:
+            f.write(_row_xml(r, [extra.get(i, '') for i in range(len(header))], letters, strings).encode())
+            r += 1
+        f.write(_row_xml(r, header, letters, strings).encode())
+        r += 1
+        buf = []
+        for values in rows:
+            buf.append(_row_xml(r, values, letters, strings))
+            r += 1
+            if len(buf) >= 5000:
+                f.write(''.join(buf).encode('utf-8'))
+                buf = []
+        f.write(''.join(buf).encode('utf-8'))
+        f.write(b'</sheetData></worksheet>')
+
+def _money(rng, n, scale):
+    """Montos: la mayoría números, ~15% texto "$1,234", ~5% vacíos."""
+    values = np.round(rng.gamma(2.0, scale, n), 2)
+    kind = rng.random(n)
+    out = []
+    for v, k in zip(values.tolist(), kind.tolist()):
+        if k < 0.05:
+            out.append('')
+        elif k < 0.20:
+            out.append(f'${v:,.0f}')
+        else:
+            out.append(v)
+    return out
+
+def _dates(rng, n, days_back=1100, empty=0.0):
+    today = (dt.date.today() - EXCEL_EPOCH).days
+    serials = today - rng.integers(0, days_back, n)
+    gaps = rng.random(n) < empty
+    return ['' if g else Date(s) for s, g in zip(serials.tolist(), gaps.tolist())]
+
+def _pick(rng, options, n, p=None):
+    idx = rng.choice(len(options), n, p=p)
+    return [options[i] for i in idx.tolist()]
+
+def clients_rows(rng, n):
+    phones = rng.integers(1100000000, 1199999999, n)
+    has_phone = rng.random(n) < 0.6
+    for i in range(n):
+        yield [i + 1, f'Cliente {i + 1:05d}', ['', 'AMIGO', 'FAMILIA', 'REVENDEDOR'][i % 4],
+               SALE_TYPES[i % len(SALE_TYPES)], str(phones[i]) if has_phone[i] else '',
+               f'cliente{i + 1}@mail.com' if i % 3 else '', '', '', f'Calle {i % 500} {i}' if i % 2 else '',
+               'CABA' if i % 2 else '', 'ARGENTINA', '']
+
+def products_rows(rng, n):
+    lp1 = _money(rng, n, 150)
+    cost = _money(rng, n, 100)
+    weights = np.round(rng.uniform(0.05, 3, n), 2)
+    for i in range(n):
+        # ~10% de SKUs repetidos, como en la planilla
+        sku = f'SKU-{(i if i % 10 else i // 2):06d}'
+        yield [sku, f'Artículo {i}', ['AS-IS+', 'A', 'B', ''][i % 4], SALE_TYPES[i % len(SALE_TYPES)],
+               f'Modelo {i % 40}', ['APPLE', 'SAMSUNG', 'XIAOMI', 'MOTOROLA'][i % 4], float(weights[i]),
+               ['', 'ACTIVO', 'DISCONTINUADO'][i % 3], cost[i], ['SI', 'NO', ''][i % 3], '',
+               lp1[i], '', '']
+
+def shipments_rows(rng, n, n_clients):
+    shipped = _dates(rng, n)
+    arrived = _dates(rng, n, days_back=900, empty=0.4)
+    clients = rng.integers(1, n_clients + 1, n)
+    weights = np.round(rng.uniform(0.5, 40, n), 1)
+    cost, charged = _money(rng, n, 400), _money(rng, n, 600)
+    status = _pick(rng, STATUSES, n)
+    for i in range(n):
+        per_unit = Error('#DIV/0!') if i % 25 == 0 else round(float(weights[i]) * 3.1, 2)
+        yield [n - i, f'Cliente {clients[i]:05d}', int(clients[i]), FORWARDERS[i % len(FORWARDERS)],
+               shipped[i], arrived[i], float(weights[i]), 'CELLS' if i % 2 else 'CARGA', int(i % 40),
+               60, 24, cost[i], f'{i % 9} celulares y {i % 4} tablets', float(weights[i]) + 0.5,
+               per_unit, charged[i], 80, 0, 2000 + i, 'ENVIO', 'SI' if i % 3 else '', '', i % 52,
+               status[i], '']
+
+def orders_rows(rng, n, n_clients):
+    dates = _dates(rng, n)
+    clients = rng.integers(1, n_clients + 1, n)
+    totals = _money(rng, n, 900)
+    saldo = _money(rng, n, 50)
+    methods = _pick(rng, METHODS, n)
+    for i in range(n):
+        # CLIENTE: nombre, a veces el código como texto, como en la planilla
+        client = str(clients[i]) if i % 7 == 0 else f'Cliente {clients[i]:05d}'
+        month = MONTHS[(EXCEL_EPOCH + dt.timedelta(days=int(dates[i]))).month - 1] if dates[i] != '' else ''
+        yield [n - i, client, int(clients[i]), dates[i], month, SALE_TYPES[i % len(SALE_TYPES)], i % 12,
+               totals[i], 0, 0, '', saldo[i], methods[i], '']
+
+def details_rows(rng, n, n_orders, n_products, n_shipments, n_clients):
+    orders = rng.integers(1, n_orders + 1, n)
+    products = rng.integers(0, n_products, n)
+    has_sku = rng.random(n) < 0.85
+    has_shipment = rng.random(n) < 0.6
+    shipments = rng.integers(1, n_shipments + 1, n)
+    qty = rng.integers(1, 10, n)
+    price, cost = _money(rng, n, 300), _money(rng, n, 200)
+    status = _pick(rng, STATUSES, n)
+    clients = rng.integers(1, n_clients + 1, n)
+    dates = _dates(rng, n)
+    for i in range(n):
+        p = int(products[i])
+        sku = f'SKU-{(p if p % 10 else p // 2):06d}' if has_sku[i] else ''
+        yield [dates[i] if i % 5 else 'N/A', int(orders[i]), SALE_TYPES[i % len(SALE_TYPES)], int(clients[i]),
+               f'Cliente {clients[i]:05d}', sku, int(qty[i]), f'Artículo {p} detalle de venta', '',
+               int(shipments[i]) if has_shipment[i] else '', price[i], '', status[i], '', cost[i], 3, 0, '',
+               'PROVEEDOR', '', '', '', 0, '', 'N/A']
+
+def _sizes(detail_rows):
+    return {
+        'DETA_VENTAS': detail_rows,
+        'CABE_VENTAS': max(1, detail_rows // 3),
+        'CABE_ENVIOS': max(1, detail_rows // 20),
+        'CLIENTES': max(300, detail_rows // 100),
+        'ARTICULOS TECNO': max(1000, detail_rows // 100),
+    }
+
+_CONTENT_TYPES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/><Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/><Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/><Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>{sheets}</Types>'''
+_ROOT_RELS = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>'''
+_STYLES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><fonts count="1"><font><sz val="10"/><name val="Arial"/></font></fonts><fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills><borders count="1"><border/></borders><cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs><cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs><cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'''
+
+def generate(path, detail_rows, seed=42):
+    """Escribe el libro en `path`. Devuelve {hoja: filas de datos}."""
+    rng = np.random.default_rng(seed)
+    sizes = _sizes(detail_rows)
+    names = ['CLIENTES', 'ARTICULOS TECNO', 'CABE_ENVIOS', 'CABE_VENTAS', 'DETA_VENTAS']
+    sources = {
+        'CLIENTES': lambda: clients_rows(rng, sizes['CLIENTES']),
+        'ARTICULOS TECNO': lambda: products_rows(rng, sizes['ARTICULOS TECNO']),
+        'CABE_ENVIOS': lambda: shipments_rows(rng, sizes['CABE_ENVIOS'], sizes['CLIENTES']),
+        'CABE_VENTAS': lambda: orders_rows(rng, sizes['CABE_VENTAS'], sizes['CLIENTES']),
+        'DETA_VENTAS': lambda: details_rows(rng, detail_rows, sizes['CABE_VENTAS'], sizes['ARTICULOS TECNO'],
+                                            sizes['CABE_ENVIOS'], sizes['CLIENTES']),
+    }
+    strings = _SharedStrings()
+    tmp = f'{path}.tmp{os.getpid()}'
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for i, name in enumerate(names, start=1):
+            _write_sheet(zf, f'xl/worksheets/sheet{i}.xml', name, sources[name](), strings)
+        overrides = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+                            f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                            for i in range(1, len(names) + 1))
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES.format(sheets=overrides))
+        zf.writestr('_rels/.rels', _ROOT_RELS)
+        sheets = ''.join(f'<sheet name="{escape(n)}" sheetId="{i}" r:id="rId{i}"/>' for i, n in enumerate(names, start=1))
+        zf.writestr('xl/workbook.xml',
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    f'<sheets>{sheets}</sheets></workbook>')
+        rels = ''.join(f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                       f'relationships/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(names) + 1))
+        n = len(names)
+        rels += (f'<Relationship Id="rId{n + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                 f'relationships/styles" Target="styles.xml"/>'
+                 f'<Relationship Id="rId{n + 2}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                 f'relationships/sharedStrings" Target="sharedStrings.xml"/>')
+        zf.writestr('xl/_rels/workbook.xml.rels',
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        zf.writestr('xl/styles.xml', _STYLES)
+        zf.writestr('xl/sharedStrings.xml', strings.xml())
+    os.replace(tmp, path)
+    return sizes
+
+def ensure_workbook(directory, detail_rows, seed=42):
+    """Ruta del libro sintético de `detail_rows` filas, generándolo solo si no existe."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'synthetic_{detail_rows}_s{seed}.xlsx')
+    if not os.path.exists(path):
+        generate(path, detail_rows, seed)
+    return path
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0].startswith('--'):
+        sys.exit(__doc__)
+    path = args[0]
+    rows = int(args[args.index('--filas') + 1]) if '--filas' in args else 10000
+    seed = int(args[args.index('--semilla') + 1]) if '--semilla' in args else 42
+    start = time.perf_counter()
+    sizes = generate(path, rows, seed)
+    print(f"✓ {path}: {', '.join(f'{k} {v}' for k, v in sizes.items())} "
+          f"({os.path.getsize(path) / 1048576:.1f} MB, {time.perf_counter() - start:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,20 @@
+from client_ledger import build_ledger
+from seed_writer import existing_seed_path, stream_seed
 
-import json
+# Streamed and aggregated per client by client_ledger (orders_seed.json or .ndjson)
+ledger = build_ledger(stream_seed(existing_seed_path('webapp/prisma/orders_seed.json')))
+totals = ledger['totals']
 
-with open('webapp/prisma/orders_seed.json') as f:
-    orders = json.load(f)
+print(f"Total Orders: {totals['orders']}")
 
-total_debt = 0
-total_payments = 0
-unpaid_count = 0
+for o in ledger['large_unpaid']:
+    print(f"Unpaid High Value Order: #{o['order_number']} - ${o['total']} (Client Old ID: {o['client_old_id']})")
 
-print(f"Total Orders: {len(orders)}")
+print(f"Total Debt (Sum of Totals): {totals['debt']:,.2f}")
+print(f"Total Payments (Sum of Payments): {totals['payments']:,.2f}")
+print(f"Net System Balance (Should be close to 0 if all paid): {totals['balance']:,.2f}")
+print(f"Count of completely unpaid orders: {totals['unpaid_orders']}")
 
-for o in orders:
-    debt = o.get('total_amount', 0)
-    pay = o.get('payment_amount', 0)
-    
-    total_debt += debt
-    total_payments += pay
-    
-    if debt > 0 and pay == 0:
-        unpaid_count += 1
-        # Print first few unpaid high value orders
-        if debt > 1000:
-            print(f"Unpaid High Value Order: #{o['order_number']} - ${debt} (Client Old ID: {o.get('client_old_id')})")
-
-print(f"Total Debt (Sum of Totals): {total_debt:,.2f}")
-print(f"Total Payments (Sum of Payments): {total_payments:,.2f}")
-print(f"Net System Balance (Should be close to 0 if all paid): {total_debt - total_payments:,.2f}")
-print(f"Count of completely unpaid orders: {unpaid_count}")
+overpaid = [a for a in ledger['anomalies'] if a['kind'] == 'overpaid']
+if overpaid:
+    print(f"Overpaid orders: {len(overpaid)} (" + ', '.join(f"#{a['order_number']}" for a in overpaid[:10]) + ")")
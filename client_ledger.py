@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Cuenta corriente por cliente a partir de orders_seed.json, sin cargar el seed entero:
+lo mismo que suma la BD con los movimientos CARGO/PAGO de cada pedido (ver
+seed_load.py), calculado en la extracción.
+
+El seed se lee registro a registro (NDJSON línea a línea; el .json con ijson si está
+instalado, ver seed_writer.stream_seed) y se procesa por lotes de CHUNK_ROWS pedidos:
+cada lote pasa a columnas y se agrega por cliente con un groupby, y ese parcial se
+suma al acumulado. La memoria depende del tamaño del lote y de la cantidad de
+clientes, no del largo del seed.
+
+Por cliente (client_old_id o, si el pedido no tiene código, el nombre):
+    orders, debt, payments, balance   pedidos, CARGO (total), PAGO y debt - payments, con
+                                      signo como en la BD y en check_json_stats.py: un
+                                      cliente a favor tiene balance negativo, y un total o
+                                      pago negativo resta (además de ser una anomalía)
+    outstanding                       lo que falta cobrar de los pedidos no saldados (cada
+                                      pedido aporta max(total - pago, 0))
+    credit                            pagos de más (cada pedido aporta max(pago - total, 0))
+    unpaid_orders                     pedidos con total y sin ningún pago
+    aging                             outstanding por antigüedad del pedido a la fecha
+                                      de corte (AGING_BUCKETS días; undated sin fecha)
+    last_order                        fecha del último pedido
+
+Anomalías por pedido (ANOMALIES):
+    overpaid          pago mayor que el total (p.ej. #2258: 2390 contra 1195)
+    negative          total o pago negativos
+    items_mismatch    el total no coincide con la suma de sus items
+    no_client         sin código ni nombre de cliente
+    duplicate_order   el número de pedido aparece más de una vez
+
+Uso:
+    python3 client_ledger.py [--seeds DIR] [--al AAAA-MM-DD] [--salida RUTA] [--json]
+    python3 -m sync_cli ledger [mismas opciones]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from seed_writer import existing_seed_path, stream_seed, write_json
+from stage_trace import stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SEEDS_DIR = os.path.join(SCRIPT_DIR, 'webapp', 'prisma')
+REPORT_FILE = 'ledger_report.json'
+CHUNK_ROWS = 20000
+# Diferencias de centavos entre total, pago e items no son anomalías
+TOLERANCE = 0.01
+# Límite superior (inclusive) de cada tramo de antigüedad, en días
+AGING_BUCKETS = {'days_0_30': 30, 'days_31_60': 60, 'days_61_90': 90, 'days_91_180': 180,
+                 'days_180_plus': None}
+AGING = [*AGING_BUCKETS, 'undated']
+ANOMALIES = ('overpaid', 'negative', 'items_mismatch', 'no_client', 'duplicate_order')
+# Pedidos sin ningún pago por encima de este total se listan aparte (como hacía check_json_stats.py)
+LARGE_UNPAID = 1000
+
+SUMS = ['orders', 'debt', 'payments', 'outstanding', 'credit', 'unpaid_orders', *AGING]
+
+# --- Lotes ---
+
+def _chunks(records, size):
+    chunk = []
+    for rec in records:
+        chunk.append(rec)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def order_frame(chunk):
+    """Un lote de pedidos como columnas; los items solo aportan su suma y cantidad."""
+    items = [o.get('items') or () for o in chunk]
+    old_ids = pd.array([o.get('client_old_id') for o in chunk], dtype='Int64')
+    names = pd.Series([o.get('client_name_match') for o in chunk], dtype=object)
+    names = names.where(names.notna(), None).map(lambda n: ' '.join(str(n).upper().split()) if n else None)
+    return pd.DataFrame({
+        'order_number': pd.array([o.get('order_number') for o in chunk], dtype='Int64'),
+        'client_old_id': old_ids,
+        # Sin código, el cliente es el nombre (trim + mayúsculas, como la carga)
+        'client_name': names.where(old_ids.isna(), None).to_numpy(dtype=object),
+        'date': pd.to_datetime(pd.Series([o.get('date') for o in chunk], dtype=object),
+                               errors='coerce', format='ISO8601'),
+        'total': np.array([o.get('total_amount') or 0 for o in chunk], dtype=float),
+        'payment': np.array([o.get('payment_amount') or 0 for o in chunk], dtype=float),
+        'items_total': np.array([sum((i.get('unit_price') or 0) * (i.get('quantity') or 0) for i in its)
+                                 for its in items], dtype=float),
+        'item_count': np.array([len(its) for its in items], dtype='int64'),
+    })
+
+def _aging(df, as_of):
+    """Outstanding de cada pedido repartido en las columnas de AGING (una sola con valor)."""
+    age = (pd.Timestamp(as_of) - df['date']).dt.days.to_numpy(dtype=float)
+    limits = [limit for limit in AGING_BUCKETS.values() if limit is not None]
+    # Tramo de cada pedido: índice en AGING_BUCKETS, o undated (último) sin fecha
+    bucket = np.where(np.isnan(age), len(AGING) - 1, np.searchsorted(limits, np.nan_to_num(age), side='left'))
+    return {name: np.where(bucket == i, df['outstanding'].to_numpy(), 0.0) for i, name in enumerate(AGING)}
+
+def chunk_balances(df, as_of):
+    """Parcial por cliente de un lote."""
+    # Sumas con signo: los montos negativos no se recortan, se informan como anomalía
+    debt, payments = df['total'].to_numpy(), df['payment'].to_numpy()
+    df = df.assign(orders=1, debt=debt, payments=payments,
+                   outstanding=np.maximum(debt - payments, 0), credit=np.maximum(payments - debt, 0),
+                   unpaid_orders=((debt > 0) & (payments == 0)).astype('int64'))
+    df = df.assign(**_aging(df, as_of))
+    grouped = df.groupby(['client_old_id', 'client_name'], dropna=False)
+    out = grouped[SUMS].sum()
+    out['last_order'] = grouped['date'].max()
+    return out
+
+def combine(acc, part):
+    if acc is None:
+        return part
+    both = pd.concat([acc, part])
+    grouped = both.groupby(level=['client_old_id', 'client_name'], dropna=False)
+    out = grouped[SUMS].sum()
+    out['last_order'] = grouped['last_order'].max()
+    return out
+
+def _anomaly_rows(df, mask, kind, **extra):
+    rows = df[mask]
+    out = []
+    for n, row in enumerate(rows.itertuples(index=False)):
+        rec = {'kind': kind, 'order_number': None if pd.isna(row.order_number) else int(row.order_number),
+               'client_old_id': None if pd.isna(row.client_old_id) else int(row.client_old_id),
+               'client_name': row.client_name, 'total': row.total, 'payment': row.payment}
+        rec.update({k: v[n] for k, v in extra.items()})
+        out.append(rec)
+    return out
+
+def chunk_anomalies(df):
+    """Pedidos del lote con alguna de las ANOMALIES (salvo duplicate_order, que mira todo el seed)."""
+    total, payment = df['total'].to_numpy(), df['payment'].to_numpy()
+    overpaid = payment > total + TOLERANCE
+    negative = (total < 0) | (payment < 0)
+    mismatch = (df['item_count'].to_numpy() > 0) & (np.abs(total - df['items_total'].to_numpy()) > TOLERANCE)
+    no_client = (df['client_old_id'].isna() & df['client_name'].isna()).to_numpy()
+    return [
+        *_anomaly_rows(df, overpaid, 'overpaid', excess=np.round(payment - total, 2)[overpaid].tolist()),
+        *_anomaly_rows(df, negative, 'negative'),
+        *_anomaly_rows(df, mismatch, 'items_mismatch',
+                       items_total=np.round(df['items_total'].to_numpy(), 2)[mismatch].tolist()),
+        *_anomaly_rows(df, no_client, 'no_client'),
+    ]
+
+# --- Cuenta corriente ---
+
+def build_ledger(records, as_of=None, chunk_rows=CHUNK_ROWS):
+    """
+    Balances por cliente, anomalías, pedidos grandes sin pagar y totales, recorriendo
+    `records` (un iterable) una sola vez por lotes.
+    """
+    as_of = as_of or datetime.now()
+    acc, anomalies, large_unpaid, numbers, items = None, [], [], [], 0
+    for chunk in _chunks(records, chunk_rows):
+        with stage('ledger:chunk', len(chunk)):
+            df = order_frame(chunk)
+            items += int(df['item_count'].sum())
+            acc = combine(acc, chunk_balances(df, as_of))
+            anomalies += chunk_anomalies(df)
+            big = ((df['total'] > LARGE_UNPAID) & (df['payment'] == 0)).to_numpy()
+            large_unpaid += _anomaly_rows(df, big, 'large_unpaid')
+            numbers.append(df['order_number'].dropna().to_numpy(dtype='int64'))
+
+    # Duplicados: solo los números de pedido (8 bytes c/u) quedan de todo el seed
+    if numbers:
+        values, counts = np.unique(np.concatenate(numbers), return_counts=True)
+        anomalies += [{'kind': 'duplicate_order', 'order_number': int(v), 'count': int(c)}
+                      for v, c in zip(values[counts > 1], counts[counts > 1])]
+
+    # Totales sobre el acumulado sin redondear (redondear por cliente y sumar corre centavos)
+    sums = acc[SUMS].sum() if acc is not None else pd.Series(0.0, index=SUMS)
+    totals = {'orders': int(sums['orders']), 'items': items,
+              **{k: round(float(sums[k]), 2) for k in ['debt', 'payments', 'outstanding', 'credit']},
+              'unpaid_orders': int(sums['unpaid_orders']),
+              'balance': round(float(sums['debt'] - sums['payments']), 2)}
+    clients = _client_table(acc)
+    return {'as_of': pd.Timestamp(as_of).date().isoformat(), 'totals': totals, 'clients': clients,
+            'anomalies': anomalies, 'large_unpaid': large_unpaid}
+
+def _client_table(acc):
+    columns = ['client_old_id', 'client_name', *SUMS, 'balance', 'last_order']
+    if acc is None:
+        return pd.DataFrame(columns=columns)
+    clients = acc.reset_index()
+    clients['balance'] = clients['debt'] - clients['payments']
+    for col in ['debt', 'payments', 'balance', 'outstanding', 'credit', *AGING]:
+        clients[col] = clients[col].round(2)
+    # Los que más deben primero
+    return clients[columns].sort_values(['outstanding', 'balance'], ascending=False, kind='stable') \
+        .reset_index(drop=True)
+
+def ledger_records(ledger, names=None):
+    """Reporte serializable: clientes como registros (con su nombre de CLIENTES si hay `names`)."""
+    clients = []
+    for row in ledger['clients'].to_dict('records'):
+        old_id = None if pd.isna(row['client_old_id']) else int(row['client_old_id'])
+        clients.append({
+            'client_old_id': old_id,
+            'client_name': row['client_name'] if old_id is None else (names or {}).get(old_id),
+            **{k: int(row[k]) for k in ['orders', 'unpaid_orders']},
+            **{k: row[k] for k in ['debt', 'payments', 'balance', 'outstanding', 'credit']},
+            'aging': {k: row[k] for k in AGING},
+            'last_order': None if pd.isna(row['last_order']) else row['last_order'].date().isoformat(),
+        })
+    by_kind = {kind: [a for a in ledger['anomalies'] if a['kind'] == kind] for kind in ANOMALIES}
+    return {'as_of': ledger['as_of'], 'totals': ledger['totals'], 'clients': clients,
+            'anomalies': by_kind, 'large_unpaid': ledger['large_unpaid']}
+
+def client_names(seed_dir):
+    path = existing_seed_path(os.path.join(seed_dir, 'clients_seed.json'))
+    return {c['old_id']: c.get('name') for c in stream_seed(path) if c.get('old_id') is not None} if path else {}
+
+def _pop_option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    seed_dir = _pop_option(args, '--seeds', SEEDS_DIR)
+    as_of = _pop_option(args, '--al')
+    output = _pop_option(args, '--salida') or os.path.join(seed_dir, REPORT_FILE)
+    as_json = '--json' in args
+
+    path = existing_seed_path(os.path.join(seed_dir, 'orders_seed.json'))
+    if path is None:
+        print(f"❌ No hay orders_seed.json en {seed_dir}")
+        return 1
+    start = time.time()
+    with stage('ledger'):
+        ledger = build_ledger(stream_seed(path), datetime.fromisoformat(as_of) if as_of else None)
+        report = ledger_records(ledger, client_names(seed_dir))
+    write_json(output, report, 'pretty')
+    if as_json:
+        print(json.dumps(report, ensure_ascii=False))
+        return 0
+
+    t = report['totals']
+    print(f"📒 Cuenta corriente al {report['as_of']} ({os.path.basename(path)}, {time.time() - start:.2f}s)")
+    print(f"  Pedidos: {t['orders']} ({t['unpaid_orders']} sin ningún pago)")
+    print(f"  Cargos: {t['debt']:,.2f}  Pagos: {t['payments']:,.2f}  Saldo: {t['balance']:,.2f}")
+    print(f"  Por cobrar: {t['outstanding']:,.2f}  Pagado de más: {t['credit']:,.2f}")
+    print(f"\n👥 Clientes que más deben:")
+    for c in report['clients'][:10]:
+        if c['outstanding'] <= 0:
+            break
+        who = c['client_name'] or '-'
+        print(f"  {c['client_old_id'] or '':>5} {who[:30]:<30} {c['outstanding']:>12,.2f}  "
+              f"(+180 días: {c['aging']['days_180_plus']:,.2f})")
+    print(f"\n⚠️ Anomalías:")
+    for kind, rows in report['anomalies'].items():
+        sample = ', '.join(f"#{a['order_number']}" for a in rows[:8]) + (', ...' if len(rows) > 8 else '')
+        print(f"  {kind}: {len(rows)}" + (f" ({sample})" if rows else ''))
+    print(f"\n💾 {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+
+"""
+Lectura de la BD (PostgreSQL) a DataFrames para la exportación BD → Excel.
+
+Dos caminos; ninguno arma la lista completa de tuplas de fetchall():
+    copy    COPY (consulta) TO STDOUT en CSV, volcado a un temporal (en memoria hasta
+            64 MB, después a disco) y parseado por pd.read_csv: los datos viajan en un
+            solo flujo y no se crea un objeto Python por celda. Es el método por defecto.
+    cursor  cursor con nombre (del lado del servidor) con itersize: el servidor manda
+            las filas de a `itersize` y el DataFrame se arma por lotes.
+
+Las dos devuelven el mismo DataFrame: columnas numéricas y de fecha según la entidad,
+el resto texto (object) con vacío/NULL como NaN, igual que en el Excel.
+
+Las consultas por entidad están en EXPORT_QUERIES; los alias de columna son los que
+usa export_to_excel.py. Para probar contra un PostgreSQL local alcanza con
+EXPORT_DATABASE_URL=postgresql://usuario@localhost/base (ver export_to_excel.py).
+"""
+
+import tempfile
+import pandas as pd
+
+METHODS = ('copy', 'cursor')
+DEFAULT_METHOD = 'copy'
+ITERSIZE = 5000
+
+# entidad -> consulta y columnas tipadas (el resto es texto)
+EXPORT_QUERIES = {
+    'clients': {
+        'sql': '''
+            SELECT "old_id" AS cod_cli, "name" AS nombre, "email" AS mail, "phone" AS telefono,
+                   "document_id" AS dni_cuit, "address" AS direccion, "city" AS ciudad,
+                   "state" AS provincia, "country" AS pais, "type" AS tipo_cli, "notes" AS notas
+            FROM "Client"
+            WHERE "old_id" IS NOT NULL
+            ORDER BY "old_id"''',
+        'numeric': ['cod_cli'],
+        'dates': [],
+    },
+    'orders': {
+        'sql': '''
+            SELECT o."order_number", c."old_id" AS cod_cli, o."date", o."status", o."total_amount",
+                   o."currency", o."type", o."paymentMethod" AS payment_method,
+                   o."tracking_number", s."shipment_number"
+            FROM "Order" o
+            JOIN "Client" c ON c."id" = o."clientId"
+            LEFT JOIN "Shipment" s ON s."id" = o."shipmentId"
+            WHERE o."order_number" IS NOT NULL
+            ORDER BY o."order_number"''',
+        'numeric': ['order_number', 'cod_cli', 'total_amount', 'shipment_number'],
+        'dates': ['date'],
+    },
+    'order_items': {
+        'sql': '''
+            SELECT o."order_number", p."sku", i."productName" AS product_name, i."quantity",
+                   i."unit_price", i."unit_cost", i."status", s."shipment_number"
+            FROM "OrderItem" i
+            JOIN "Order" o ON o."id" = i."orderId"
+            LEFT JOIN "Product" p ON p."id" = i."productId"
+            LEFT JOIN "Shipment" s ON s."id" = i."shipmentId"
+            WHERE o."order_number" IS NOT NULL
+            ORDER BY o."order_number", i."id"''',
+        'numeric': ['order_number', 'quantity', 'unit_price', 'unit_cost', 'shipment_number'],
+        'dates': [],
+    },
+    'shipments': {
+        'sql': '''
+            SELECT "shipment_number", "forwarder", "date_shipped", "date_arrived", "weight_fw",
+                   "weight_cli", "type_load", "item_count", "cost_total", "price_total",
+                   "invoice", "status"
+            FROM "Shipment"
+            WHERE "shipment_number" IS NOT NULL
+            ORDER BY "shipment_number"''',
+        'numeric': ['shipment_number', 'weight_fw', 'weight_cli', 'item_count', 'cost_total', 'price_total'],
+        'dates': ['date_shipped', 'date_arrived'],
+    },
+    'products': {
+        'sql': '''
+            SELECT "sku", "name", "type", "brand", "model", "stock", "lp1", "lp2", "lp3",
+                   "last_purchase_cost"
+            FROM "Product"
+            ORDER BY "sku"''',
+        'numeric': ['stock', 'lp1', 'lp2', 'lp3', 'last_purchase_cost'],
+        'dates': [],
+    },
+}
+
+def _typed(df, numeric=(), dates=()):
+    """Mismos tipos venga de COPY (todo texto) o del cursor (tipos de psycopg2)."""
+    for col in df.columns:
+        if col in numeric:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        elif col in dates:
+            # ISO8601: COPY escribe '2025-06-19 17:34:17.523' y '2023-02-02 00:00:00' en la misma
+            # columna; con el formato inferido de la primera fila, las demás quedarían NaT
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601')
+        else:
+            s = df[col].astype(object)
+            df[col] = s.where(s.notna() & (s != ''), None)
+    return df
+
+def _read_copy(conn, sql):
+    with conn.cursor() as cur, tempfile.SpooledTemporaryFile(max_size=64 << 20) as buf:
+        cur.copy_expert(f'COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)', buf)
+        buf.seek(0)
+        # dtype=str: los tipos los pone _typed, así '0011' (teléfonos, SKUs) no pierde ceros
+        return pd.read_csv(buf, dtype=str, keep_default_na=False, na_values=[''])
+
+def _read_cursor(conn, sql, itersize, name):
+    frames = []
+    with conn.cursor(name=name) as cur:
+        cur.itersize = itersize
+        cur.execute(sql)
+        while True:
+            rows = cur.fetchmany(itersize)
+            if not rows:
+                break
+            frames.append(pd.DataFrame(rows, columns=[d[0] for d in cur.description], dtype=object))
+        if not frames:
+            return pd.DataFrame(columns=[d[0] for d in cur.description], dtype=object)
+    return pd.concat(frames, ignore_index=True)
+
+def read_query(conn, sql, method=DEFAULT_METHOD, itersize=ITERSIZE, numeric=(), dates=(), name='export_read'):
+    """DataFrame con el resultado de `sql` leído con COPY o con un cursor del servidor."""
+    if method not in METHODS:
+        raise ValueError(f"Método de lectura inválido: {method} (opciones: {', '.join(METHODS)})")
+    if method == 'copy':
+        df = _read_copy(conn, sql)
+    else:
+        df = _read_cursor(conn, sql, itersize, name)
+    return _typed(df, numeric, dates)
+
+def read_entity(conn, entity, method=DEFAULT_METHOD, itersize=ITERSIZE):
+    """DataFrame de una entidad de EXPORT_QUERIES (clients, orders, order_items, shipments, products)."""
+    spec = EXPORT_QUERIES[entity]
+    return read_query(conn, spec['sql'], method, itersize, spec['numeric'], spec['dates'],
+                      name=f'export_{entity}')
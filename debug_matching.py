@@ -1,12 +1,15 @@
 
 import pandas as pd
 import os
+from workbook_reader import open_workbook
 
 excel_path = '/Users/diegorodriguez/sistema_gestion_importaciones/VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx'
 
 print(f"Reading {excel_path}...")
-df_head = pd.read_excel(excel_path, sheet_name='CABE_VENTAS') # Auto header?
-df_det = pd.read_excel(excel_path, sheet_name='DETA_VENTAS')
+# header=0 like the old read_excel calls; repeated runs load from the parquet sheet cache
+wb = open_workbook(excel_path)
+df_head = wb.read_sheet('CABE_VENTAS', header=0, normalize=False)
+df_det = wb.read_sheet('DETA_VENTAS', header=0, normalize=False)
 
 # Find a sample order that failed
 sample_id = 2258
@@ -1,10 +1,15 @@
 
 import os
-import io
+import sys
 import json
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+import time
+import hashlib
+import zipfile
+import urllib.error
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+from stage_trace import stage
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,44 +19,262 @@ SERVICE_ACCOUNT_FILE = os.path.join(SCRIPT_DIR, 'google_credentials.json')
 
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
-def download_sheet():
+# Remote version of the last successful download, to skip unchanged exports
+STATE_FILE = os.path.join(SCRIPT_DIR, '.download_state.json')
+# In-progress download (+ .json with the remote version it belongs to, for resuming)
+PART_FILE = OUTPUT_FILE + '.part'
+
+CHUNK_SIZE = int(float(os.environ.get('DRIVE_CHUNK_MB', 8)) * 1024 * 1024)
+MAX_RETRIES = int(os.environ.get('DRIVE_MAX_RETRIES', 5))
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+GOOGLE_SHEET_MIME = 'application/vnd.google-apps.spreadsheet'
+METADATA_FIELDS = 'id,name,mimeType,modifiedTime,md5Checksum,version,size'
+
+# Exit codes: the pipeline treats EXIT_UNCHANGED as "nothing new to extract"
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_UNCHANGED = 3
+
+# --- Drive access ---
+
+class DriveClient(ABC):
+    """
+    What the sync needs from Drive: file metadata and the file bytes in chunks.
+    GoogleDriveClient uses the real API; HttpDriveClient talks plain HTTP to any server
+    exposing the same Drive v3 REST subset (e.g. a local stand-in server for tests).
+    """
+
+    @abstractmethod
+    def metadata(self, file_id):
+        """Drive v3 file resource with METADATA_FIELDS."""
+
+    @abstractmethod
+    def download_chunks(self, file_id, meta, start, chunk_size):
+        """
+        Yields (offset, bytes) starting at byte `start`. A backend that cannot resume
+        (Sheets exports ignore Range) starts over and yields offset 0 first.
+        """
+
+def _range_end(content_range):
+    """Total size from a 'bytes a-b/total' Content-Range header, or None."""
+    total = (content_range or '').rsplit('/', 1)[-1]
+    return int(total) if total.isdigit() else None
+
+class GoogleDriveClient(DriveClient):
+    def __init__(self, credentials_file):
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+        creds = service_account.Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+        self.service = build('drive', 'v3', credentials=creds)
+
+    def metadata(self, file_id):
+        return self.service.files().get(fileId=file_id, fields=METADATA_FIELDS).execute()
+
+    def download_chunks(self, file_id, meta, start, chunk_size):
+        if meta.get('mimeType') == GOOGLE_SHEET_MIME:
+            # We use Drive API to export the Sheet; exports are generated on the fly and can't be resumed
+            request = self.service.files().export_media(fileId=file_id, mimeType=XLSX_MIME)
+            resp, content = request.http.request(request.uri, method='GET')
+            self._check(resp, content, request.uri)
+            yield 0, content
+            return
+        request = self.service.files().get_media(fileId=file_id)
+        # One ranged GET per chunk on the request's authorized http; resuming is just
+        # starting the first Range at `start`
+        offset = start
+        while True:
+            headers = {'Range': f'bytes={offset}-{offset + chunk_size - 1}'}
+            resp, content = request.http.request(request.uri, method='GET', headers=headers)
+            if resp.status == 416:  # Range past the end: already complete
+                return
+            self._check(resp, content, request.uri)
+            if resp.status == 200:
+                # Range ignored: this is the whole file
+                yield 0, content
+                return
+            yield offset, content
+            offset += len(content)
+            total = _range_end(resp.get('content-range'))
+            if not content or (total is not None and offset >= total):
+                return
+
+    @staticmethod
+    def _check(resp, content, uri):
+        if resp.status >= 300:
+            from googleapiclient.errors import HttpError
+            raise HttpError(resp, content, uri=uri)
+
+class HttpDriveClient(DriveClient):
+    """Drive v3 REST subset over urllib: GET /files/<id>, /files/<id>?alt=media and /files/<id>/export."""
+
+    def __init__(self, base_url, token=None, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+
+    def _open(self, url, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+
+    def metadata(self, file_id):
+        url = f"{self.base_url}/files/{urllib.parse.quote(file_id)}?fields={METADATA_FIELDS}"
+        with self._open(url) as resp:
+            return json.load(resp)
+
+    def _content_url(self, file_id, meta):
+        fid = urllib.parse.quote(file_id)
+        if meta.get('mimeType') == GOOGLE_SHEET_MIME:
+            return f"{self.base_url}/files/{fid}/export?mimeType={urllib.parse.quote(XLSX_MIME)}"
+        return f"{self.base_url}/files/{fid}?alt=media"
+
+    def download_chunks(self, file_id, meta, start, chunk_size):
+        url = self._content_url(file_id, meta)
+        offset = start
+        while True:
+            try:
+                resp = self._open(url, {'Range': f'bytes={offset}-{offset + chunk_size - 1}'})
+            except urllib.error.HTTPError as e:
+                if e.code == 416:  # Range past the end: already complete
+                    return
+                raise
+            with resp:
+                if resp.status == 200:
+                    # Server ignored Range: the whole file comes in this response
+                    offset = 0
+                    for data in iter(lambda: resp.read(chunk_size), b''):
+                        yield offset, data
+                        offset += len(data)
+                    return
+                data = resp.read()
+                total = _range_end(resp.headers.get('Content-Range'))
+            yield offset, data
+            offset += len(data)
+            if not data or (total is not None and offset >= total):
+                return
+
+def make_client():
+    """DRIVE_API_URL points the sync at another server (e.g. a local stand-in); default is Google."""
+    base_url = os.environ.get('DRIVE_API_URL')
+    if base_url:
+        return HttpDriveClient(base_url, token=os.environ.get('DRIVE_API_TOKEN'))
+    print("Authenticating with Google Cloud...")
+    return GoogleDriveClient(SERVICE_ACCOUNT_FILE)
+
+# --- Conditional, resumable download ---
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _load_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+def remote_version(meta):
+    # Native Sheets have no md5Checksum; modifiedTime + version still change on every edit
+    return {k: meta.get(k) for k in ('modifiedTime', 'md5Checksum', 'version')}
+
+def is_unchanged(meta, state):
+    """Same remote version as the last download, and the local file is still that download."""
+    return (state.get('file_id') == SPREADSHEET_ID and state.get('remote') == remote_version(meta)
+            and os.path.exists(OUTPUT_FILE) and state.get('sha256') == file_sha256(OUTPUT_FILE))
+
+def _is_transient(exc):
+    status = getattr(getattr(exc, 'resp', None), 'status', None) or getattr(exc, 'code', None)
+    if status is not None:
+        try: return int(status) >= 500 or int(status) == 429
+        except (TypeError, ValueError): return False
+    return isinstance(exc, (OSError, TimeoutError, ConnectionError))
+
+def download_file(client, meta, chunk_size=CHUNK_SIZE, max_retries=MAX_RETRIES):
+    """
+    Downloads into PART_FILE and renames it over OUTPUT_FILE only when complete. A partial
+    file left by a failed attempt (or a previous run) is resumed if the remote version is
+    the same; transient errors are retried with backoff.
+    """
+    version = remote_version(meta)
+    part_meta = PART_FILE + '.json'
+    if _load_json(part_meta) != version and os.path.exists(PART_FILE):
+        os.remove(PART_FILE)
+    _save_json(part_meta, version)
+
+    attempt = 0
+    while True:
+        start = os.path.getsize(PART_FILE) if os.path.exists(PART_FILE) else 0
+        if start:
+            print(f"Resuming download at {start / 1048576:.1f} MB...")
+        try:
+            with open(PART_FILE, 'r+b' if start else 'wb') as fh:
+                for offset, data in client.download_chunks(SPREADSHEET_ID, meta, start, chunk_size):
+                    fh.seek(offset)
+                    fh.truncate()
+                    fh.write(data)
+                    print(f"Downloading... {fh.tell() / 1048576:.1f} MB")
+            break
+        except Exception as e:
+            attempt += 1
+            if not _is_transient(e) or attempt > max_retries:
+                raise
+            wait = min(2 ** attempt, 30)
+            print(f"Download interrupted ({e}); retry {attempt}/{max_retries} in {wait}s")
+            time.sleep(wait)
+
+    if not zipfile.is_zipfile(PART_FILE):
+        raise ValueError(f"downloaded file is not a valid .xlsx: {PART_FILE}")
+    os.replace(PART_FILE, OUTPUT_FILE)
+    os.remove(part_meta)
+
+def download_sheet(force=False):
     print("---------------------------------------------------")
     print("   AUTOSYNC: GOOGLE DRIVE -> EXCEL                 ")
     print("---------------------------------------------------")
-    
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
+
+    if not os.environ.get('DRIVE_API_URL') and not os.path.exists(SERVICE_ACCOUNT_FILE):
         print(f"ERROR: Credentials file '{SERVICE_ACCOUNT_FILE}' not found.")
         return
 
     try:
-        print("Authenticating with Google Cloud...")
-        creds = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-        
-        # We use Drive API to export the Sheet
-        drive_service = build('drive', 'v3', credentials=creds)
-        
+        client = make_client()
+
+        print(f"Checking Sheet ID: {SPREADSHEET_ID}...")
+        with stage('download:metadata') as st:
+            meta = client.metadata(SPREADSHEET_ID)
+            state = _load_json(STATE_FILE)
+            st['unchanged'] = unchanged = not force and is_unchanged(meta, state)
+        print(f"Remote version: modified {meta.get('modifiedTime')} (version {meta.get('version')})")
+
+        if unchanged:
+            print(f"UNCHANGED: '{OUTPUT_FILE}' is already the latest version.")
+            return EXIT_UNCHANGED
+
         print(f"Requesting export for Sheet ID: {SPREADSHEET_ID}...")
-        
-        request = drive_service.files().export_media(
-            fileId=SPREADSHEET_ID,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        
-        fh = io.FileIO(OUTPUT_FILE, 'wb')
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
-            if status:
-                print(f"Downloading... {int(status.progress() * 100)}%")
-            
+        with stage('download') as st:
+            download_file(client, meta)
+            st['bytes'] = os.path.getsize(OUTPUT_FILE)
+        _save_json(STATE_FILE, {'file_id': SPREADSHEET_ID, 'remote': remote_version(meta),
+                                'sha256': file_sha256(OUTPUT_FILE)})
         print(f"SUCCESS: Synced to '{OUTPUT_FILE}'")
-        
+        return EXIT_OK
+
     except Exception as e:
         print(f"SYNC ERROR: Could not download file.")
         print(f"Details: {e}")
-        
+
         # Check for permission error
         error_str = str(e)
         if "403" in error_str or "404" in error_str:
@@ -65,13 +288,11 @@ def download_sheet():
                     print(f"   {email}")
                     print("\n(Click 'Share' in Google Sheets -> Add this email -> Editor/Viewer)")
             except: pass
-        
-        # Exit with error code to stop pipeline if needed? 
-        # For now, we allow pipeline to continue with old file, or maybe stop?
-        # User said "generate automation that exports... each time", implies dependency.
-        # But if offline, maybe better to fail?
-        # Let's return error code.
-        exit(1)
+
+        # The pipeline depends on a fresh file: stop it. The previous
+        # OUTPUT_FILE is untouched (downloads go to PART_FILE first).
+        return EXIT_ERROR
 
 if __name__ == '__main__':
-    download_sheet()
+    # --forzar: download even if the remote version didn't change
+    sys.exit(download_sheet(force='--forzar' in sys.argv[1:]))
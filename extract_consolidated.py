@@ -1,83 +1,37 @@
 
 import pandas as pd
 import json
+import glob
+import hashlib
 import os
 import time
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from workbook_reader import open_workbook, sheet_fingerprints
+from seed_delta import write_deltas, delta_name
+from analytics_cube import CUBE_FILE, FACTS_FILE, update_cube
+from status_rules import normalize_status
+from extraction import (assemble_orders, build_clients, build_orders, build_products, build_shipments,
+                        client_index, clients_columns, match_order_clients, order_headers, order_items_frame,
+                        products_columns, shipments_columns)
+from extraction.cleaners import clean_date, clean_num, clean_text, find_column, to_records
+from extraction.client_match import match_threshold
+from seed_writer import default_format, drop_other_format, read_seed, seed_format, seed_path, write_json, write_seed
+import stage_trace
+from stage_trace import profiled, stage
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 excel_path = os.path.join(SCRIPT_DIR, 'VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx')
 output_dir = os.path.join(SCRIPT_DIR, 'webapp/prisma')
 
-def clean_num(n):
-    try: 
-        s = str(n).replace('$', '').replace(',', '')
-        if not s or s.lower() == 'nan': return 0.0
-        val = float(s)
-        return val if not pd.isna(val) else 0.0
-    except: 
-        return 0.0
-
-def clean_text(val):
-    if pd.isna(val) or val is None: return None
-    s = str(val).strip()
-    if s.lower() in ['nan', 'none', 'null', '']: return None
-    return s
-
-def clean_date(d):
-    if pd.isna(d) or str(d).lower() == 'nan': return None
-    try:
-        if isinstance(d, datetime):
-            return d.isoformat()
-        return str(d)
-    except:
-        return None
-
-def normalize_status(s):
-    if not s or pd.isna(s): return 'COMPRAR'
-    s = str(s).strip()
-    if not s or s.lower() == 'nan': return 'COMPRAR'
-    s_up = s.upper()
-    if 'ENCARGADO' in s_up: return 'ENCARGADO'
-    if 'SALIENDO' in s_up: return 'SALIENDO'
-    if 'MIAMI' in s_up: return 'MIAMI'
-    if 'BSAS' in s_up or 'LLEGÓ' in s_up or 'LLEGO' in s_up or 'RECIBIDO' in s_up: return 'EN BSAS'
-    if 'TRANSITO' in s_up: return 'EN TRANSITO'
-    if 'ENTREGADO' in s_up or 'FINALIZADO' in s_up: return 'ENTREGADO'
-    if 'CANCELADO' in s_up: return 'CANCELADO'
-    return s
-
-def extract_all():
-    start_time = time.time()
-    
-    # Manejo de filtros de fecha por argumento
-    days_filter = None
-    if len(sys.argv) > 1:
-        try:
-            days_filter = int(sys.argv[1])
-            if days_filter > 0:
-                print(f"⏱️ Filtrando datos de los últimos {days_filter} días...")
-        except:
-            pass
+STREAM_BATCH_ROWS = 5000
+STATE_FILE = '.extract_state.json'
 
-    print(f"🚀 Iniciando extracción consolidada desde: {excel_path}")
-    
-    if not os.path.exists(excel_path):
-        print(f"❌ Error: Archivo {excel_path} not found.")
-        return
-
-    # Usamos pd.ExcelFile para leer todas las hojas de una vez de forma eficiente
-    print("⏳ Leyendo archivo Excel (esto puede demorar unos segundos)...")
-    xl = pd.ExcelFile(excel_path)
-    sheet_names = xl.sheet_names
-    print(f"✅ Archivo cargado. Hojas encontradas: {sheet_names}")
+# --- Extractores por hoja (modo fila a fila, referencia histórica) ---
 
-    # 1. CLIENTES (Siempre cargamos todos para mapeo, son livianos)
-    print("👥 Extrayendo Clientes...")
-    df_clients = xl.parse('CLIENTES')
-    df_clients.columns = [str(c).upper().strip() for c in df_clients.columns]
+def build_clients_rows(df_clients):
     clients = []
     for _, row in df_clients.iterrows():
         old_id = row.get('COD_CLI')
@@ -94,13 +48,9 @@ def extract_all():
             'type': clean_text(row.get('TIPO CLI')) or 'CLIENTE',
             'address': clean_text(row.get('DIRECCION'))
         })
-    with open(os.path.join(output_dir, 'clients_seed.json'), 'w', encoding='utf-8') as f:
-        json.dump(clients, f, indent=2, ensure_ascii=False)
+    return clients
 
-    # 2. PRODUCTOS (Siempre todos para mapeo de SKUs)
-    print("📦 Extrayendo Productos...")
-    df_prod = xl.parse('ARTICULOS TECNO')
-    df_prod.columns = [str(c).upper().strip() for c in df_prod.columns]
+def build_products_rows(df_prod):
     products = []
     seen_skus = set()
     for _, row in df_prod.iterrows():
@@ -120,29 +70,17 @@ def extract_all():
             'stock': int(clean_num(row.get('STOCK'))),
             'lp1': clean_num(row.get('LP1'))
         })
-    with open(os.path.join(output_dir, 'products_seed.json'), 'w', encoding='utf-8') as f:
-        json.dump(products, f, indent=2, ensure_ascii=False)
+    return products
 
-    # 3. ENVIOS (CABE_ENVIOS) - FILTRADO POR FECHA
-    print("🚛 Extrayendo Envíos...")
-    df_env_raw = xl.parse('CABE_ENVIOS', header=None, nrows=10)
-    h_idx = 0
-    for idx, row in df_env_raw.iterrows():
-        if 'NRO ENVIO' in [str(x).upper().strip() for x in row.values]:
-            h_idx = idx
-            break
-    df_env = xl.parse('CABE_ENVIOS', header=h_idx)
-    df_env.columns = [str(c).upper().strip() for c in df_env.columns]
+def build_shipments_rows(df_env, days_filter, now):
     shipments = []
-    
-    now = datetime.now()
     for _, row in df_env.iterrows():
         s_num = row.get('NRO ENVIO')
         if pd.isna(s_num): continue
         try: s_num = int(s_num)
         except: continue
         if s_num == 0: continue
-        
+
         # Filtro de fecha
         if days_filter:
             date_val = row.get('FECHA SAL')
@@ -165,20 +103,9 @@ def extract_all():
             'cost_total': clean_num(row.get('COSTO TOT')),
             'profit': clean_num(row.get('GANANCIA'))
         })
-    with open(os.path.join(output_dir, 'shipments_seed.json'), 'w', encoding='utf-8') as f:
-        json.dump(shipments, f, indent=2, ensure_ascii=False)
-
-    # 4. PEDIDOS (CABE_VENTAS + DETA_VENTAS) - FILTRADO POR FECHA
-    print("📑 Extrayendo Pedidos y Detalles...")
-    df_cv_raw = xl.parse('CABE_VENTAS', header=None, nrows=15)
-    cv_h = 0
-    for i, r in df_cv_raw.iterrows():
-        if 'NRO_PEDIDO' in [str(x).upper().strip() for x in r.values]:
-            cv_h = i
-            break
-    df_cv = xl.parse('CABE_VENTAS', header=cv_h)
-    df_cv.columns = [str(c).upper().strip() for c in df_cv.columns]
+    return shipments
 
+def build_orders_rows(df_cv, df_dv, days_filter, now):
     # Pre-filtrar cabeceras por fecha si aplica
     if days_filter:
         def is_recent(d):
@@ -188,24 +115,7 @@ def extract_all():
         df_cv = df_cv[df_cv['FECHA'].apply(is_recent)]
         print(f"   (Filtro: {len(df_cv)} pedidos recientes identificados)")
 
-    # Header dinámico para DETA_VENTAS
-    df_dv_raw = xl.parse('DETA_VENTAS', header=None, nrows=15)
-    dv_h = 0
-    for i, r in df_dv_raw.iterrows():
-        vals = [str(x).upper().strip() for x in r.values]
-        if 'SKU' in vals or 'INV-REM' in vals:
-            dv_h = i
-            break
-    df_dv = xl.parse('DETA_VENTAS', header=dv_h)
-    df_dv.columns = [str(c).upper().strip() for c in df_dv.columns]
-    # Helper para encontrar columnas
-    def find_col(possible_names, default):
-        for p in possible_names:
-            for c in df_cv.columns:
-                if p.upper() in c.upper(): return c
-        return default
-
-    col_order_name = find_col(['INV', 'REM', 'PEDIDO', 'NRO', 'ORDEN'], 'NRO_PEDIDO')
+    col_order_name = find_column(df_cv, ['INV', 'REM', 'PEDIDO', 'NRO', 'ORDEN'], 'NRO_PEDIDO')
     recent_order_ids = set(df_cv[col_order_name].tolist())
 
     # Mapear detalles por pedido (Solo los recientes)
@@ -216,14 +126,14 @@ def extract_all():
         if pd.isna(oid): continue
         try: oid = int(oid)
         except: continue
-        
+
         if days_filter and oid not in recent_order_ids: continue
-        
+
         if oid not in det_map: det_map[oid] = []
-        
+
         st = normalize_status(clean_text(row.get('ESTADO')))
         if st != 'COMPRAR': order_status_map[oid] = st
-        
+
         det_map[oid].append({
             'sku': clean_text(row.get('SKU')),
             'quantity': int(clean_num(row.get('CANT') or row.get('CANTIDAD'))),
@@ -241,16 +151,16 @@ def extract_all():
         if pd.isna(onum): continue
         try: onum = int(onum)
         except: continue
-        
+
         items = det_map.get(onum, [])
         total = clean_num(row.get('TOTAL'))
-        
+
         # Si el total es 0 o NaN pero hay items, sumamos los items
         if (pd.isna(total) or total == 0) and items:
             total = sum(i['unit_price'] * i['quantity'] for i in items)
-            
+
         saldo = clean_num(row.get('SALDO'))
-        
+
         orders.append({
             'order_number': onum,
             'client_old_id': int(row.get('CLIENTE')) if str(row.get('CLIENTE')).isdigit() else None,
@@ -262,12 +172,354 @@ def extract_all():
             'status': order_status_map.get(onum) or normalize_status(clean_text(row.get('ESTADO'))),
             'items': items
         })
-    with open(os.path.join(output_dir, 'orders_seed.json'), 'w', encoding='utf-8') as f:
-        json.dump(orders, f, indent=2, ensure_ascii=False)
+    return orders
+
+# Opciones que llevan un valor a continuación
+VALUE_OPTIONS = {'--traza': 'trace', '--perfil': 'profile'}
+
+def parse_args(argv):
+    """[DIAS] [--filas] [--stream] [--forzar] [--delta] [--paralelo] [--cubo] [--legible|--compacto|--ndjson]
+    [--traza RUTA] [--perfil RUTA]:
+    filtro de días (0 = todo), motor fila a fila, DETA_VENTAS por lotes, re-extraer todo aunque las
+    hojas no hayan cambiado, escribir además los *_delta.json (ver seed_delta.py), una hoja por
+    proceso, generar el cubo de análisis (por defecto ANALYTICS_CUBE=1; ver analytics_cube.py),
+    formato de los seeds (por defecto SEED_FORMAT o legible; ver seed_writer.py), traza
+    JSON por etapa y perfil del proceso (por defecto SYNC_TRACE / SYNC_PROFILE; ver stage_trace.py)."""
+    argv = list(argv)
+    values = {}
+    for flag, key in VALUE_OPTIONS.items():
+        if flag in argv:
+            i = argv.index(flag)
+            values[key] = argv[i + 1] if i + 1 < len(argv) else None
+            del argv[i:i + 2]
+    opts = {
+        'days_filter': None,
+        'columnar': '--filas' not in argv,
+        'streaming': '--stream' in argv,
+        'force': '--forzar' in argv,
+        'delta': '--delta' in argv,
+        'parallel': '--paralelo' in argv,
+        'cube': '--cubo' in argv or os.environ.get('ANALYTICS_CUBE') == '1',
+        'format': next((fmt for flag, fmt in [('--legible', 'pretty'), ('--compacto', 'compact'), ('--ndjson', 'ndjson')]
+                        if flag in argv), None),
+        'trace': values.get('trace'),
+        'profile': values.get('profile'),
+    }
+    for arg in argv:
+        if arg.startswith('--'): continue
+        try:
+            opts['days_filter'] = int(arg)
+        except:
+            pass
+        break
+    return opts
+
+# --- Estado incremental: huella de cada hoja usada por cada archivo generado ---
+
+def _file_sha(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_state():
+    try:
+        with open(os.path.join(output_dir, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state):
+    write_json(os.path.join(output_dir, STATE_FILE), state, 'pretty')
+
+def _stage_params(output, params, fmt):
+    # El formato es parte de los parámetros: cambiarlo regenera el archivo
+    return dict(params, format=seed_format(output, fmt))
+
+# Código que define el contenido de los seeds: la huella de todos estos archivos va en los
+# parámetros de cada etapa (code), así un cambio en cualquiera regenera los seeds en vez de
+# reutilizar los viejos. Un módulo nuevo que limpie, arme o escriba registros va en esta lista.
+CODE_FILES = [
+    'extract_consolidated.py',
+    'extraction/*.py',
+    'status_rules.py',
+    'order_assembly.py',
+    'seed_writer.py',
+    'workbook_reader.py',
+    'sheet_cache.py',
+]
+
+def code_fingerprint(files=CODE_FILES):
+    """sha256 conjunto de CODE_FILES (nombre y contenido de cada uno; admite patrones glob)."""
+    names = sorted({os.path.relpath(path, SCRIPT_DIR)
+                    for pattern in files for path in glob.glob(os.path.join(SCRIPT_DIR, pattern))})
+    h = hashlib.sha256()
+    for name in names:
+        h.update(name.encode('utf-8') + b'\0' + _file_sha(os.path.join(SCRIPT_DIR, name)).encode('ascii'))
+    return h.hexdigest()
+
+def stage_is_fresh(state, output, inputs, params, fmt=None):
+    """El archivo sigue siendo válido si sus hojas, parámetros y código no cambiaron y nadie lo tocó."""
+    params = _stage_params(output, params, fmt)
+    entry = state.get(output)
+    path = seed_path(os.path.join(output_dir, output), fmt)
+    return (entry is not None and entry.get('inputs') == inputs and entry.get('params') == params
+            and os.path.exists(path) and entry.get('sha256') == _file_sha(path))
+
+def run_stage(state, output, inputs, params, build, force=False, fmt=None):
+    """Genera el seed (o lo reutiliza si está al día). Devuelve los registros, o None si se reutilizó."""
+    with stage(f'seed:{output}') as st:
+        if not force and stage_is_fresh(state, output, inputs, params, fmt):
+            print(f"   ⏭️ Sin cambios en {', '.join(inputs)}: se reutiliza {output}")
+            st['reused'] = True
+            # Un .json de otro formato (el del repo, en CI) no puede quedar al lado del reutilizado
+            drop_other_format(os.path.join(output_dir, output), fmt)
+            return None
+        params = _stage_params(output, params, fmt)
+        data = build()
+        st['rows_out'] = len(data)
+        with stage('write', len(data), seed=output, format=params['format']):
+            path = write_seed(os.path.join(output_dir, output), data, fmt)
+        state[output] = {'inputs': inputs, 'params': params, 'sha256': _file_sha(path)}
+        save_state(state)
+        return data
+
+def current_seeds(results):
+    """Registros de cada seed: los recién generados o, si la etapa se reutilizó, los del disco."""
+    return {name: read_seed(os.path.join(output_dir, name)) if data is None else data
+            for name, data in results.items()}
+
+def write_delta_outputs(seeds, days_filter, fmt=None):
+    """Escribe los *_delta.json contra el último snapshot aplicado en la BD. Devuelve los deltas."""
+    # Con filtro de días, envíos y pedidos son parciales: lo que falta no es una baja
+    partial = {'shipments_seed.json', 'orders_seed.json'} if days_filter else set()
+    deltas = write_deltas(output_dir, seeds, partial, fmt)
+    for name, d in deltas.items():
+        print(f"   🔁 {delta_name(name)}: +{len(d['inserts'])} altas, ~{len(d['updates'])} cambios, "
+              f"-{len(d['deletes'])} bajas")
+    return deltas
+
+def write_cube(results, seeds, deltas, days_filter):
+    """Cubo de análisis (analytics_cube.py): solo los meses que tocan los cambios si hay delta."""
+    if all(data is None for data in results.values()) and os.path.exists(os.path.join(output_dir, CUBE_FILE)):
+        print(f"   ⏭️ Sin cambios: se reutiliza {CUBE_FILE}")
+        return
+    seeds = seeds or current_seeds(results)
+    months, cells = update_cube(output_dir, seeds['orders_seed.json'], seeds['shipments_seed.json'],
+                                seeds['products_seed.json'], deltas, partial=bool(days_filter))
+    if months is None:
+        scope = 'todos los meses'
+    elif not months:
+        scope = 'ningún mes'
+    else:
+        scope = f"{len(months)} meses ({', '.join(map(str, months[:6]))}{', ...' if len(months) > 6 else ''})"
+    print(f"   📊 {CUBE_FILE}: {len(cells)} celdas, reagrupado {scope}")
+
+def drop_stale_cube(results):
+    """
+    Sin --cubo: si cambió algún seed, el cubo y sus hechos ya no corresponden y un --cubo
+    posterior los actualizaría con deltas sobre datos viejos. Se borran y esa corrida lo
+    rearma entero.
+    """
+    if all(data is None for data in results.values()):
+        return
+    for name in (CUBE_FILE, FACTS_FILE):
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"   🗑️ {name} desactualizado (sin --cubo): se borra")
+
+# --- Modo paralelo (--paralelo): cada hoja se parsea y limpia en su propio proceso ---
+
+# Tarea -> seed que la necesita
+SHEET_TASKS = {
+    'clients': 'clients_seed.json',
+    'products': 'products_seed.json',
+    'shipments': 'shipments_seed.json',
+    'order_headers': 'orders_seed.json',
+    'order_items': 'orders_seed.json',
+}
+
+def _sheet_task(path, task, days_filter, now, streaming):
+    """
+    Trabajo de un proceso del pool. Abre su propio lector (solo parsea su hoja) y devuelve
+    columnas (listas paralelas o DataFrames), que viajan al proceso principal mucho más
+    livianas que una lista de dicts; los registros y la unión de pedidos se arman allá.
+    """
+    with stage(f'task:{task}'):
+        return _run_sheet_task(open_workbook(path), task, days_filter, now, streaming)
+
+def _run_sheet_task(wb, task, days_filter, now, streaming):
+    if task == 'clients':
+        return clients_columns(wb.read_sheet('CLIENTES'))
+    if task == 'products':
+        return products_columns(wb.read_sheet('ARTICULOS TECNO'))
+    if task == 'shipments':
+        return shipments_columns(wb.read_sheet('CABE_ENVIOS'), days_filter, now)
+    if task == 'order_headers':
+        return order_headers(wb.read_sheet('CABE_VENTAS'), days_filter, now)
+    if task == 'order_items':
+        # Sin filtro de días: la ventana de pedidos la conoce el proceso de cabeceras
+        if streaming:
+            return order_items_frame(wb.iter_batches('DETA_VENTAS', batch_size=STREAM_BATCH_ROWS))
+        return order_items_frame(wb.read_sheet('DETA_VENTAS'))
+    raise ValueError(f"tarea desconocida: {task}")
+
+def _parallel_orders(futures, days_filter):
+    headers, recent_order_ids = futures['order_headers'].result()
+    items = futures['order_items'].result()
+    if days_filter:
+        items = items[items['order_id'].astype(object).isin(recent_order_ids).to_numpy()]
+    return assemble_orders(headers, items)
+
+def extract_all(columnar=None, streaming=None, force=None, delta=None, parallel=None, cube=None, argv=None):
+    """Extracción completa; las opciones salen de `argv` (por defecto, sys.argv[1:])."""
+    start_time = time.time()
+
+    # Manejo de filtros de fecha por argumento
+    opts = parse_args(sys.argv[1:] if argv is None else argv)
+    days_filter = opts['days_filter']
+    columnar = opts['columnar'] if columnar is None else columnar
+    streaming = opts['streaming'] if streaming is None else streaming
+    force = opts['force'] if force is None else force
+    delta = opts['delta'] if delta is None else delta
+    fmt = opts['format'] or default_format()
+    parallel = (opts['parallel'] if parallel is None else parallel) and columnar
+    cube = opts['cube'] if cube is None else cube
+    if days_filter and days_filter > 0:
+        print(f"⏱️ Filtrando datos de los últimos {days_filter} días...")
+    if not columnar:
+        print("🐢 Modo fila a fila (--filas)")
+    # Por entorno, así también los procesos del pool escriben en la misma traza
+    if opts['trace']:
+        os.environ['SYNC_TRACE'] = opts['trace']
+    if opts['profile']:
+        os.environ['SYNC_PROFILE'] = opts['profile']
+
+    with profiled(), stage('extract', days=days_filter, parallel=parallel, streaming=streaming):
+        if not _extract(days_filter, columnar, streaming, force, delta, fmt, parallel, cube):
+            return False
 
     end_time = time.time()
     print(f"\n✅ Extracción completa en {end_time - start_time:.2f} segundos.")
     print(f"📁 Archivos generados en {output_dir}")
+    if stage_trace.enabled():
+        print(f"\n⏱️ Etapas (traza en {stage_trace.trace_path()}):\n{stage_trace.summary(stage_trace.current_run())}")
+    return True
+
+def _extract(days_filter, columnar, streaming, force, delta, fmt, parallel, cube=False):
+    if columnar:
+        clients_fn, products_fn, shipments_fn, orders_fn = build_clients, build_products, build_shipments, build_orders
+    else:
+        clients_fn, products_fn, shipments_fn, orders_fn = build_clients_rows, build_products_rows, build_shipments_rows, build_orders_rows
+
+    print(f"🚀 Iniciando extracción consolidada desde: {excel_path}")
+
+    if not os.path.exists(excel_path):
+        print(f"❌ Error: Archivo {excel_path} not found.")
+        return False
+
+    # Huella de cada hoja (solo lee el XML del zip): las hojas sin cambios no se parsean
+    fingerprints = sheet_fingerprints(excel_path)
+    print(f"✅ Archivo cargado. Hojas encontradas: {list(fingerprints)}")
+    state = {} if force else load_state()
+
+    # Lector compartido: cada hoja que haga falta se parsea una sola vez
+    wb = open_workbook(excel_path)
+    now = datetime.now()
+    code = code_fingerprint()
+    # Con filtro de días el resultado depende también de la fecha de hoy
+    dated = {'code': code, 'days': days_filter or None,
+             'today': now.date().isoformat() if days_filter else None}
+
+    def inputs(*sheets):
+        return {sh: fingerprints.get(sh) for sh in sheets}
+
+    stages = {
+        'clients_seed.json': (inputs('CLIENTES'), {'code': code}),
+        'products_seed.json': (inputs('ARTICULOS TECNO'), {'code': code}),
+        'shipments_seed.json': (inputs('CABE_ENVIOS'), dated),
+        # CLIENTES también: los nombres de cliente se resuelven contra esa hoja
+        'orders_seed.json': (inputs('CABE_VENTAS', 'DETA_VENTAS', 'CLIENTES'),
+                             dict(dated, client_match=match_threshold())),
+    }
+
+    # Modo paralelo: se lanzan de entrada las hojas de los seeds que hay que regenerar
+    pool, futures = None, {}
+    if parallel:
+        stale = {name for name, (ins, params) in stages.items()
+                 if force or not stage_is_fresh(state, name, ins, params, fmt)}
+        tasks = [task for task, name in SHEET_TASKS.items() if name in stale]
+        if tasks:
+            workers = min(len(tasks), os.cpu_count() or 1)
+            print(f"⚡ Modo paralelo: {len(tasks)} hojas en {workers} procesos")
+            pool = ProcessPoolExecutor(max_workers=workers)
+            futures = {task: pool.submit(_sheet_task, excel_path, task, days_filter, now, streaming)
+                       for task in tasks}
+
+    results = {}
+
+    # 1. CLIENTES (Siempre cargamos todos para mapeo, son livianos)
+    print("👥 Extrayendo Clientes...")
+    results['clients_seed.json'] = run_stage(state, 'clients_seed.json', *stages['clients_seed.json'],
+              (lambda: to_records(futures['clients'].result())) if futures else
+              (lambda: clients_fn(wb.read_sheet('CLIENTES'))), force, fmt)
+
+    # 2. PRODUCTOS (Siempre todos para mapeo de SKUs)
+    print("📦 Extrayendo Productos...")
+    results['products_seed.json'] = run_stage(state, 'products_seed.json', *stages['products_seed.json'],
+              (lambda: to_records(futures['products'].result())) if futures else
+              (lambda: products_fn(wb.read_sheet('ARTICULOS TECNO'))), force, fmt)
+
+    # 3. ENVIOS (CABE_ENVIOS) - FILTRADO POR FECHA
+    print("🚛 Extrayendo Envíos...")
+    # El encabezado ('NRO ENVIO') se detecta durante la misma lectura de la hoja
+    results['shipments_seed.json'] = run_stage(state, 'shipments_seed.json', *stages['shipments_seed.json'],
+              (lambda: to_records(futures['shipments'].result())) if futures else
+              (lambda: shipments_fn(wb.read_sheet('CABE_ENVIOS'), days_filter, now)), force, fmt)
+
+    # 4. PEDIDOS (CABE_VENTAS + DETA_VENTAS) - FILTRADO POR FECHA
+    print("📑 Extrayendo Pedidos y Detalles...")
+    def build_orders_stage():
+        if futures:
+            orders = _parallel_orders(futures, days_filter)
+        else:
+            df_cv = wb.read_sheet('CABE_VENTAS')
+            # Header dinámico para DETA_VENTAS ('SKU' o 'INV-REM')
+            if streaming and columnar:
+                # Lotes perezosos: la hoja nunca está completa en memoria
+                print("   (DETA_VENTAS por lotes, --stream)")
+                df_dv = wb.iter_batches('DETA_VENTAS', batch_size=STREAM_BATCH_ROWS)
+            else:
+                df_dv = wb.read_sheet('DETA_VENTAS')
+            orders = orders_fn(df_cv, df_dv, days_filter, now)
+        # Cliente por nombre (sin código en CABE_VENTAS): old_id del cliente más parecido
+        clients = results['clients_seed.json']
+        if clients is None:
+            clients = read_seed(os.path.join(output_dir, 'clients_seed.json'))
+        orders = match_order_clients(orders, client_index(clients))
+        scores = [o['client_match_confidence'] for o in orders if o['client_match_confidence'] is not None]
+        print(f"   Cliente por nombre: {len(scores)} pedidos ({sum(c < 1 for c in scores)} por similitud)")
+        return orders
+    results['orders_seed.json'] = run_stage(state, 'orders_seed.json', *stages['orders_seed.json'],
+                                            build_orders_stage, force, fmt)
+    if pool is not None:
+        pool.shutdown()
+
+    seeds = deltas = None
+    if delta:
+        print("🔁 Calculando cambios contra la última sincronización aplicada...")
+        with stage('delta'):
+            seeds = current_seeds(results)
+            deltas = write_delta_outputs(seeds, days_filter, fmt)
+
+    if cube:
+        print("📊 Cubo de análisis (mes × cliente × marca × tipo × estado)...")
+        write_cube(results, seeds, deltas, days_filter)
+    else:
+        drop_stale_cube(results)
+    return True
 
 if __name__ == "__main__":
-    extract_all()
+    sys.exit(0 if extract_all() else 1)
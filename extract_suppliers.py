@@ -1,7 +1,6 @@
-
-import pandas as pd
-import json
-import os
+from workbook_reader import open_workbook
+from extraction import build_suppliers
+from seed_writer import write_seed
 
 # CONFIG
 excel_path = '/Users/diegorodriguez/sistema_gestion_importaciones/VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx'
@@ -11,55 +10,19 @@ sheet_name = 'PROVEEDORES'
 def extract():
     print(f"Reading {excel_path} sheet {sheet_name}...")
     try:
-        df = pd.read_excel(excel_path, sheet_name=sheet_name)
-        # Normalize
-        df.columns = [str(c).upper().strip() for c in df.columns]
+        wb = open_workbook(excel_path)
+        if sheet_name not in wb.sheet_names:
+            raise KeyError(f"Worksheet named '{sheet_name}' not found")
+        df = wb.read_sheet(sheet_name)
         print(f"Columns: {df.columns}")
 
-        suppliers = []
-        
-        # Adjust column names based on print output if needed. 
-        # Assuming typical names: NOMBRE, CONTACTO, EMAIL, DIRECCION, TEL
-        # If headers are different, script might need adjustment.
-        
-        for _, row in df.iterrows():
-            name = str(row.get('COMPAÑIA', row.get('COMPAÑIA', ''))).strip()
-            if not name or name.lower() == 'nan':
-                 continue
-                 
-            contact = str(row.get('VENDEDOR', '')).strip()
-            if contact == 'nan': contact = ''
-            
-            # No email column found
-            email = ''
-            
-            phone = str(row.get('TELEFONO', '')).strip()
-            if phone == 'nan': phone = ''
-            
-            city = str(row.get('CIUDAD', '')).strip()
-            if city == 'nan': city = ''
-            
-            state = str(row.get('ESTADO', '')).strip()
-            if state == 'nan': state = ''
-            
-            country = str(row.get('Country', '')).strip()
-            if country == 'nan': country = ''
-            
-            address = f"{city}, {state}, {country}".strip(', ')
-            
-            suppliers.append({
-                'name': name,
-                'contact': contact,
-                'email': email,
-                'phone': phone,
-                'address': address
-            })
-            
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(suppliers, f, indent=2, ensure_ascii=False)
-            
-        print(f"Saved {len(suppliers)} suppliers to {output_path}")
-        
+        # Columns: COMPAÑIA, VENDEDOR, TELEFONO, CIUDAD, ESTADO (see extraction/suppliers.py)
+        suppliers = build_suppliers(df)
+
+        output_file = write_seed(output_path, suppliers)
+
+        print(f"Saved {len(suppliers)} suppliers to {output_file}")
+
     except Exception as e:
         print(f"Error: {e}")
 
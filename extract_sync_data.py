@@ -3,6 +3,7 @@ import pandas as pd
 import json
 import os
 import sys
+from workbook_reader import open_workbook
 
 excel_path = 'VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx'
 output_path = 'webapp/sync_data.json'
@@ -12,61 +13,65 @@ def clean_value(val):
         return None
     return str(val).strip()
 
-def extract_sync_data():
-    if not os.path.exists(excel_path):
-        print(f"Error: File {excel_path} not found.")
-        sys.exit(1)
+def _as_float(val):
+    # Batches keep raw cell values (5 instead of 5.0 from a float column)
+    if isinstance(val, (int, float)) and not isinstance(val, bool):
+        return float(val)
+    return val
 
-    print("Reading Excel file...")
-    # Read DETA_VENTAS to link Orders -> Shipments
-    # Based on previous inspections, header might be row 1 (0-indexed) or changes.
-    # Let's inspect or assume standard. Usually row 1.
-    
-    try:
-        df = pd.read_excel(excel_path, sheet_name='DETA_VENTAS', header=3) 
-        
-        # Verify columns exist
-        print("Columns found:", df.columns.tolist())
-        
-        sync_data = []
-        
+def iter_sync_items(batches):
+    """Yield order -> shipment sync items from DETA_VENTAS batches."""
+    for df in batches:
         for idx, row in df.iterrows():
             try:
                 # Extract using known names
                 order_val = row.get('INV-REM')
                 shipment_val = row.get('ENVIO Nro')
                 status_val = row.get('ESTADO')
-                
+
                 if pd.notna(order_val):
                     # Clean Order - sometimes might be string like "2233" or "2233.0"
                     order_val_str = str(order_val).replace('.0', '').strip()
                     if not order_val_str.isdigit():
-                        continue 
-                        
+                        continue
+
                     order_num = int(order_val_str)
-                    
+
                     # Clean Shipment
                     shipment_num = None
                     if pd.notna(shipment_val):
                         s_str = str(shipment_val).replace('.0', '').strip()
                         if s_str.isdigit():
                             shipment_num = int(s_str)
-                    
+
                     status = str(status_val).strip() if pd.notna(status_val) else None
-                    
-                    sync_item = {
+
+                    yield {
                         'order_number': order_num,
                         'shipment_number': shipment_num,
                         'status': status,
-                        'qty': row.get('CANT'),
+                        'qty': _as_float(row.get('CANT')),
                         'desc': row.get('DETALLE'),
                         'color': row.get('COLOR')
                     }
-                    sync_data.append(sync_item)
             except Exception as e:
                 # print(f"Row error: {e}")
                 continue
 
+def extract_sync_data():
+    if not os.path.exists(excel_path):
+        print(f"Error: File {excel_path} not found.")
+        sys.exit(1)
+
+    print("Reading Excel file...")
+    # Read DETA_VENTAS to link Orders -> Shipments.
+    # The header row ('SKU'/'INV-REM') is detected by the reader instead of assuming row 3.
+
+    try:
+        # Stream the sheet in batches: the whole sheet is never held in memory
+        wb = open_workbook(excel_path)
+        sync_data = list(iter_sync_items(wb.iter_batches('DETA_VENTAS', normalize=False)))
+
         print(f"Extracted {len(sync_data)} rows.")
         
         # Filter for 2233 and 2253-2259 for verification
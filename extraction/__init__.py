@@ -0,0 +1,24 @@
+
+"""
+Extracción Excel → seeds: limpieza y mapeo de columnas compartidos por todos los extractores.
+
+    cleaners    reglas de limpieza por celda (clean_*) y por columna (col_*)
+    spec        Field: mapeo declarativo columna de la hoja → campo del seed
+    clients, products, shipments, orders, suppliers
+                los campos de cada hoja y cómo se arman sus registros
+    client_match
+                cliente de los pedidos que traen un nombre en vez del código
+
+extract_consolidated.py y los extractores sueltos (extract_clients.py, extract_products.py,
+extract_shipments.py, extract_orders.py, extract_suppliers.py) son solo puntos de entrada:
+leen las hojas con workbook_reader, llaman a build_* y escriben el seed.
+"""
+
+from extraction.client_match import ClientNameIndex, client_index, match_order_clients
+from extraction.clients import build_clients, build_clients_standalone, clients_columns
+from extraction.orders import (assemble_orders, build_order_items, build_orders, build_orders_standalone,
+                               order_headers, order_items_frame)
+from extraction.products import build_products, build_products_standalone, products_columns
+from extraction.shipments import build_shipments, build_shipments_standalone, shipments_columns
+from extraction.spec import Field, as_arrays, as_lists, clean_fields
+from extraction.suppliers import build_suppliers
@@ -0,0 +1,174 @@
+
+"""
+Limpieza de celdas de la planilla, compartida por todos los extractores.
+
+Dos versiones de cada regla:
+    clean_*   escalares, para una celda (los usa el modo fila a fila de extract_consolidated.py)
+    col_*     vectorizadas, para una columna entera; cada una devuelve exactamente lo que
+              daría su versión escalar aplicada celda por celda
+
+Además, helpers para pasar de columnas limpias a registros (to_records) o a un DataFrame
+sin inferencia de tipos (object_frame).
+"""
+
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from status_rules import normalize_statuses
+
+NULL_TOKENS = ['nan', 'none', 'null', '']
+TRUE_TOKENS = ['si', 'yes', 'ok', 's', 'true']
+
+def clean_num(n):
+    try:
+        s = str(n).replace('$', '').replace(',', '')
+        if not s or s.lower() == 'nan': return 0.0
+        val = float(s)
+        return val if not pd.isna(val) else 0.0
+    except:
+        return 0.0
+
+def clean_text(val):
+    if pd.isna(val) or val is None: return None
+    s = str(val).strip()
+    if s.lower() in ['nan', 'none', 'null', '']: return None
+    return s
+
+def clean_date(d):
+    if pd.isna(d) or str(d).lower() == 'nan': return None
+    try:
+        if isinstance(d, datetime):
+            return d.isoformat()
+        return str(d)
+    except:
+        return None
+
+# --- Columnas ---
+
+def column(df, name, default=None):
+    """Columna del DataFrame o una Serie constante si la hoja no la tiene (como row.get)."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+def find_column(df, possible_names, default):
+    """Primera columna cuyo nombre contiene alguno de `possible_names` (en ese orden)."""
+    for p in possible_names:
+        for c in df.columns:
+            if p.upper() in c.upper(): return c
+    return default
+
+def map_unique(s, fn):
+    """Aplica una función escalar una sola vez por valor distinto y la expande a toda la columna."""
+    codes, uniques = pd.factorize(s.astype(object), use_na_sentinel=True)
+    mapped = np.array([fn(u) for u in uniques] + [fn(None)], dtype=object)
+    return pd.Series(mapped[codes], index=s.index, dtype=object)
+
+def col_str(s):
+    """str(v) por celda (sin strip), incluyendo 'nan'/'None'/'NaT' para vacíos."""
+    obj = s.astype(object)
+    out = obj.astype(str).astype(object)
+    na = obj.isna()
+    if na.any():
+        out[na] = obj[na].map(str)
+    return out
+
+def col_strip(s):
+    """str(v).strip() por celda; los vacíos quedan como 'nan'."""
+    return col_str(s).str.strip()
+
+def col_text(s):
+    """clean_text por celda: texto sin espacios, None para vacíos y 'nan'/'none'/'null'."""
+    out = col_str(s).str.strip()
+    mask = s.isna().to_numpy() | out.str.lower().isin(NULL_TOKENS).to_numpy()
+    return out.where(~mask, None)
+
+def col_plain(s, empty=''):
+    """str(v).strip() por celda con 'nan' (vacío) como `empty`; el resto de los textos, tal cual."""
+    out = col_strip(s)
+    return out.where(out.str.lower() != 'nan', empty)
+
+def col_num(s):
+    """clean_num por celda: número, con '$' y ',' quitados; 0.0 si no se puede convertir."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.astype(float).fillna(0.0)
+    txt = col_str(s).str.replace('$', '', regex=False).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(txt, errors='coerce').astype(float).fillna(0.0)
+
+def col_count(s):
+    """int(clean_num(v)) por celda (cantidades, stock)."""
+    return np.trunc(col_num(s)).astype('int64')
+
+def _to_int(v):
+    try: return int(v)
+    except: return None
+
+def col_int(s):
+    """int(v) por celda; NaN o valores no convertibles quedan como <NA>."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        vals = s.astype(float)
+        vals = vals.where(np.isfinite(vals))
+        return np.trunc(vals).astype('Int64')
+    return map_unique(s, lambda v: None if v is None or pd.isna(v) else _to_int(v)).astype('Int64')
+
+def col_date(s):
+    """clean_date por celda: fecha en ISO 8601, el texto tal cual, None para vacíos."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        base = s.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        frac = s.dt.microsecond != 0
+        if frac.any():
+            base = base.where(~frac, s.dt.strftime('%Y-%m-%dT%H:%M:%S.%f'))
+        return base.astype(object).where(s.notna(), None)
+    return map_unique(s, clean_date)
+
+def col_status(s):
+    return normalize_statuses(col_text(s))
+
+def col_flag(s):
+    """Sí/no escrito a mano ('SI', 'ok', 's', 'true'...): True/False por celda."""
+    return col_str(s).str.lower().isin(TRUE_TOKENS)
+
+def col_truthy(s):
+    """`bool(v) and pd.notna(v)` por celda: con valor, que no sea '' ni 0."""
+    obj = s.astype(object)
+    return (obj.notna() & ~(obj.eq(0) | obj.eq(''))).fillna(False).astype(bool)
+
+def col_or(a, b):
+    """Equivalente a `row.get(a) or row.get(b)`: usa b donde a es 0 o cadena vacía."""
+    obj = a.astype(object)
+    falsy = obj.eq(0) | obj.eq('')
+    if not falsy.any():
+        return a
+    return obj.where(~falsy, b.astype(object))
+
+def col_datetimes(s):
+    """Solo las celdas que son fechas reales (datetime/Timestamp); el resto NaT."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    is_dt = s.map(lambda v: isinstance(v, (datetime, pd.Timestamp)))
+    return pd.to_datetime(s.where(is_dt), errors='coerce')
+
+def date_window(fechas, now, days):
+    """
+    Máscara de las filas con fecha dentro de los últimos `days` días (o sin fecha), igual
+    que `(now - fecha).days <= days`.
+    """
+    values = fechas.to_numpy(dtype='datetime64[ns]')
+    # (now - f).days <= days  <=>  f > now - (days + 1) días
+    cutoff = np.datetime64(now - timedelta(days=days + 1), 'ns')
+    return np.isnat(values) | (values > cutoff)
+
+# --- De columnas a registros ---
+
+def to_records(columns):
+    """Arma la lista de dicts (en orden de columnas) a partir de listas paralelas."""
+    keys = list(columns.keys())
+    return [dict(zip(keys, vals)) for vals in zip(*columns.values())]
+
+def object_frame(columns):
+    """DataFrame a partir de arrays sin inferir tipos: las columnas object siguen siendo object
+    (pandas convertiría las de texto a str y los None a NaN)."""
+    return pd.DataFrame({k: pd.Series(v, dtype=object) if v.dtype == object else v for k, v in columns.items()})
+
+def na_to_none(s):
+    return [None if v is pd.NA else v for v in s.tolist()]
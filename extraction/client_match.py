@@ -0,0 +1,158 @@
+
+"""
+Clientes por nombre: cuando CABE_VENTAS.CLIENTE trae un nombre en vez del código, el
+pedido sale con client_name_match y hasta ahora solo se resolvía por igualdad exacta
+(trim + mayúsculas) en la carga; si no, quedaba el cliente 1.
+
+ClientNameIndex se arma una vez por corrida sobre los clientes de CLIENTES (old_id y
+nombre) con dos índices:
+    exacto     nombre plegado (sin acentos ni signos, mayúsculas, espacios simples) -> old_id
+    trigramas  trigrama -> filas que lo contienen (índice invertido); los trigramas son
+               por palabra, como pg_trgm, así el orden de las palabras no importa
+
+Los nombres de relleno ('nan' que deja col_strip en una celda vacía, 'None', vacío) no
+se indexan ni se buscan. Un nombre que en CLIENTES tiene dos códigos distintos es ambiguo:
+no entra al índice exacto ni se busca por trigramas (empataría consigo mismo entre los
+dos clientes) y el pedido queda como estaba, igual que con cualquier empate.
+
+Cada nombre distinto se busca una sola vez: primero exacto (confianza 1.0) y si no, por
+trigramas, comparando solo contra los clientes que comparten alguno (no contra toda la
+lista). La similitud es la de Jaccard entre los conjuntos de trigramas; por debajo del
+umbral, o con un empate entre dos clientes distintos (no dos filas del mismo old_id), el
+pedido queda como estaba.
+
+match_order_clients completa client_old_id y client_match_confidence en los pedidos;
+con client_old_id la carga (seed_load.py, seed_fast.ts) ya no depende del nombre.
+"""
+
+import os
+import unicodedata
+import numpy as np
+import pandas as pd
+from stage_trace import traced
+
+DEFAULT_THRESHOLD = 0.6
+# Nombres plegados que no son nombres: celdas vacías convertidas a texto
+PLACEHOLDER_NAMES = frozenset({'NAN', 'NONE', 'NULL', 'NAT'})
+
+def match_threshold():
+    """Similitud mínima (CLIENT_MATCH_THRESHOLD, por defecto DEFAULT_THRESHOLD)."""
+    return float(os.environ.get('CLIENT_MATCH_THRESHOLD', DEFAULT_THRESHOLD))
+
+def fold_name(name):
+    """'  José  Pérez (Rosario) ' -> 'JOSE PEREZ ROSARIO'."""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch if ch.isalnum() else ' ' for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.upper().split())
+
+def fold_names(names):
+    """fold_name por valor distinto; vacíos, None y PLACEHOLDER_NAMES quedan como None."""
+    s = pd.Series(names, dtype=object)
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    folded = [fold_name(u) for u in uniques]
+    folded = np.array([f if f and f not in PLACEHOLDER_NAMES else None for f in folded] + [None],
+                      dtype=object)
+    return folded[codes]
+
+def trigrams(folded):
+    """Trigramas de cada palabra con dos espacios adelante y uno atrás (como pg_trgm)."""
+    grams = set()
+    for word in folded.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class ClientNameIndex:
+    """Índice de nombres de CLIENTES: exacto y por trigramas."""
+
+    def __init__(self, old_ids, names):
+        folded = fold_names(names)
+        ids = pd.array(old_ids, dtype='Int64')
+        keep = pd.notna(folded) & ~ids.isna()
+        # Una fila por nombre y código: el mismo nombre con dos códigos queda dos veces
+        table = (pd.DataFrame({'name': folded[keep], 'old_id': ids[keep]})
+                 .drop_duplicates(['name', 'old_id'])
+                 .sort_values('old_id', kind='stable')
+                 .reset_index(drop=True))
+        self.names = table['name'].to_numpy(dtype=object)
+        self.old_ids = table['old_id'].to_numpy(dtype='int64')
+        # Exacto solo para los nombres de un único código; los otros son ambiguos
+        shared = table['name'].duplicated(keep=False).to_numpy()
+        self.ambiguous = frozenset(self.names[shared])
+        self.exact = pd.Series(np.flatnonzero(~shared), index=pd.Index(self.names[~shared], dtype=object))
+
+        postings, sizes = {}, np.empty(len(self.names), dtype='int64')
+        for row, name in enumerate(self.names):
+            grams = trigrams(name)
+            sizes[row] = len(grams)
+            for g in grams:
+                postings.setdefault(g, []).append(row)
+        self.sizes = sizes
+        self.postings = {g: np.array(rows, dtype='int64') for g, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def best(self, folded):
+        """(fila, similitud) del cliente más parecido a un nombre ya plegado, o (None, 0.0)."""
+        grams = trigrams(folded)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return None, 0.0
+        rows, shared = np.unique(np.concatenate(hits), return_counts=True)
+        scores = shared / (len(grams) + self.sizes[rows] - shared)
+        top = scores.max()
+        winners = rows[scores == top]
+        if len(np.unique(self.old_ids[winners])) > 1:
+            # Empate entre clientes distintos: no hay forma de elegir. Si todas las filas
+            # empatadas son del mismo old_id (el cliente cargado con dos grafías), es ese
+            return None, float(top)
+        return int(winners[0]), float(top)
+
+    def match(self, names, threshold=None):
+        """
+        old_id y confianza para cada nombre (arrays object: None sin coincidencia).
+        Cada nombre distinto se busca una vez.
+        """
+        threshold = match_threshold() if threshold is None else threshold
+        folded = fold_names(names)
+        codes, uniques = pd.factorize(pd.Series(folded, dtype=object), use_na_sentinel=True)
+        pos = self.exact.index.get_indexer(pd.Index(uniques, dtype=object))
+        rows = np.full(len(uniques), -1, dtype='int64')
+        rows[pos >= 0] = self.exact.to_numpy()[pos[pos >= 0]]
+        scores = np.where(rows >= 0, 1.0, 0.0)
+        for i in np.flatnonzero(rows < 0):
+            if uniques[i] in self.ambiguous:
+                continue
+            row, score = self.best(uniques[i])
+            if row is not None and score >= threshold:
+                rows[i], scores[i] = row, score
+
+        found = rows >= 0
+        ids = np.full(len(uniques) + 1, None, dtype=object)
+        conf = np.full(len(uniques) + 1, None, dtype=object)
+        ids[:-1][found] = self.old_ids[rows[found]].tolist()
+        conf[:-1][found] = np.round(scores[found], 3).tolist()
+        # codes == -1 (sin nombre) cae en la última posición: None
+        return ids[codes], conf[codes]
+
+def client_index(clients):
+    """Índice a partir de los registros de clients_seed.json (old_id y name)."""
+    return ClientNameIndex([c.get('old_id') for c in clients], [c.get('name') for c in clients])
+
+@traced('match:clients')
+def match_order_clients(orders, index, threshold=None):
+    """
+    Completa client_old_id en los pedidos que solo traen client_name_match y agrega
+    client_match_confidence a todos (None si el código vino de la hoja o no hubo
+    coincidencia). Modifica y devuelve `orders`.
+    """
+    pending = [o for o in orders if o.get('client_old_id') is None and o.get('client_name_match')]
+    for o in orders:
+        o['client_match_confidence'] = None
+    if pending and len(index):
+        ids, conf = index.match([o['client_name_match'] for o in pending], threshold)
+        for o, old_id, c in zip(pending, ids, conf):
+            if old_id is not None:
+                o['client_old_id'], o['client_match_confidence'] = old_id, c
+    return orders
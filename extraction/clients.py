@@ -0,0 +1,48 @@
+
+"""
+CLIENTES → clients_seed.json.
+
+CLIENT_FIELDS es el seed de extract_consolidated.py (vacíos como None). El extractor
+suelto (extract_clients.py) escribe los textos vacíos como '' y el tipo faltante como
+'CLIENTE': STANDALONE_CLIENT_FIELDS.
+"""
+
+from extraction.cleaners import col_int, col_plain, col_strip, col_text, to_records
+from extraction.spec import Field, as_lists, clean_fields
+from stage_trace import traced
+
+SHEET = 'CLIENTES'
+
+CLIENT_FIELDS = (
+    Field('old_id', 'COD_CLI', col_int),
+    Field('name', 'NOMBRE Y APELLIDO', col_strip, default=''),
+    Field('email', 'MAIL', col_text),
+    Field('phone', 'TELEFONO', col_text),
+    Field('type', 'TIPO CLI', col_text, fill='CLIENTE'),
+    Field('address', 'DIRECCION', col_text),
+)
+
+STANDALONE_CLIENT_FIELDS = (
+    Field('old_id', 'COD_CLI', col_int),
+    Field('name', 'NOMBRE Y APELLIDO', col_strip, default=''),
+    Field('email', 'MAIL', col_plain),
+    Field('phone', 'TELEFONO', col_plain),
+    Field('type', 'TIPO CLI', lambda s: col_plain(s, empty='CLIENTE')),
+    Field('address', 'DIRECCION', col_plain),
+)
+
+def _client_columns(df_clients, fields):
+    cols = clean_fields(df_clients, fields)
+    # Con código numérico y nombre
+    keep = (cols['old_id'].notna() & (cols['name'] != '')).to_numpy()
+    return as_lists(cols, keep)
+
+@traced('clean:clients')
+def clients_columns(df_clients):
+    return _client_columns(df_clients, CLIENT_FIELDS)
+
+def build_clients(df_clients):
+    return to_records(clients_columns(df_clients))
+
+def build_clients_standalone(df_clients):
+    return to_records(_client_columns(df_clients, STANDALONE_CLIENT_FIELDS))
@@ -0,0 +1,223 @@
+
+"""
+CABE_VENTAS + DETA_VENTAS → orders_seed.json (cabeceras con sus items).
+
+ITEM_FIELDS son los campos de cada item (una fila de DETA_VENTAS con número de pedido)
+en el seed de extract_consolidated.py; el pedido se arma uniendo cabeceras e items con
+order_assembly. El extractor suelto (extract_orders.py) agrega proveedor e invoice de
+compra a cada item y el envío al pedido: STANDALONE_ITEM_FIELDS y
+build_orders_standalone.
+"""
+
+import numpy as np
+import pandas as pd
+from extraction.cleaners import (col_count, col_date, col_datetimes, col_int, col_num, col_or,
+                                 col_status, col_str, col_text, column, date_window, find_column,
+                                 na_to_none, object_frame, to_records)
+from extraction.spec import Field, as_arrays, clean_fields
+from order_assembly import attach_items, group_items
+from status_rules import normalize_statuses
+from stage_trace import traced
+
+HEADER_SHEET = 'CABE_VENTAS'
+DETAIL_SHEET = 'DETA_VENTAS'
+
+ITEM_FIELDS = (
+    Field('sku', 'SKU', col_text),
+    Field('quantity', ('CANT', 'CANTIDAD'), col_count),
+    Field('unit_price', ('VTA UNI', 'PRECIO'), col_num),
+    Field('unit_cost', ('COSTO', 'COSTO X ART'), col_num),
+    Field('profit', 'GANANCIA', col_num),
+    Field('product_name', 'DETALLE', col_text),
+    Field('shipment_number', 'ENVIO NRO', col_int),
+    Field('status', 'ESTADO', col_status),
+)
+
+def _invoice_text(s):
+    """Invoice como texto, sin el '.0' que deja un número leído como float."""
+    text = col_text(s)
+    return text.where(text.isna(), text.str.replace('.0', '', regex=False))
+
+STANDALONE_ITEM_FIELDS = (
+    Field('sku', 'SKU', col_text, fill=''),
+    Field('quantity', ('CANT', 'CANTIDAD'), col_count),
+    Field('unit_price', ('VTA UNI', 'PRECIO'), col_num),
+    Field('unit_cost', ('COSTO', 'COSTO X ART'), col_num),
+    Field('profit', 'GANANCIA', col_num),
+    Field('product_name', 'DETALLE', col_text),
+    Field('shipment_number', 'ENVIO NRO', col_int),
+    Field('supplier_name', 'SUPPLIER', col_text),
+    Field('purchase_invoice', 'INVOICE', _invoice_text),
+    Field('status', 'ESTADO', normalize_statuses),
+)
+
+def _order_ids(df_dv):
+    return col_int(col_or(column(df_dv, 'INV-REM'), column(df_dv, 'NRO_PEDIDO')))
+
+def build_order_items(df_dv, recent_order_ids=None, fields=ITEM_FIELDS):
+    """Items de DETA_VENTAS (hoja completa o un lote): un DataFrame con el pedido y los campos del item."""
+    oids = _order_ids(df_dv)
+    keep = oids.notna()
+    if recent_order_ids is not None:
+        keep &= oids.astype(object).isin(recent_order_ids)
+    keep = keep.fillna(False).to_numpy(dtype=bool)
+    if not keep.all():
+        # Semi-join con los pedidos de la ventana: las demás columnas se limpian solo en esas filas
+        df_dv, oids = df_dv[keep], oids[keep]
+
+    return object_frame({'order_id': oids.astype('int64').to_numpy(),
+                         **as_arrays(clean_fields(df_dv, fields))})
+
+@traced('clean:order_items')
+def order_items_frame(df_dv, recent_order_ids=None):
+    """Items de toda la hoja: un DataFrame completo o un generador de lotes (modo --stream)."""
+    details = [df_dv] if isinstance(df_dv, pd.DataFrame) else df_dv
+    frames = [build_order_items(batch, recent_order_ids) for batch in details]
+    return pd.concat(frames, ignore_index=True) if frames else build_order_items(pd.DataFrame())
+
+@traced('clean:order_headers')
+def order_headers(df_cv, days_filter, now):
+    """Cabeceras de CABE_VENTAS ya limpias y los números de pedido de la ventana (para filtrar detalles)."""
+    if days_filter:
+        df_cv = df_cv[date_window(col_datetimes(column(df_cv, 'FECHA')), now, days_filter)]
+        print(f"   (Filtro: {len(df_cv)} pedidos recientes identificados)")
+
+    col_order_name = find_column(df_cv, ['INV', 'REM', 'PEDIDO', 'NRO', 'ORDEN'], 'NRO_PEDIDO')
+    recent_order_ids = pd.unique(df_cv[col_order_name].astype(object).to_numpy())
+
+    onums = col_int(column(df_cv, 'NRO_PEDIDO'))
+    hkeep = onums.notna().to_numpy()
+    df_cv = df_cv[hkeep]
+    cliente = column(df_cv, 'CLIENTE')
+    is_code = col_str(cliente).str.isdigit().to_numpy()
+    headers = object_frame({
+        'order_number': onums[hkeep].astype('int64').to_numpy(),
+        'client_old_id': np.array([int(v) if d else None for v, d in zip(col_str(cliente).tolist(), is_code)], dtype=object),
+        'client_name_match': np.array(col_text(cliente).where(~is_code, None).tolist(), dtype=object),
+        'date': col_date(column(df_cv, 'FECHA')).to_numpy(dtype=object),
+        'total': col_num(column(df_cv, 'TOTAL')).to_numpy(),
+        'saldo': col_num(column(df_cv, 'SALDO')).to_numpy(),
+        'payment_method': col_text(column(df_cv, 'METODO')).to_numpy(dtype=object),
+        'header_status': col_status(column(df_cv, 'ESTADO')).to_numpy(dtype=object)
+    })
+    return headers, recent_order_ids
+
+@traced('join:orders')
+def assemble_orders(headers, items):
+    # Un agrupamiento de los items y un merge con las cabeceras
+    orders = attach_items(headers, group_items(items, key='order_id'), on='order_number')
+
+    # Si el total es 0 o NaN pero hay items, sumamos los items
+    total = orders['total'].to_numpy()
+    use_items = ((total == 0) | np.isnan(total)) & (orders['item_count'].to_numpy() > 0)
+    total = np.where(use_items, orders['items_total'].to_numpy(), total)
+    # max(0, total - saldo): el 0 queda entero, como en la versión fila a fila
+    paid = total - orders['saldo'].to_numpy()
+    payment = paid.astype(object)
+    payment[~(paid > 0)] = 0
+    status = orders['status'].to_numpy(dtype=object, copy=True)
+    no_status = pd.isna(status)
+    status[no_status] = orders['header_status'].to_numpy(dtype=object)[no_status]
+
+    return to_records({
+        'order_number': orders['order_number'].tolist(),
+        'client_old_id': orders['client_old_id'].tolist(),
+        'client_name_match': orders['client_name_match'].tolist(),
+        'date': orders['date'].tolist(),
+        'total_amount': total.tolist(),
+        'payment_amount': payment.tolist(),
+        'payment_method': orders['payment_method'].tolist(),
+        'status': status.tolist(),
+        'items': orders['items'].tolist()
+    })
+
+def build_orders(df_cv, df_dv, days_filter, now):
+    headers, recent_order_ids = order_headers(df_cv, days_filter, now)
+    items = order_items_frame(df_dv, recent_order_ids if days_filter else None)
+    return assemble_orders(headers, items)
+
+# --- Extractor suelto (extract_orders.py) ---
+
+def _date_str(val):
+    return val.isoformat() if hasattr(val, 'isoformat') else str(val)
+
+def standalone_header_columns(df_head):
+    """Columnas de CABE_VENTAS que usa extract_orders.py, buscadas por nombre parcial."""
+    cols = {
+        'order': find_column(df_head, ['INV', 'REM', 'PEDIDO', 'NRO', 'ORDEN'], 'NRO_PEDIDO'),
+        'client': find_column(df_head, ['CLIENTE', 'NOMBRE'], 'CLIENTE'),
+        'date': find_column(df_head, ['FECHA', 'DATE'], 'FECHA'),
+        'status': find_column(df_head, ['ESTADO', 'STATUS'], 'ESTADO'),
+        'total': find_column(df_head, ['TOTAL'], 'TOTAL'),
+        'saldo': find_column(df_head, ['SALDO', 'DEUDA'], 'SALDO'),
+        'method': find_column(df_head, ['METODO', 'FORMA', 'PAGO'], 'METODO'),
+        'shipment': next((c for c in df_head.columns if 'ENVIO' in c and 'NRO' not in c), None),
+    }
+    if not cols['shipment']:
+        cols['shipment'] = find_column(df_head, ['ENVIO', 'SHIP'], 'ENVIO')
+    return cols
+
+def build_orders_standalone(df_head, df_det, cols=None):
+    """Pedidos con items (proveedor e invoice de compra incluidos) y envío, heredado de los
+    items si la cabecera no lo tiene. El estado sale de los items (último distinto de
+    COMPRAR) y, si no hay, de la cabecera."""
+    cols = cols or standalone_header_columns(df_head)
+    items = build_order_items(df_det, fields=STANDALONE_ITEM_FIELDS)
+    # Sin DETALLE, el nombre del producto es el SKU
+    items['product_name'] = items['product_name'].where(items['product_name'].notna(), items['sku'])
+
+    # Items agrupados por pedido una sola vez: listas, último estado distinto de COMPRAR, primer envío
+    grouped = group_items(items, key='order_id', shipment='shipment_number')
+
+    order_numbers = col_int(column(df_head, cols['order']))
+    keep = order_numbers.notna().to_numpy()
+    df_head, order_numbers = df_head[keep], order_numbers[keep]
+
+    # Cliente: código numérico -> client_old_id, si no el nombre limpio
+    client_val = column(df_head, cols['client'])
+    client_ids = col_int(client_val)
+    client_names = col_text(client_val).where(client_ids.isna(), None)
+
+    # Pagado = total - saldo (lo que todavía debe), nunca negativo
+    total_val = col_num(column(df_head, cols['total'])).to_numpy()
+    payment_amount = (total_val - col_num(column(df_head, cols['saldo'])).to_numpy()).astype(object)
+    payment_amount[payment_amount < 0] = 0
+
+    header_status = col_str(column(df_head, cols['status'], 'COMPRAR'))
+    header_status = normalize_statuses(header_status).where(header_status != 'nan', 'COMPRAR')
+
+    headers = object_frame({
+        'order_number': order_numbers.astype('int64').to_numpy(),
+        'client_old_id': np.array(na_to_none(client_ids), dtype=object),
+        'client_name_match': np.array(client_names.tolist(), dtype=object),
+        'date': column(df_head, cols['date']).astype(object).map(_date_str).to_numpy(dtype=object),
+        'total_amount': total_val,
+        'payment_amount': payment_amount,
+        'payment_method': col_text(column(df_head, cols['method'])).fillna('').to_numpy(dtype=object),
+        'header_status': header_status.to_numpy(dtype=object),
+        'header_shipment': np.array(na_to_none(col_int(column(df_head, cols['shipment']))), dtype=object)
+    })
+    merged = attach_items(headers, grouped, on='order_number')
+
+    # Estado: el de los items; si no hay, el de la cabecera
+    final_status = merged['status'].to_numpy(dtype=object, copy=True)
+    missing = pd.isna(final_status)
+    final_status[missing] = merged['header_status'].to_numpy(dtype=object)[missing]
+
+    # Envío: el de la cabecera; si no tiene, el primero de los items
+    shipment_number = merged['header_shipment'].to_numpy(dtype=object, copy=True)
+    inherit = np.array([not v for v in shipment_number], dtype=bool) & merged['shipment_number'].notna().to_numpy()
+    shipment_number[inherit] = merged['shipment_number'].to_numpy(dtype=object)[inherit]
+
+    return to_records({
+        'order_number': merged['order_number'].tolist(),
+        'client_old_id': merged['client_old_id'].tolist(),
+        'client_name_match': merged['client_name_match'].tolist(),
+        'date': merged['date'].tolist(),
+        'total_amount': merged['total_amount'].tolist(),
+        'payment_amount': merged['payment_amount'].tolist(),
+        'payment_method': merged['payment_method'].tolist(),
+        'status': final_status.tolist(),
+        'items': merged['items'].tolist(),
+        'shipment_number': shipment_number.tolist()
+    })
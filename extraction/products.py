@@ -0,0 +1,77 @@
+
+"""
+ARTICULOS TECNO → products_seed.json.
+
+Un producto por SKU (gana la primera fila; SKU vacío o 'nan'/'none' se descarta).
+PRODUCT_FIELDS es el seed de extract_consolidated.py; el extractor suelto
+(extract_products.py) agrega costos, listas de precio y el flag de activo:
+STANDALONE_PRODUCT_FIELDS. Ahí los artículos de tipo REPUESTO quedan inactivos y
+DISCONTINUADO.
+"""
+
+from extraction.cleaners import col_count, col_num, col_str, col_strip, col_text, column, to_records
+from extraction.spec import Field, as_lists, clean_fields
+from stage_trace import traced
+
+SHEET = 'ARTICULOS TECNO'
+
+def col_active(s):
+    """Activo salvo que la celda diga NO o FALSE."""
+    upper = col_str(s).str.upper()
+    inactive = s.notna() & (upper.str.contains('NO', regex=False) | upper.str.contains('FALSE', regex=False))
+    return ~inactive.astype(bool)
+
+PRODUCT_FIELDS = (
+    Field('sku', 'SKU', col_strip, default=''),
+    Field('name', 'NOMBRE ARTICULO', col_strip),
+    Field('color_grade', 'COLOR/GRADE', col_text),
+    Field('type', 'TIPO', col_text, fill='PRODUCTO'),
+    Field('model', 'MODELO', col_text),
+    Field('brand', 'MARCA', col_text),
+    Field('weight', 'PESO KG', col_num),
+    Field('status', 'ESTADO', col_text, fill='ACTIVO'),
+    Field('stock', 'STOCK', col_count),
+    Field('lp1', 'LP1', col_num),
+)
+
+STANDALONE_PRODUCT_FIELDS = (
+    Field('sku', 'SKU', col_strip, default=''),
+    Field('name', 'NOMBRE ARTICULO', col_strip),
+    Field('color_grade', 'COLOR/GRADE', col_text),
+    Field('type', 'TIPO', col_text, fill='PRODUCTO'),
+    Field('model', 'MODELO', col_text),
+    Field('brand', 'MARCA', col_text),
+    Field('weight', 'PESO KG', col_num, default=0),
+    Field('volum', 'VOLUM', col_num, default=0),
+    Field('status', 'ESTADO', col_text, fill='ACTIVO'),
+    Field('last_purchase_cost', 'ULT CPRA', col_num, default=0),
+    Field('active', 'ACTIVO', col_active),
+    Field('webpage', 'WEBPAGE', col_text, fill=''),
+    Field('lp1', 'LP1', col_num, default=0),
+    Field('lp2', 'LP2', col_num, default=0),
+    Field('lp3', 'LP3', col_num, default=0),
+)
+
+def _product_columns(df_prod, fields):
+    cols = clean_fields(df_prod, fields)
+    skus = cols['sku']
+    valid = ~skus.str.lower().isin(['nan', 'none', ''])
+    keep = (valid & ~skus.where(valid).duplicated()).to_numpy()
+    if 'NOMBRE ARTICULO' not in df_prod.columns:
+        cols['name'] = skus
+    return cols, keep
+
+@traced('clean:products')
+def products_columns(df_prod):
+    cols, keep = _product_columns(df_prod, PRODUCT_FIELDS)
+    return as_lists(cols, keep)
+
+def build_products(df_prod):
+    return to_records(products_columns(df_prod))
+
+def build_products_standalone(df_prod):
+    cols, keep = _product_columns(df_prod, STANDALONE_PRODUCT_FIELDS)
+    spare_part = cols['type'].str.upper().str.contains('REPUESTO', regex=False)
+    cols['active'] = cols['active'] & ~spare_part
+    cols['status'] = cols['status'].where(~spare_part, 'DISCONTINUADO')
+    return to_records(as_lists(cols, keep))
@@ -0,0 +1,79 @@
+
+"""
+CABE_ENVIOS → shipments_seed.json.
+
+Solo los envíos con NRO ENVIO numérico y distinto de 0. SHIPMENT_FIELDS es el seed de
+extract_consolidated.py (con filtro de días opcional por FECHA SAL). El extractor suelto
+(extract_shipments.py) guarda los textos tal cual (str de la celda), agrega cliente,
+cantidad de artículos, invoice y pago, y cuando LLEGO? está vacío deduce el estado de
+las fechas: STANDALONE_SHIPMENT_FIELDS.
+"""
+
+import numpy as np
+from extraction.cleaners import (col_count, col_date, col_datetimes, col_flag, col_int, col_num,
+                                 col_status, col_str, col_text, col_truthy, column, date_window,
+                                 to_records)
+from extraction.spec import Field, as_lists, clean_fields
+from status_rules import DEFAULT_STATUS, normalize_statuses
+from stage_trace import traced
+
+SHEET = 'CABE_ENVIOS'
+
+SHIPMENT_FIELDS = (
+    Field('shipment_number', 'NRO ENVIO', col_int),
+    Field('old_client_id', 'COD CLI', col_int),
+    Field('forwarder', 'FORWARDER', col_text),
+    Field('date_shipped', 'FECHA SAL', col_date),
+    Field('date_arrived', 'FECHA LLEG', col_date),
+    Field('weight_fw', 'PESO', col_num),
+    Field('weight_cli', 'PESO.1', col_num),
+    Field('type_load', 'TIPO CARGA', col_text),
+    Field('status', 'LLEGO?', col_status),
+    Field('notes', 'OBSERVACION', col_text),
+    Field('price_total', 'ENVIO COB', col_num),
+    Field('cost_total', 'COSTO TOT', col_num),
+    Field('profit', 'GANANCIA', col_num),
+)
+
+STANDALONE_SHIPMENT_FIELDS = (
+    Field('shipment_number', 'NRO ENVIO', col_int),
+    Field('client_id', 'COD CLI', col_int),
+    Field('old_client_id', 'COD CLI', col_int),
+    Field('forwarder', 'FORWARDER', col_str, default=''),
+    Field('date_shipped', 'FECHA SAL', col_date),
+    Field('date_arrived', 'FECHA LLEG', col_date),
+    Field('weight_fw', 'PESO', col_num),
+    Field('weight_cli', 'PESO.1', col_num),
+    Field('type_load', 'TIPO CARGA', col_str, default=''),
+    Field('item_count', 'CANT ART', col_count, default=0),
+    Field('cost_total', 'COSTO TOT', col_num),
+    Field('price_total', 'ENVIO COB', col_num),
+    Field('profit', 'GANANCIA', col_num),
+    Field('invoice', 'INVOICE', col_str, default=''),
+    Field('status', 'LLEGO?', normalize_statuses),
+    Field('notes', 'OBSERVACION', col_str, default=''),
+    Field('is_paid', 'PAGO?', col_flag, default=''),
+)
+
+def _shipment_keep(cols):
+    numbers = cols['shipment_number']
+    return (numbers.notna() & (numbers != 0)).fillna(False).to_numpy(dtype=bool)
+
+@traced('clean:shipments')
+def shipments_columns(df_env, days_filter, now):
+    if days_filter:
+        # Primero la ventana de fechas: el resto de las columnas se limpia solo en ese rango
+        df_env = df_env[date_window(col_datetimes(column(df_env, 'FECHA SAL')), now, days_filter)]
+    cols = clean_fields(df_env, SHIPMENT_FIELDS)
+    return as_lists(cols, _shipment_keep(cols))
+
+def build_shipments(df_env, days_filter, now):
+    return to_records(shipments_columns(df_env, days_filter, now))
+
+def build_shipments_standalone(df_env):
+    cols = clean_fields(df_env, STANDALONE_SHIPMENT_FIELDS)
+    # Sin estado en LLEGO?: llegó si tiene fecha de llegada, en tránsito si salió, si no en Miami
+    inferred = np.where(col_truthy(column(df_env, 'FECHA LLEG')), 'EN BSAS',
+                        np.where(col_truthy(column(df_env, 'FECHA SAL')), 'EN TRANSITO', 'MIAMI'))
+    cols['status'] = cols['status'].where(cols['status'] != DEFAULT_STATUS, inferred)
+    return to_records(as_lists(cols, _shipment_keep(cols)))
@@ -0,0 +1,69 @@
+
+"""
+Mapeo declarativo hoja → campos del seed.
+
+Cada campo dice de qué columna sale, con qué limpieza y qué poner si falta:
+
+    Field('weight', 'PESO KG', col_num)
+    Field('quantity', ('CANT', 'CANTIDAD'), col_count)       # la primera con valor (col_or)
+    Field('type', 'TIPO', col_text, fill='PRODUCTO')          # None -> 'PRODUCTO'
+    Field('name', 'NOMBRE Y APELLIDO', col_strip, default='') # columna ausente -> ''
+
+clean_fields aplica la lista a un DataFrame y devuelve las columnas limpias (Series,
+alineadas con la hoja) para que cada extractor filtre o ajuste lo que haga falta; después
+as_lists / as_arrays las convierten al formato de salida (listas para registros, arrays
+para DataFrames de items).
+"""
+
+import numpy as np
+import pandas as pd
+from extraction.cleaners import col_or, column, na_to_none
+
+class Field:
+    __slots__ = ('name', 'source', 'clean', 'default', 'fill')
+
+    def __init__(self, name, source, clean=None, default=None, fill=None):
+        self.name = name
+        # Nombre de columna, o tupla de alternativas: vale la primera que no sea 0 ni ''
+        self.source = source
+        self.clean = clean
+        self.default = default
+        self.fill = fill
+
+    def __repr__(self):
+        return f'Field({self.name!r}, {self.source!r})'
+
+    def read(self, df):
+        if isinstance(self.source, tuple):
+            first, *rest = self.source
+            s = column(df, first, self.default)
+            for name in rest:
+                s = col_or(s, column(df, name, self.default))
+        else:
+            s = column(df, self.source, self.default)
+        if self.clean is not None:
+            s = self.clean(s)
+        if self.fill is not None:
+            s = s.fillna(self.fill)
+        return s
+
+def clean_fields(df, fields):
+    """{campo: Serie limpia} en el orden de `fields`."""
+    return {f.name: f.read(df) for f in fields}
+
+def _array(s):
+    if isinstance(s.dtype, pd.Int64Dtype):
+        # Enteros con faltantes: int de Python o None, como los espera el seed
+        return np.array(na_to_none(s), dtype=object)
+    if s.dtype == object or isinstance(s.dtype, pd.StringDtype):
+        return s.to_numpy(dtype=object)
+    return s.to_numpy()
+
+def as_arrays(columns, keep=None):
+    """Columnas como arrays de numpy (object para textos y enteros con faltantes), solo las
+    filas de `keep` (máscara booleana) si se indica."""
+    return {name: _array(s if keep is None else s[keep]) for name, s in columns.items()}
+
+def as_lists(columns, keep=None):
+    """Columnas como listas de valores de Python, listas para to_records."""
+    return {name: arr.tolist() for name, arr in as_arrays(columns, keep).items()}
@@ -0,0 +1,35 @@
+
+"""
+PROVEEDORES → suppliers_seed.json (extract_suppliers.py).
+
+La hoja no tiene mail: el campo va vacío. La dirección es 'CIUDAD, ESTADO', como la
+armaba extract_suppliers.py: el script original buscaba la columna 'Country' después de
+pasar los encabezados a mayúsculas, así que el país nunca llegaba a la dirección.
+"""
+
+import pandas as pd
+from extraction.cleaners import col_plain, to_records
+from extraction.spec import Field, as_lists, clean_fields
+
+SHEET = 'PROVEEDORES'
+
+SUPPLIER_FIELDS = (
+    Field('name', 'COMPAÑIA', col_plain, default=''),
+    Field('contact', 'VENDEDOR', col_plain, default=''),
+    Field('phone', 'TELEFONO', col_plain, default=''),
+    Field('city', 'CIUDAD', col_plain, default=''),
+    Field('state', 'ESTADO', col_plain, default=''),
+)
+
+def build_suppliers(df):
+    cols = clean_fields(df, SUPPLIER_FIELDS)
+    keep = (cols['name'] != '').to_numpy()
+    # f"{city}, {state}, {country}".strip(', ') con el país siempre vacío
+    address = (cols['city'] + ', ' + cols['state'] + ', ').str.strip(', ')
+    return to_records(as_lists({
+        'name': cols['name'],
+        'contact': cols['contact'],
+        'email': pd.Series('', index=cols['name'].index, dtype=object),
+        'phone': cols['phone'],
+        'address': address,
+    }, keep))
@@ -1,27 +1,31 @@
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
+from workbook_reader import open_workbook
 
 excel_path = '/Users/diegorodriguez/sistema_gestion_importaciones/VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx'
 
 try:
     # --- INSPECT DETA_VENTAS ---
     print("\n--- Inspecting DETA_VENTAS ---")
-    df = pd.read_excel(excel_path, sheet_name='DETA_VENTAS', header=None, nrows=15)
+    # One pass over the sheet; raw preview and parsed frame come from the same read
+    wb = open_workbook(excel_path)
+    df = pd.DataFrame(wb.raw_rows('DETA_VENTAS', nrows=15)).replace('', np.nan)
     print("First 15 rows raw to find header:")
     print(df.head(15))
     
     header_row = 0
     # Try to find header
     for i, row in df.iterrows():
-        row_str_list = row.astype(str).str.upper().tolist()
+        row_str_list = [str(x).upper() for x in row.values]
         if any('NRO' in x for x in row_str_list) or any('ORDER' in x for x in row_str_list):
             print(f"Potential Header at Row {i}: {row_str_list}")
             header_row = i
             break
             
     print(f"Ventas Header Row: {header_row}")
-    df_v = pd.read_excel(excel_path, sheet_name='DETA_VENTAS', header=header_row, nrows=50)
+    df_v = wb.read_sheet('DETA_VENTAS', header=header_row, normalize=False).head(50)
     print("Columns:", df_v.columns.tolist())
     
     # Check for relevant columns
@@ -0,0 +1,88 @@
+
+"""
+Armado de pedidos: une las cabeceras (CABE_VENTAS) con sus items (DETA_VENTAS).
+
+En vez de ir agregando cada fila de detalle a un diccionario por pedido, los items
+se agrupan con un solo ordenamiento estable por número de pedido (los items de cada
+pedido quedan en el orden de la hoja) y los datos por pedido se calculan como
+agregados vectorizados:
+
+    items            lista de dicts del pedido
+    status           último estado distinto de COMPRAR (NaN si no hay)
+    items_total      suma de unit_price * quantity
+    shipment_number  primer envío informado en los items (opcional)
+
+Después se pegan a las cabeceras con un único merge por número de pedido.
+"""
+
+import numpy as np
+import pandas as pd
+
+SKIP_STATUS = 'COMPRAR'
+
+def _group_bounds(codes):
+    """Orden estable por grupo y los cortes [inicio, fin) de cada uno."""
+    order = np.argsort(codes, kind='stable')
+    cuts = np.flatnonzero(np.diff(codes[order])) + 1
+    starts = np.concatenate(([0], cuts))
+    ends = np.concatenate((cuts, [len(order)]))
+    return order, starts, ends
+
+def group_items(items, key='order_id', status='status', shipment=None):
+    """
+    Agrupa un DataFrame de items (una fila por item, columna `key` con el pedido).
+    Los campos del dict de cada item son todas las columnas salvo `key`, en su orden.
+    Devuelve un DataFrame indexado por pedido, en orden de primera aparición.
+    """
+    fields = [c for c in items.columns if c != key]
+    out_cols = ['items', 'status', 'items_total'] + (['shipment_number'] if shipment else [])
+    if items.empty:
+        return pd.DataFrame(columns=out_cols, index=pd.Index([], name=key))
+
+    codes, uniques = pd.factorize(items[key])
+    order, starts, ends = _group_bounds(codes)
+
+    # Dicts de items ya ordenados por pedido: cada pedido es un tramo contiguo
+    columns = [items[c].iloc[order].tolist() for c in fields]
+    records = [dict(zip(fields, vals)) for vals in zip(*columns)]
+    grouped = [records[s:e] for s, e in zip(starts, ends)]
+
+    # Suma en el orden de la hoja, igual que sum() sobre la lista de items
+    # (np.add.at acumula secuencialmente, sin sumas por pares)
+    totals = np.zeros(len(uniques))
+    amounts = items['unit_price'].to_numpy(dtype=float) * items['quantity'].to_numpy()
+    np.add.at(totals, codes, amounts)
+
+    statuses = items[status].to_numpy(dtype=object)
+    counts = statuses != SKIP_STATUS
+    last_status = pd.Series(statuses[counts]).groupby(codes[counts]).last()
+
+    result = pd.DataFrame({
+        'items': grouped,
+        'status': last_status.reindex(range(len(uniques))).to_numpy(dtype=object),
+        'items_total': totals,
+    }, index=pd.Index(uniques, name=key))
+
+    if shipment:
+        ships = items[shipment].to_numpy(dtype=object)
+        # Primer envío "verdadero" (no None/NaN/0) de cada pedido
+        informed = np.array([bool(v) and not pd.isna(v) for v in ships], dtype=bool)
+        first = pd.Series(ships[informed]).groupby(codes[informed]).first()
+        result['shipment_number'] = first.reindex(range(len(uniques))).to_numpy(dtype=object)
+    return result
+
+def attach_items(headers, grouped, on):
+    """
+    Une las cabeceras con los agregados por pedido (merge izquierdo: conserva el orden y
+    las cabeceras repetidas). Los pedidos sin items quedan con lista vacía y total 0.
+    """
+    merged = headers.merge(grouped, how='left', left_on=on, right_index=True, suffixes=('', '_items'))
+    no_items = merged['items'].isna().to_numpy()
+    if no_items.any():
+        items = merged['items'].to_numpy(dtype=object, copy=True)
+        for i in np.flatnonzero(no_items):
+            items[i] = []
+        merged['items'] = items
+    merged['items_total'] = merged['items_total'].fillna(0.0)
+    merged['item_count'] = [len(v) for v in merged['items']]
+    return merged
@@ -0,0 +1,120 @@
+
+"""
+Salida diferencial de la extracción: solo altas, cambios y bajas respecto de la
+última extracción ya aplicada a la base de datos.
+
+Por cada seed se guarda un snapshot {clave natural: hash del registro} y se escribe
+<entidad>_delta.json con:
+    {"key": "order_number", "full": false,
+     "inserts": [...], "updates": [...], "deletes": [claves]}
+
+El snapshot nuevo queda "pendiente" (.seed_snapshot.pending.json) hasta que el paso
+de aplicación (seed_fast.ts con SEED_DELTA=1) termina bien y lo confirma; así, si la
+carga a la BD falla, la próxima extracción vuelve a incluir esos cambios.
+
+Los ids de la BD que agrega seed_resolve.py (RESOLVED_FIELDS, en el registro y en sus
+items) no entran en el hash: resolver un seed no lo hace aparecer como cambiado.
+
+Si la clave natural se repite en el Excel (p.ej. dos filas con el mismo pedido), se
+trata el grupo completo como un solo registro: cualquier cambio emite todas sus filas.
+"""
+
+import hashlib
+import json
+import os
+from seed_writer import write_json
+
+# Archivo seed -> clave natural
+DELTA_KEYS = {
+    'clients_seed.json': 'old_id',
+    'products_seed.json': 'sku',
+    'shipments_seed.json': 'shipment_number',
+    'orders_seed.json': 'order_number',
+}
+SNAPSHOT_FILE = '.seed_snapshot.json'
+PENDING_FILE = '.seed_snapshot.pending.json'
+
+# Ids agregados por seed_resolve.py
+RESOLVED_FIELDS = ('clientId', 'productId', 'shipmentId', 'supplierId')
+
+def _without_ids(rec):
+    rec = {k: v for k, v in rec.items() if k not in RESOLVED_FIELDS}
+    if rec.get('items'):
+        rec['items'] = [{k: v for k, v in item.items() if k not in RESOLVED_FIELDS} for item in rec['items']]
+    return rec
+
+def record_hash(records):
+    payload = json.dumps([_without_ids(rec) for rec in records], sort_keys=True, ensure_ascii=False,
+                         separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def delta_name(seed_name):
+    return seed_name.replace('_seed.json', '_delta.json')
+
+def _group(records, key):
+    groups = {}
+    for rec in records:
+        # Las claves del snapshot son texto (JSON); 12 y '12' no se mezclan en la práctica
+        groups.setdefault(str(rec.get(key)), []).append(rec)
+    return groups
+
+def compute_delta(records, key, previous, partial=False):
+    """
+    Compara los registros actuales con los hashes anteriores.
+    partial=True (extracción filtrada por días): lo que no aparece no es una baja y los
+    hashes anteriores se conservan.
+    Devuelve (delta, hashes nuevos).
+    """
+    groups = _group(records, key)
+    hashes = dict(previous) if partial else {}
+    inserts, updates = [], []
+    for k, recs in groups.items():
+        h = record_hash(recs)
+        hashes[k] = h
+        if k not in previous:
+            inserts.extend(recs)
+        elif previous[k] != h:
+            updates.extend(recs)
+    deletes = [] if partial else [_key_value(k, key) for k in previous if k not in groups]
+    delta = {'key': key, 'full': not previous, 'inserts': inserts, 'updates': updates, 'deletes': deletes}
+    return delta, hashes
+
+def _key_value(k, key):
+    # Claves numéricas vuelven como número en las bajas
+    if key != 'sku':
+        try: return int(k)
+        except ValueError: pass
+    return k
+
+def load_snapshot(output_dir, name=SNAPSHOT_FILE):
+    try:
+        with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_deltas(output_dir, seeds, partial=(), fmt=None):
+    """
+    seeds: {nombre del seed: lista de registros}. Escribe los *_delta.json (legibles o
+    compactos según `fmt`, ver seed_writer.py) y el snapshot pendiente.
+    Devuelve {nombre del seed: delta}.
+    """
+    base = load_snapshot(output_dir)
+    pending = dict(base)
+    deltas = {}
+    for name, records in seeds.items():
+        key = DELTA_KEYS[name]
+        delta, hashes = compute_delta(records, key, base.get(name, {}), partial=name in partial)
+        write_json(os.path.join(output_dir, delta_name(name)), delta, 'compact' if fmt == 'ndjson' else fmt)
+        pending[name] = hashes
+        deltas[name] = delta
+    write_json(os.path.join(output_dir, PENDING_FILE), pending, 'compact')
+    return deltas
+
+def commit_snapshot(output_dir):
+    """Confirma el snapshot pendiente (después de aplicar los deltas en la BD)."""
+    pending = os.path.join(output_dir, PENDING_FILE)
+    if not os.path.exists(pending):
+        return False
+    os.replace(pending, os.path.join(output_dir, SNAPSHOT_FILE))
+    return True
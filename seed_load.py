@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Carga de los seeds en PostgreSQL por conjuntos: la alternativa en Python a
+webapp/prisma/seed_fast.ts, sin una consulta por cliente, producto, envío, pedido,
+item o movimiento.
+
+Cada seed va por COPY ... FROM STDIN a una tabla temporal (staging), escrito a medida
+que se lee el archivo (.json o .ndjson, ver seed_writer.py), y de ahí a las tablas de
+Prisma con INSERT ... ON CONFLICT (clave natural) DO UPDATE ... WHERE cambió:
+
+    clients    por old_id; de un cliente existente solo se actualizan nombre y tipo
+               (mail, teléfono, etc. se editan en la app y no se pisan)
+    products   por sku; todos los campos del seed
+    shipments  por shipment_number; el cliente sale de old_client_id
+    orders     por order_number; cliente por client_old_id o, si no hay, por nombre
+               (como seed_fast.ts, sin coincidencia queda el cliente 1). Un pedido
+               cambió si es nuevo o si difieren la cabecera, los items (huella de todos
+               sus campos) o los movimientos CARGO/PAGO; solo de esos se borran y
+               rearman los items y los movimientos, todos juntos en unas pocas
+               sentencias
+
+Si los seeds pasaron por seed_resolve.py, cada registro trae los ids de la BD
+(clientId, productId, shipmentId, supplierId) y se usan tal cual; los joins por
+clave natural quedan solo para lo que no vino resuelto (p.ej. un cliente que se
+crea en esta misma carga).
+
+Todo corre en una transacción: si algo falla la BD queda como estaba. Al terminar
+confirma el snapshot pendiente de seed_delta.py, igual que seed_fast.ts.
+
+Diferencias con seed_fast.ts: el CARGO es el total guardado en el pedido (que suma
+los items cuando el Excel trae 0), los movimientos de un pedido se buscan por su
+referencia exacta (no por "contiene", que mezclaba el #12 con el #123) y un SKU que
+no está en Product deja el item sin producto en lugar de cortar la carga.
+
+La conexión es SEED_DATABASE_URL o, si no está, DIRECT_URL / DATABASE_URL de
+webapp/.env; para probar alcanza con un PostgreSQL local con el esquema de Prisma
+(`npx prisma db push`).
+
+Uso:
+    python3 seed_load.py [--delta] [--seeds DIR]
+    python3 -m sync_cli load [--delta] [--seeds DIR]
+
+    --delta (o SEED_DELTA=1): solo altas y cambios de los *_delta.json, si existen
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from seed_delta import PENDING_FILE, SNAPSHOT_FILE, delta_name
+from seed_writer import existing_seed_path, iter_seed
+from stage_trace import stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SEEDS_DIR = os.path.join(SCRIPT_DIR, 'webapp', 'prisma')
+
+# Tabla de staging -> columnas del seed con su tipo. Todas llevan además seq, la
+# posición del registro en el seed: si la clave se repite gana el último. clientId,
+# productId, etc. son los ids que agrega seed_resolve.py (vacíos si no se resolvió).
+STAGING = {
+    'stage_clients': [('old_id', 'bigint'), ('name', 'text'), ('email', 'text'), ('phone', 'text'),
+                      ('type', 'text'), ('address', 'text')],
+    'stage_products': [('sku', 'text'), ('name', 'text'), ('color_grade', 'text'), ('type', 'text'),
+                       ('model', 'text'), ('brand', 'text'), ('weight', 'float8'), ('status', 'text'),
+                       ('stock', 'bigint'), ('lp1', 'float8')],
+    'stage_shipments': [('shipment_number', 'bigint'), ('old_client_id', 'bigint'), ('forwarder', 'text'),
+                        ('date_shipped', 'timestamp'), ('date_arrived', 'timestamp'), ('weight_fw', 'float8'),
+                        ('weight_cli', 'float8'), ('type_load', 'text'), ('status', 'text'), ('notes', 'text'),
+                        ('price_total', 'float8'), ('cost_total', 'float8'), ('profit', 'float8'),
+                        ('clientId', 'bigint')],
+    'stage_orders': [('order_number', 'bigint'), ('client_old_id', 'bigint'), ('client_name_match', 'text'),
+                     ('date', 'timestamp'), ('total_amount', 'float8'), ('payment_amount', 'float8'),
+                     ('payment_method', 'text'), ('status', 'text'), ('clientId', 'bigint')],
+    # Items de cada pedido: seq es el del pedido y pos el orden dentro de él
+    'stage_items': [('pos', 'bigint'), ('sku', 'text'), ('product_name', 'text'), ('quantity', 'bigint'),
+                    ('unit_price', 'float8'), ('unit_cost', 'float8'), ('profit', 'float8'),
+                    ('shipment_number', 'bigint'), ('status', 'text'), ('productId', 'bigint'),
+                    ('shipmentId', 'bigint'), ('supplierId', 'bigint')],
+}
+
+MERGE_CLIENTS = '''
+    INSERT INTO "Client" ("old_id", "name", "email", "phone", "type", "address", "updatedAt")
+    SELECT DISTINCT ON (old_id) old_id, name, email, phone, type, address, now()
+    FROM stage_clients
+    WHERE old_id IS NOT NULL AND name IS NOT NULL
+    ORDER BY old_id, seq DESC
+    ON CONFLICT ("old_id") DO UPDATE
+        SET "name" = EXCLUDED."name", "type" = EXCLUDED."type", "updatedAt" = now()
+        WHERE ("Client"."name", "Client"."type") IS DISTINCT FROM (EXCLUDED."name", EXCLUDED."type")
+    RETURNING (xmax = 0) AS inserted'''
+
+MERGE_PRODUCTS = '''
+    INSERT INTO "Product" ("sku", "name", "color_grade", "type", "model", "brand", "weight", "status",
+                           "stock", "lp1", "updatedAt")
+    SELECT DISTINCT ON (sku) sku, COALESCE(name, sku), color_grade, type, model, brand, weight, status,
+           COALESCE(stock, 0), lp1, now()
+    FROM stage_products
+    WHERE sku IS NOT NULL AND sku <> ''
+    ORDER BY sku, seq DESC
+    ON CONFLICT ("sku") DO UPDATE
+        SET "name" = EXCLUDED."name", "color_grade" = EXCLUDED."color_grade", "type" = EXCLUDED."type",
+            "model" = EXCLUDED."model", "brand" = EXCLUDED."brand", "weight" = EXCLUDED."weight",
+            "status" = EXCLUDED."status", "stock" = EXCLUDED."stock", "lp1" = EXCLUDED."lp1",
+            "updatedAt" = now()
+        WHERE ("Product"."name", "Product"."color_grade", "Product"."type", "Product"."model",
+               "Product"."brand", "Product"."weight", "Product"."status", "Product"."stock", "Product"."lp1")
+            IS DISTINCT FROM
+              (EXCLUDED."name", EXCLUDED."color_grade", EXCLUDED."type", EXCLUDED."model",
+               EXCLUDED."brand", EXCLUDED."weight", EXCLUDED."status", EXCLUDED."stock", EXCLUDED."lp1")
+    RETURNING (xmax = 0) AS inserted'''
+
+MERGE_SHIPMENTS = '''
+    INSERT INTO "Shipment" ("shipment_number", "clientId", "forwarder", "date_shipped", "date_arrived",
+                            "weight_fw", "weight_cli", "type_load", "status", "notes", "price_total",
+                            "cost_total", "profit", "updatedAt")
+    SELECT DISTINCT ON (s.shipment_number) s.shipment_number, COALESCE(s."clientId", c.id), s.forwarder, s.date_shipped,
+           s.date_arrived, s.weight_fw, s.weight_cli, s.type_load, s.status, s.notes, s.price_total,
+           s.cost_total, s.profit, now()
+    FROM stage_shipments s
+    LEFT JOIN "Client" c ON s."clientId" IS NULL AND c."old_id" = s.old_client_id
+    WHERE s.shipment_number IS NOT NULL
+    ORDER BY s.shipment_number, s.seq DESC
+    ON CONFLICT ("shipment_number") DO UPDATE
+        SET "clientId" = EXCLUDED."clientId", "forwarder" = EXCLUDED."forwarder",
+            "date_shipped" = EXCLUDED."date_shipped", "date_arrived" = EXCLUDED."date_arrived",
+            "weight_fw" = EXCLUDED."weight_fw", "weight_cli" = EXCLUDED."weight_cli",
+            "type_load" = EXCLUDED."type_load", "status" = EXCLUDED."status", "notes" = EXCLUDED."notes",
+            "price_total" = EXCLUDED."price_total", "cost_total" = EXCLUDED."cost_total",
+            "profit" = EXCLUDED."profit", "updatedAt" = now()
+        WHERE ("Shipment"."clientId", "Shipment"."forwarder", "Shipment"."date_shipped",
+               "Shipment"."date_arrived", "Shipment"."weight_fw", "Shipment"."weight_cli",
+               "Shipment"."type_load", "Shipment"."status", "Shipment"."notes", "Shipment"."price_total",
+               "Shipment"."cost_total", "Shipment"."profit")
+            IS DISTINCT FROM
+              (EXCLUDED."clientId", EXCLUDED."forwarder", EXCLUDED."date_shipped", EXCLUDED."date_arrived",
+               EXCLUDED."weight_fw", EXCLUDED."weight_cli", EXCLUDED."type_load", EXCLUDED."status",
+               EXCLUDED."notes", EXCLUDED."price_total", EXCLUDED."cost_total", EXCLUDED."profit")
+    RETURNING (xmax = 0) AS inserted'''
+
+# Pedidos resueltos: un registro por número (el último del seed), con el cliente de la BD
+# (el clientId del seed o, si no vino resuelto, por código o nombre),
+# la fecha (sin fecha: la que ya tenía, o ahora) y el total (0 con items: la suma de los items)
+RESOLVE_ORDERS = '''
+    CREATE TEMP TABLE load_orders ON COMMIT DROP AS
+    SELECT DISTINCT ON (s.order_number)
+           s.seq, s.order_number,
+           COALESCE(s."clientId", c.id, n.id, 1) AS client_id,
+           COALESCE(s.date, o."date", now()::timestamp(3)) AS date,
+           s.status,
+           CASE WHEN COALESCE(s.total_amount, 0) = 0 AND it.count > 0 THEN it.total
+                ELSE COALESCE(s.total_amount, 0) END AS total_amount,
+           COALESCE(s.payment_amount, 0) AS payment_amount,
+           s.payment_method
+    FROM stage_orders s
+    LEFT JOIN "Client" c ON s."clientId" IS NULL AND c."old_id" = s.client_old_id
+    LEFT JOIN (SELECT DISTINCT ON (upper(btrim("name"))) upper(btrim("name")) AS name_key, id
+               FROM "Client" ORDER BY upper(btrim("name")), id DESC) n
+           ON s."clientId" IS NULL AND s.client_old_id IS NULL AND n.name_key = upper(btrim(s.client_name_match))
+    LEFT JOIN (SELECT seq, count(*) AS count, sum(unit_price * quantity ORDER BY pos) AS total
+               FROM stage_items GROUP BY seq) it ON it.seq = s.seq
+    LEFT JOIN "Order" o ON o."order_number" = s.order_number
+    WHERE s.order_number IS NOT NULL
+    ORDER BY s.order_number, s.seq DESC'''
+
+# Items de esos pedidos con producto, envío y proveedor ya resueltos, tal como se van a insertar
+RESOLVE_ITEMS = '''
+    CREATE TEMP TABLE load_items ON COMMIT DROP AS
+    SELECT l.order_number, i.pos, COALESCE(i."productId", p.id) AS product_id,
+           COALESCE(NULLIF(i.product_name, ''), i.sku, '') AS product_name,
+           COALESCE(i.quantity, 0) AS quantity,
+           COALESCE(i.unit_price, 0) AS unit_price,
+           COALESCE(i.unit_cost, 0) AS unit_cost,
+           COALESCE(i.unit_price, 0) * COALESCE(i.quantity, 0) AS subtotal,
+           COALESCE(i.profit, 0) AS profit,
+           COALESCE(i."shipmentId", sh.id) AS shipment_id,
+           i."supplierId" AS supplier_id,
+           i.status
+    FROM load_orders l
+    JOIN stage_items i ON i.seq = l.seq
+    LEFT JOIN "Product" p ON i."productId" IS NULL AND p."sku" = i.sku
+    LEFT JOIN "Shipment" sh ON i."shipmentId" IS NULL AND sh."shipment_number" = i.shipment_number'''
+
+# Huella de los items de un pedido: la misma expresión para la BD y para el seed
+# (format deja NULL como vacío, así cada campo ocupa siempre su lugar)
+_ITEM_PRINT = '''md5(string_agg(format('%s|%s|%s|%s|%s|%s|%s|%s|%s', {product_id}, {product_name}, {quantity},
+                                         round({unit_price}::numeric, 4), round({unit_cost}::numeric, 4),
+                                         round({profit}::numeric, 4), {shipment_id}, {supplier_id}, {status}),
+                                  E'\\n' ORDER BY {order}))'''
+
+CHANGED_ORDERS = f'''
+    CREATE TEMP TABLE changed_orders ON COMMIT DROP AS
+    WITH tx AS (SELECT "reference", sum("amount") AS amount
+                FROM "Transaction" WHERE "reference" LIKE 'Order #%' GROUP BY "reference")
+    SELECT l.order_number
+    FROM load_orders l
+    LEFT JOIN "Order" o ON o."order_number" = l.order_number
+    LEFT JOIN (SELECT order_number,
+                      {_ITEM_PRINT.format(product_id='product_id', product_name='product_name',
+                                          quantity='quantity', unit_price='unit_price',
+                                          unit_cost='unit_cost', profit='profit',
+                                          shipment_id='shipment_id', supplier_id='supplier_id',
+                                          status='status', order='pos')} AS print
+               FROM load_items GROUP BY order_number) si ON si.order_number = l.order_number
+    LEFT JOIN (SELECT "orderId",
+                      {_ITEM_PRINT.format(product_id='"productId"', product_name='"productName"',
+                                          quantity='"quantity"', unit_price='"unit_price"',
+                                          unit_cost='"unit_cost"', profit='"profit"',
+                                          shipment_id='"shipmentId"', supplier_id='"supplierId"',
+                                          status='"status"', order='id')} AS print
+               FROM "OrderItem" GROUP BY "orderId") oi ON oi."orderId" = o.id
+    LEFT JOIN tx cargo ON cargo."reference" = 'Order #' || l.order_number
+    LEFT JOIN tx pago ON pago."reference" = 'Order #' || l.order_number || ' - Pago'
+    WHERE o.id IS NULL
+       OR (o."clientId", o."date", o."status", o."total_amount", o."paymentMethod")
+          IS DISTINCT FROM (l.client_id, l.date, l.status, l.total_amount, l.payment_method)
+       OR si.print IS DISTINCT FROM oi.print
+       OR round(COALESCE(cargo.amount, 0)::numeric, 4) <> round(GREATEST(l.total_amount, 0)::numeric, 4)
+       OR round(COALESCE(pago.amount, 0)::numeric, 4) <> round(LEAST(-l.payment_amount, 0)::numeric, 4)'''
+
+MERGE_ORDERS = '''
+    INSERT INTO "Order" ("order_number", "clientId", "date", "status", "total_amount", "paymentMethod",
+                         "updatedAt")
+    SELECT l.order_number, l.client_id, l.date, l.status, l.total_amount, l.payment_method, now()
+    FROM load_orders l
+    JOIN changed_orders USING (order_number)
+    ON CONFLICT ("order_number") DO UPDATE
+        SET "clientId" = EXCLUDED."clientId", "date" = EXCLUDED."date", "status" = EXCLUDED."status",
+            "total_amount" = EXCLUDED."total_amount", "paymentMethod" = EXCLUDED."paymentMethod",
+            "updatedAt" = now()
+        WHERE ("Order"."clientId", "Order"."date", "Order"."status", "Order"."total_amount",
+               "Order"."paymentMethod")
+            IS DISTINCT FROM
+              (EXCLUDED."clientId", EXCLUDED."date", EXCLUDED."status", EXCLUDED."total_amount",
+               EXCLUDED."paymentMethod")
+    RETURNING (xmax = 0) AS inserted'''
+
+DELETE_ITEMS = '''
+    DELETE FROM "OrderItem" i
+    USING "Order" o, changed_orders c
+    WHERE i."orderId" = o.id AND o."order_number" = c.order_number'''
+
+INSERT_ITEMS = '''
+    INSERT INTO "OrderItem" ("orderId", "productId", "productName", "quantity", "unit_price", "unit_cost",
+                             "subtotal", "profit", "shipmentId", "supplierId", "status")
+    SELECT o.id, i.product_id, i.product_name, i.quantity, i.unit_price, i.unit_cost, i.subtotal,
+           i.profit, i.shipment_id, i.supplier_id, i.status
+    FROM load_items i
+    JOIN changed_orders USING (order_number)
+    JOIN "Order" o ON o."order_number" = i.order_number
+    ORDER BY i.order_number, i.pos'''
+
+DELETE_TRANSACTIONS = '''
+    DELETE FROM "Transaction" t
+    USING changed_orders c
+    WHERE t."reference" IN ('Order #' || c.order_number, 'Order #' || c.order_number || ' - Pago')'''
+
+INSERT_TRANSACTIONS = '''
+    INSERT INTO "Transaction" ("clientId", "date", "type", "amount", "description", "reference")
+    SELECT o."clientId", o."date", 'CARGO', o."total_amount",
+           'Compra - Pedido #' || o."order_number", 'Order #' || o."order_number"
+    FROM "Order" o JOIN changed_orders c ON c.order_number = o."order_number"
+    WHERE o."total_amount" > 0
+    UNION ALL
+    SELECT o."clientId", o."date", 'PAGO', -l.payment_amount,
+           btrim('Pago ' || COALESCE(l.payment_method, '')), 'Order #' || o."order_number" || ' - Pago'
+    FROM "Order" o JOIN changed_orders c ON c.order_number = o."order_number"
+    JOIN load_orders l ON l.order_number = o."order_number"
+    WHERE l.payment_amount > 0'''
+
+def database_url():
+    """SEED_DATABASE_URL o la URL de webapp/.env (DIRECT_URL primero: sin el pooler)."""
+    url = os.getenv('SEED_DATABASE_URL')
+    if url:
+        return url
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(SCRIPT_DIR, 'webapp', '.env'))
+    return os.getenv('DIRECT_URL') or os.getenv('DATABASE_URL')
+
+# --- Seeds -> COPY ---
+
+def load_records(seed_dir, name, use_delta):
+    """Registros a aplicar: altas y cambios del *_delta.json (si use_delta y existe) o el seed completo."""
+    delta_path = os.path.join(seed_dir, delta_name(name))
+    if use_delta and os.path.exists(delta_path):
+        with open(delta_path, encoding='utf-8') as f:
+            delta = json.load(f)
+        print(f"   🔁 {os.path.basename(delta_path)}: +{len(delta['inserts'])} ~{len(delta['updates'])} "
+              f"-{len(delta['deletes'])}")
+        if delta['deletes']:
+            # Las bajas se informan pero no se borran: la BD conserva el historial
+            print(f"      ⚠️ {len(delta['deletes'])} {delta['key']} ya no están en el Excel (no se eliminan)")
+        return delta['inserts'] + delta['updates']
+    path = existing_seed_path(os.path.join(seed_dir, name))
+    if path is None:
+        return None
+    # El seed se recorre al escribir el COPY, sin cargarlo entero
+    return iter_seed(path)
+
+def _timestamp(value):
+    # Como parseSafeDate de seed_fast.ts: una fecha inválida queda vacía
+    try:
+        return datetime.fromisoformat(str(value)).isoformat(sep=' ')
+    except ValueError:
+        return None
+
+def copy_value(value, kind):
+    """Valor en el formato de texto de COPY (\\N es NULL)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return '\\N'
+    if kind == 'timestamp':
+        value = _timestamp(value)
+        if value is None:
+            return '\\N'
+    elif kind == 'bigint' and isinstance(value, float):
+        value = int(value)
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+class CopyStream:
+    """Archivo de solo lectura sobre un generador de líneas: COPY lo consume de a bloques."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buf = bytearray()
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buf += line.encode('utf-8')
+        if size < 0:
+            size = len(self._buf)
+        chunk = bytes(self._buf[:size])
+        del self._buf[:size]
+        return chunk
+
+def _kinds(table):
+    return ['bigint', *(kind for _, kind in STAGING[table])]
+
+def copy_line(values, kinds):
+    return '\t'.join(copy_value(v, kind) for v, kind in zip(values, kinds)) + '\n'
+
+def _record_rows(records, table):
+    names = [name for name, _ in STAGING[table]]
+    kinds = _kinds(table)
+    for seq, rec in enumerate(records):
+        yield copy_line([seq, *(rec.get(name) for name in names)], kinds)
+
+def copy_into(cur, table, source):
+    """Crea la tabla de staging y la llena con un COPY desde un archivo o un generador de líneas."""
+    cur.execute(f"CREATE TEMP TABLE {table} (seq bigint, "
+                + ', '.join(f'"{name}" {kind}' for name, kind in STAGING[table]) + ") ON COMMIT DROP")
+    cur.copy_expert(f"COPY {table} FROM STDIN", source if hasattr(source, 'read') else CopyStream(source))
+    # Las tablas temporales no se analizan solas: sin estadísticas los joins salen mal planificados
+    cur.execute(f"ANALYZE {table}")
+    cur.execute(f"SELECT count(*) FROM {table}")
+    return cur.fetchone()[0]
+
+def copy_orders(cur, records):
+    """
+    Cabeceras e items en una sola pasada por el seed: las cabeceras van directo al COPY
+    y los items a un temporal (en memoria hasta 64 MB) que se copia después.
+    """
+    names = [name for name, _ in STAGING['stage_orders']]
+    item_names = [name for name, _ in STAGING['stage_items'][1:]]
+    kinds, item_kinds = _kinds('stage_orders'), _kinds('stage_items')
+    with tempfile.SpooledTemporaryFile(max_size=64 << 20) as items:
+        def headers():
+            for seq, rec in enumerate(records):
+                for pos, item in enumerate(rec.get('items') or ()):
+                    line = copy_line([seq, pos, *(item.get(n) for n in item_names)], item_kinds)
+                    items.write(line.encode('utf-8'))
+                yield copy_line([seq, *(rec.get(n) for n in names)], kinds)
+        orders = copy_into(cur, 'stage_orders', headers())
+        items.seek(0)
+        return orders, copy_into(cur, 'stage_items', items)
+
+def _merge(cur, sql):
+    cur.execute(f"WITH merged AS ({sql}) "
+                "SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged")
+    return cur.fetchone()
+
+# --- Carga ---
+
+def load_entity(cur, label, table, records, merge_sql):
+    with stage(f"load:{table[len('stage_'):]}") as st:
+        st['rows_in'] = copy_into(cur, table, _record_rows(records, table))
+        inserted, updated = _merge(cur, merge_sql)
+        st.update(inserted=inserted, updated=updated)
+    print(f"   {label}: {st['rows_in']} en el seed, {inserted} nuevos, {updated} actualizados")
+    return inserted, updated
+
+def load_orders(cur, records):
+    with stage('load:orders') as st:
+        st['rows_in'], st['items_in'] = copy_orders(cur, records)
+        cur.execute(RESOLVE_ORDERS)
+        cur.execute(RESOLVE_ITEMS)
+        cur.execute(CHANGED_ORDERS)
+        cur.execute("SELECT count(*) FROM changed_orders")
+        st['changed'] = changed = cur.fetchone()[0]
+        inserted, updated = _merge(cur, MERGE_ORDERS)
+        cur.execute(DELETE_ITEMS)
+        cur.execute(INSERT_ITEMS)
+        st['items'] = items = cur.rowcount
+        cur.execute(DELETE_TRANSACTIONS)
+        cur.execute(INSERT_TRANSACTIONS)
+        st['transactions'] = transactions = cur.rowcount
+    print(f"   pedidos: {st['rows_in']} en el seed, {changed} con cambios ({inserted} nuevos, "
+          f"{updated} con otra cabecera); {items} items y {transactions} movimientos rearmados")
+    return changed
+
+def confirm_snapshot(seed_dir):
+    # La próxima extracción calcula cambios desde este punto (ver seed_delta.py)
+    pending = os.path.join(seed_dir, PENDING_FILE)
+    if os.path.exists(pending):
+        os.replace(pending, os.path.join(seed_dir, SNAPSHOT_FILE))
+
+def load_seeds(conn, seed_dir=SEEDS_DIR, use_delta=False):
+    """Aplica clientes, productos, envíos y pedidos en una transacción y confirma el snapshot."""
+    entities = [
+        ('clientes', 'clients_seed.json', 'stage_clients', MERGE_CLIENTS),
+        ('productos', 'products_seed.json', 'stage_products', MERGE_PRODUCTS),
+        ('envíos', 'shipments_seed.json', 'stage_shipments', MERGE_SHIPMENTS),
+    ]
+    with conn, conn.cursor() as cur:
+        for label, name, table, merge_sql in entities:
+            records = load_records(seed_dir, name, use_delta)
+            if records is None:
+                print(f"   ⚠️ {name} no existe: se saltea")
+                continue
+            load_entity(cur, label, table, records, merge_sql)
+        orders = load_records(seed_dir, 'orders_seed.json', use_delta)
+        if orders is None:
+            print("   ⚠️ orders_seed.json no existe: se saltea")
+        else:
+            load_orders(cur, orders)
+    confirm_snapshot(seed_dir)
+
+def _pop_option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    seed_dir = _pop_option(args, '--seeds', SEEDS_DIR)
+    use_delta = '--delta' in args or os.environ.get('SEED_DELTA') == '1'
+
+    url = database_url()
+    if not url:
+        print("❌ Error: No se encontró DATABASE_URL en webapp/.env (o SEED_DATABASE_URL)")
+        return 1
+    import psycopg2
+
+    print("🚀 Carga por conjuntos (COPY + INSERT ... ON CONFLICT)...")
+    start = time.time()
+    conn = psycopg2.connect(url)
+    try:
+        with stage('load'):
+            load_seeds(conn, seed_dir, use_delta)
+    finally:
+        conn.close()
+    print(f"\n✅ Carga finalizada en {time.time() - start:.2f}s.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Resolución de claves foráneas de los seeds: agrega a cada registro los ids enteros de
+la BD, para que la carga (seed_load.py) solo tenga que escribir.
+
+Las referencias que trae la extracción y el id que resuelven:
+    pedidos    client_old_id (o client_name_match si no hay código)   -> clientId
+               shipment_number del pedido (extract_orders.py)          -> shipmentId
+    items      sku -> productId, shipment_number -> shipmentId,
+               supplier_name -> supplierId
+    envíos     old_client_id                                           -> clientId
+
+Las tablas clave → id (Client, Product, Shipment, Supplier) se leen de la BD una sola
+vez con COPY (db_read.read_query) y se guardan en SNAPSHOT_FILE; con --snapshot se
+usa ese archivo sin conectarse (sirve mientras la BD no haya cambiado: un id que ya
+no existe hace fallar la carga, que no aplica nada). Cada referencia se resuelve con Index.get_indexer
+sobre todas las claves del seed juntas, no registro a registro. Los nombres (cliente
+y proveedor) se comparan como en seed_fast.ts, con trim + mayúsculas; si dos filas
+tienen el mismo nombre gana el id más alto.
+
+Se reescriben los seeds y sus *_delta.json en el mismo formato, con el id en null si
+la clave no está en la BD. Esas claves van a resolve_report.json, separadas en:
+    pending   la clave está en los seeds de esta sincronización: la carga la crea y la
+              resuelve por clave natural (seed_load.py lo sigue haciendo si falta el id)
+    missing   no está en ningún lado: el pedido queda con el cliente 1, el item sin
+              producto, envío o proveedor
+
+seed_delta.py no tiene en cuenta los ids al comparar registros, así que resolver no
+genera cambios falsos en la próxima extracción; si el seed lo había generado
+extract_consolidated.py se actualiza su huella en .extract_state.json para que la
+próxima corrida lo pueda seguir reutilizando.
+
+Uso:
+    python3 seed_resolve.py [--seeds DIR] [--snapshot [ARCHIVO]] [--refrescar]
+    python3 -m sync_cli resolve [--seeds DIR] [--snapshot [ARCHIVO]] [--refrescar]
+
+    --snapshot   usa las claves guardadas en ARCHIVO (por defecto SNAPSHOT_FILE) sin
+                 conectarse; si no existe, se leen de la BD
+    --refrescar  con --snapshot, vuelve a leer la BD aunque el archivo exista
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from seed_delta import RESOLVED_FIELDS, delta_name
+from seed_writer import existing_seed_path, read_seed, write_json, write_seed
+from stage_trace import stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SEEDS_DIR = os.path.join(SCRIPT_DIR, 'webapp', 'prisma')
+SNAPSHOT_FILE = os.path.join(SCRIPT_DIR, '.cache', 'key_snapshot.json')
+REPORT_FILE = 'resolve_report.json'
+EXTRACT_STATE_FILE = '.extract_state.json'
+
+# Tabla -> consulta y columnas numéricas
+KEY_QUERIES = {
+    'clients': ('SELECT "id", "old_id", "name" FROM "Client"', ['id', 'old_id']),
+    'products': ('SELECT "id", "sku" FROM "Product" WHERE "sku" IS NOT NULL', ['id']),
+    'shipments': ('SELECT "id", "shipment_number" FROM "Shipment" WHERE "shipment_number" IS NOT NULL',
+                  ['id', 'shipment_number']),
+    'suppliers': ('SELECT "id", "name" FROM "Supplier"', ['id']),
+}
+
+# --- Snapshot de claves ---
+
+def fetch_snapshot(conn):
+    """Las cuatro tablas clave → id, como columnas (listas) listas para guardar en JSON."""
+    from db_read import read_query
+
+    tables = {}
+    for table, (sql, numeric) in KEY_QUERIES.items():
+        df = read_query(conn, sql, numeric=numeric, name=f'keys_{table}')
+        tables[table] = {col: [None if pd.isna(v) else (int(v) if col in numeric else v) for v in df[col]]
+                         for col in df.columns}
+    return {'taken_at': datetime.now().isoformat(timespec='seconds'), 'tables': tables}
+
+def load_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_snapshot(path, snapshot):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_json(path, snapshot, 'compact')
+
+# --- Índices clave -> id ---
+
+def int_keys(values):
+    """Claves numéricas como Int64 (vacío o texto no numérico quedan NA)."""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').round().astype('Int64')
+
+def name_keys(values):
+    """Nombres comparables: trim + mayúsculas, vacío como NA."""
+    s = pd.Series(values, dtype=object).astype('string').str.strip().str.upper()
+    return s.where(s != '', pd.NA)
+
+def text_keys(values):
+    s = pd.Series(values, dtype=object).astype('string').str.strip()
+    return s.where(s != '', pd.NA)
+
+def key_index(keys, ids):
+    """Serie id indexada por clave, sin NA y con una sola fila por clave (gana el id más alto)."""
+    s = pd.Series(np.asarray(ids, dtype='int64'), index=pd.Index(keys))
+    s = s[s.index.notna()].sort_values(kind='stable')
+    return s[~s.index.duplicated(keep='last')]
+
+def lookup(index, keys):
+    """Id de cada clave (None si no está): un get_indexer sobre todas las claves."""
+    keys = pd.Index(keys)
+    pos = index.index.get_indexer(keys)
+    found = pos >= 0
+    out = np.full(len(keys), None, dtype=object)
+    out[found] = index.to_numpy()[pos[found]].tolist()
+    return out
+
+def build_indexes(snapshot):
+    t = snapshot['tables']
+    return {
+        'client_old_id': key_index(int_keys(t['clients']['old_id']), t['clients']['id']),
+        'client_name': key_index(name_keys(t['clients']['name']), t['clients']['id']),
+        'sku': key_index(text_keys(t['products']['sku']), t['products']['id']),
+        'shipment_number': key_index(int_keys(t['shipments']['shipment_number']), t['shipments']['id']),
+        'supplier_name': key_index(name_keys(t['suppliers']['name']), t['suppliers']['id']),
+    }
+
+# --- Claves que crea esta sincronización ---
+
+def _seed_records(seed_dir, name):
+    path = existing_seed_path(os.path.join(seed_dir, name))
+    return read_seed(path) if path else []
+
+def pending_keys(seed_dir):
+    """Claves que no están en la BD pero sí en los seeds: las crea la carga."""
+    clients = _seed_records(seed_dir, 'clients_seed.json')
+    column = lambda name, field: [rec.get(field) for rec in _seed_records(seed_dir, name)]
+    return {
+        'client_old_id': set(int_keys([c.get('old_id') for c in clients]).dropna()),
+        'client_name': set(name_keys([c.get('name') for c in clients]).dropna()),
+        'sku': set(text_keys(column('products_seed.json', 'sku')).dropna()),
+        'shipment_number': set(int_keys(column('shipments_seed.json', 'shipment_number')).dropna()),
+        'supplier_name': set(name_keys(column('suppliers_seed.json', 'name')).dropna()),
+    }
+
+# --- Resolución ---
+
+class Unresolved:
+    """Claves sin id por tipo de referencia, con la cantidad de registros que las usan."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, kind, keys, ids):
+        keys = pd.Series(keys).reset_index(drop=True)
+        missing = keys[keys.notna().to_numpy() & pd.isna(ids)]
+        if len(missing):
+            counts = self.counts.setdefault(kind, {})
+            for key, n in missing.value_counts().items():
+                counts[key] = counts.get(key, 0) + int(n)
+
+    def report(self, pending):
+        out = {}
+        for kind, counts in self.counts.items():
+            entries = [{'key': int(k) if isinstance(k, (int, np.integer)) else k, 'records': n,
+                        'status': 'pending' if k in pending[kind] else 'missing'}
+                       for k, n in sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0])))]
+            out[kind] = {'pending': sum(e['status'] == 'pending' for e in entries),
+                         'missing': sum(e['status'] == 'missing' for e in entries),
+                         'keys': entries}
+        return out
+
+def resolve_clients(records, indexes, unresolved, old_field='client_old_id', name_field='client_name_match'):
+    """clientId de cada registro: por código y, si no tiene código, por nombre."""
+    old = int_keys([r.get(old_field) for r in records])
+    ids = lookup(indexes['client_old_id'], old)
+    unresolved.add('client_old_id', old, ids)
+    if name_field:
+        by_name = old.isna().to_numpy()
+        names = name_keys([r.get(name_field) for r in records]).where(by_name, pd.NA)
+        name_ids = lookup(indexes['client_name'], names)
+        ids[by_name] = name_ids[by_name]
+        unresolved.add('client_name', names, name_ids)
+    return ids
+
+def resolve_orders(records, indexes, unresolved):
+    """clientId (y shipmentId si el pedido trae envío) de cada pedido; ids de cada item."""
+    client_ids = resolve_clients(records, indexes, unresolved)
+    has_shipment = any('shipment_number' in r for r in records)
+    if has_shipment:
+        numbers = int_keys([r.get('shipment_number') for r in records])
+        shipment_ids = lookup(indexes['shipment_number'], numbers)
+        unresolved.add('shipment_number', numbers, shipment_ids)
+
+    items = [item for r in records for item in (r.get('items') or ())]
+    skus = text_keys([i.get('sku') for i in items])
+    numbers = int_keys([i.get('shipment_number') for i in items])
+    item_ids = {'productId': lookup(indexes['sku'], skus),
+                'shipmentId': lookup(indexes['shipment_number'], numbers)}
+    unresolved.add('sku', skus, item_ids['productId'])
+    unresolved.add('shipment_number', numbers, item_ids['shipmentId'])
+    if any('supplier_name' in i for i in items):
+        suppliers = name_keys([i.get('supplier_name') for i in items])
+        item_ids['supplierId'] = lookup(indexes['supplier_name'], suppliers)
+        unresolved.add('supplier_name', suppliers, item_ids['supplierId'])
+
+    for n, rec in enumerate(records):
+        rec['clientId'] = client_ids[n]
+        if has_shipment:
+            rec['shipmentId'] = shipment_ids[n]
+    for n, item in enumerate(items):
+        for field, ids in item_ids.items():
+            item[field] = ids[n]
+    return records
+
+def resolve_shipments(records, indexes, unresolved):
+    ids = resolve_clients(records, indexes, unresolved, old_field='old_client_id', name_field=None)
+    for rec, client_id in zip(records, ids):
+        rec['clientId'] = client_id
+    return records
+
+RESOLVERS = {
+    'orders_seed.json': resolve_orders,
+    'shipments_seed.json': resolve_shipments,
+}
+
+# --- Archivos ---
+
+def _file_sha(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _json_format(path):
+    """'pretty' si el archivo está indentado, si no 'compact' (como lo dejó seed_writer)."""
+    with open(path, 'rb') as f:
+        return 'pretty' if f.read(2)[1:] in (b'\n', b' ') else 'compact'
+
+def rewrite_seed(seed_dir, name, records, state):
+    """Reescribe el seed en su formato y mantiene su huella en el estado de la extracción."""
+    path = existing_seed_path(os.path.join(seed_dir, name))
+    old_sha = _file_sha(path)
+    fmt = 'ndjson' if path.endswith('.ndjson') else _json_format(path)
+    write_seed(os.path.join(seed_dir, name), records, fmt)
+    entry = state.get(name)
+    if entry and entry.get('sha256') == old_sha:
+        entry['sha256'] = _file_sha(path)
+        return True
+    return False
+
+def resolve_seeds(seed_dir, snapshot):
+    """Resuelve los seeds y deltas de `seed_dir` contra el snapshot. Devuelve el reporte."""
+    indexes = build_indexes(snapshot)
+    unresolved = Unresolved()
+    state_path = os.path.join(seed_dir, EXTRACT_STATE_FILE)
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    state_changed = False
+    resolved = {}
+
+    for name, resolve in RESOLVERS.items():
+        path = existing_seed_path(os.path.join(seed_dir, name))
+        if path is None:
+            continue
+        with stage(f'resolve:{name[:-len("_seed.json")]}') as st:
+            records = resolve(read_seed(path), indexes, unresolved)
+            st['rows_in'] = len(records)
+            state_changed |= rewrite_seed(seed_dir, name, records, state or {})
+            resolved[name] = _count_resolved(records)
+
+            # El delta lleva copias de los mismos registros: se resuelven aparte (sin sumar al reporte)
+            dpath = os.path.join(seed_dir, delta_name(name))
+            if os.path.exists(dpath):
+                with open(dpath, encoding='utf-8') as f:
+                    delta = json.load(f)
+                resolve(delta['inserts'] + delta['updates'], indexes, Unresolved())
+                write_json(dpath, delta, _json_format(dpath))
+
+    if state is not None and state_changed:
+        write_json(state_path, state, 'pretty')
+    return {'snapshot_taken_at': snapshot.get('taken_at'), 'resolved': resolved,
+            'unresolved': unresolved.report(pending_keys(seed_dir))}
+
+def _count_resolved(records):
+    counts = {}
+    for rec in records:
+        for field in RESOLVED_FIELDS:
+            if rec.get(field) is not None:
+                counts[field] = counts.get(field, 0) + 1
+        for item in rec.get('items') or ():
+            for field in RESOLVED_FIELDS:
+                if item.get(field) is not None:
+                    counts[f'items.{field}'] = counts.get(f'items.{field}', 0) + 1
+    return counts
+
+def get_snapshot(snapshot_path=SNAPSHOT_FILE, use_file=False):
+    """Snapshot del archivo (si use_file y existe) o leído de la BD y guardado en snapshot_path."""
+    if use_file:
+        snapshot = load_snapshot(snapshot_path)
+        if snapshot is not None:
+            print(f"   🗂️ Claves de {snapshot_path} ({snapshot.get('taken_at')})")
+            return snapshot
+    from seed_load import database_url
+    url = database_url()
+    if not url:
+        return None
+    import psycopg2
+
+    conn = psycopg2.connect(url)
+    try:
+        with stage('resolve:snapshot'):
+            snapshot = fetch_snapshot(conn)
+    finally:
+        conn.close()
+    sizes = ', '.join(f"{len(cols['id'])} {table}" for table, cols in snapshot['tables'].items())
+    print(f"   🗂️ Claves leídas de la BD: {sizes}")
+    save_snapshot(snapshot_path, snapshot)
+    return snapshot
+
+def _pop_option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    seed_dir = _pop_option(args, '--seeds', SEEDS_DIR)
+    snapshot_path, use_file = SNAPSHOT_FILE, '--snapshot' in args
+    if use_file:
+        i = args.index('--snapshot')
+        del args[i]
+        # El archivo es opcional: --snapshot solo usa SNAPSHOT_FILE
+        if i < len(args) and not args[i].startswith('--'):
+            snapshot_path = args.pop(i)
+    refresh = '--refrescar' in args
+
+    print("🔗 Resolviendo claves foráneas de los seeds...")
+    start = time.time()
+    snapshot = get_snapshot(snapshot_path, use_file and not refresh)
+    if snapshot is None:
+        print("❌ Error: No se encontró DATABASE_URL en webapp/.env (o SEED_DATABASE_URL) ni un --snapshot")
+        return 1
+    with stage('resolve'):
+        report = resolve_seeds(seed_dir, snapshot)
+    write_json(os.path.join(seed_dir, REPORT_FILE), report, 'pretty')
+
+    for name, counts in report['resolved'].items():
+        print(f"   {name}: " + (', '.join(f'{field} {n}' for field, n in counts.items()) or 'ningún id resuelto'))
+    for kind, info in report['unresolved'].items():
+        missing = [str(e['key']) for e in info['keys'] if e['status'] == 'missing']
+        sample = ', '.join(missing[:5]) + (', ...' if len(missing) > 5 else '')
+        print(f"   ⚠️ {kind}: {info['pending']} se crean en la carga, {info['missing']} sin coincidencia"
+              + (f" ({sample})" if info['missing'] else ''))
+    print(f"\n✅ Resolución finalizada en {time.time() - start:.2f}s (reporte: {REPORT_FILE}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
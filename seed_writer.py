@@ -0,0 +1,136 @@
+
+"""
+Escritura y lectura de los seeds JSON, con formato intercambiable.
+
+Formatos (SEED_FORMAT o la opción de cada script):
+    pretty   json.dump(indent=2), legible; es el formato por defecto y el de siempre
+    compact  sin espacios ni saltos de línea; usa orjson si está instalado
+    ndjson   un registro por línea, en <seed>.ndjson en vez de <seed>.json; solo para los
+             seeds de NDJSON_SEEDS (los pedidos), el resto se escribe compacto.
+             Se escribe registro a registro; seed_fast.ts (loadSeed) y seed_load.py lo
+             leen línea a línea, sin tener el archivo entero en memoria como texto.
+
+Cada escritura va a un archivo temporal y se renombra al final (os.replace), así un
+proceso que lee el seed nunca ve un archivo a medio escribir. Al escribir un seed en
+un formato se borra la versión en el otro (.json / .ndjson): siempre hay una sola.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+FORMATS = ('pretty', 'compact', 'ndjson')
+DEFAULT_FORMAT = 'pretty'
+NDJSON_SEEDS = {'orders_seed.json'}
+
+def default_format():
+    fmt = os.environ.get('SEED_FORMAT', DEFAULT_FORMAT)
+    if fmt not in FORMATS:
+        raise ValueError(f"SEED_FORMAT inválido: {fmt} (opciones: {', '.join(FORMATS)})")
+    return fmt
+
+def seed_format(path, fmt=None):
+    """Formato efectivo para un seed: ndjson solo aplica a NDJSON_SEEDS."""
+    fmt = fmt or default_format()
+    if fmt == 'ndjson' and os.path.basename(path) not in NDJSON_SEEDS:
+        return 'compact'
+    return fmt
+
+def seed_path(path, fmt=None):
+    """Ruta real del seed en el formato dado (<seed>.ndjson para ndjson)."""
+    if seed_format(path, fmt) == 'ndjson':
+        return path[:-len('.json')] + '.ndjson'
+    return path
+
+def _ndjson_path(path):
+    return path[:-len('.json')] + '.ndjson'
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def write_json(path, data, fmt=None):
+    """Escribe un objeto JSON cualquiera (pretty o compacto) de forma atómica."""
+    fmt = fmt or default_format()
+    tmp = f'{path}.tmp{os.getpid()}'
+    if fmt == 'pretty':
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    else:
+        with open(tmp, 'wb') as f:
+            f.write(_dumps(data))
+    os.replace(tmp, path)
+    return path
+
+def write_seed(path, records, fmt=None):
+    """
+    Escribe una lista de registros en `path` (<seed>.json) con el formato pedido.
+    `records` puede ser un generador en modo ndjson. Devuelve la ruta realmente escrita.
+    """
+    fmt = seed_format(path, fmt)
+    target = seed_path(path, fmt)
+    if fmt == 'ndjson':
+        tmp = f'{target}.tmp{os.getpid()}'
+        with open(tmp, 'wb') as f:
+            for rec in records:
+                f.write(_dumps(rec))
+                f.write(b'\n')
+        os.replace(tmp, target)
+    else:
+        write_json(target, records if isinstance(records, list) else list(records), fmt)
+    drop_other_format(path, fmt)
+    return target
+
+def drop_other_format(path, fmt=None):
+    """Borra la versión del seed en el formato que no es `fmt`: un solo formato por seed en disco."""
+    target = seed_path(path, fmt)
+    other = path if target != path else _ndjson_path(path)
+    if path.endswith('.json') and os.path.exists(other):
+        os.remove(other)
+
+def existing_seed_path(path):
+    """Ruta del seed que exista en disco (<seed>.json o <seed>.ndjson), o None."""
+    if os.path.exists(path):
+        return path
+    if path.endswith('.json') and os.path.exists(_ndjson_path(path)):
+        return _ndjson_path(path)
+    return None
+
+def iter_seed(path):
+    """Registros del seed, esté en .json o en .ndjson (este último sin leerlo entero)."""
+    real = existing_seed_path(path)
+    if real is None:
+        raise FileNotFoundError(path)
+    if real.endswith('.ndjson'):
+        with open(real, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line) if orjson is not None else json.loads(line)
+    else:
+        with open(real, encoding='utf-8') as f:
+            yield from json.load(f)
+
+def stream_seed(path):
+    """
+    Como iter_seed, pero un .json tampoco se carga entero si está ijson: se parsea de a
+    un registro. Sin ijson, el .json se lee completo (el .ndjson siempre va por línea).
+    """
+    real = existing_seed_path(path)
+    if real is None or real.endswith('.ndjson') or ijson is None:
+        yield from iter_seed(path)
+        return
+    with open(real, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+def read_seed(path):
+    return list(iter_seed(path))
@@ -0,0 +1,236 @@
+
+"""
+Caché de hojas ya parseadas, indexada por el hash del contenido del .xlsx.
+
+Cada versión del archivo (sha256 de sus bytes) tiene un directorio en CACHE_DIR con
+una hoja por archivo Parquet. Si download_sheet.py baja un archivo idéntico, el hash
+coincide y las hojas se leen del Parquet sin pasar por openpyxl.
+
+Las columnas con tipos mezclados (object) se guardan como dos columnas: un código de
+tipo y el valor como texto, para devolver exactamente los mismos valores Python
+(int, float, str, datetime...) que dio el parseo original.
+
+Requiere pyarrow (o fastparquet). Si no está instalado, o con SHEET_CACHE=0, la caché
+se desactiva y todo funciona igual que sin ella.
+
+Los directorios viejos se borran por LRU cuando el total supera SHEET_CACHE_MAX_MB.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('SHEET_CACHE_DIR') or os.path.join(SCRIPT_DIR, '.cache', 'sheets')
+DEFAULT_MAX_MB = 200
+
+# Códigos de tipo para columnas object
+_NAN, _NONE, _INT, _FLOAT, _STR, _BOOL, _TIMESTAMP, _DATETIME, _TIME = range(9)
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def parquet_available():
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', text).strip('_') or 'sheet'
+
+def _encode_value(v):
+    # El orden importa: bool antes que int, Timestamp antes que datetime
+    if v is None: return _NONE, None
+    if isinstance(v, bool): return _BOOL, '1' if v else '0'
+    if isinstance(v, (int, np.integer)): return _INT, str(int(v))
+    if isinstance(v, (float, np.floating)):
+        if np.isnan(v): return _NAN, None
+        return _FLOAT, repr(float(v))
+    if isinstance(v, str): return _STR, v
+    if isinstance(v, pd.Timestamp): return _TIMESTAMP, v.isoformat()
+    if isinstance(v, datetime): return _DATETIME, v.isoformat()
+    if isinstance(v, time): return _TIME, v.isoformat()
+    raise TypeError(f"tipo no soportado en caché: {type(v).__name__}")
+
+_DECODERS = {
+    _INT: int,
+    _FLOAT: float,
+    _STR: str,
+    _BOOL: lambda v: v == '1',
+    _TIMESTAMP: pd.Timestamp,
+    _DATETIME: datetime.fromisoformat,
+    _TIME: time.fromisoformat,
+}
+
+def _encode_frame(df):
+    cols = {}
+    kinds = []
+    for i, name in enumerate(df.columns):
+        s = df.iloc[:, i]
+        if s.dtype == object:
+            pairs = [_encode_value(v) for v in s.tolist()]
+            cols[f'c{i}_t'] = np.array([p[0] for p in pairs], dtype=np.int8)
+            cols[f'c{i}_v'] = pd.array([p[1] for p in pairs], dtype=object)
+            kinds.append('object')
+        else:
+            cols[f'c{i}'] = s.to_numpy()
+            kinds.append('native')
+    return pd.DataFrame(cols), {'columns': [str(c) for c in df.columns], 'kinds': kinds}
+
+def _decode_frame(stored, meta):
+    cols = {}
+    for i, (name, kind) in enumerate(zip(meta['columns'], meta['kinds'])):
+        if kind == 'native':
+            cols[name] = stored[f'c{i}']
+            continue
+        tags = stored[f'c{i}_t'].to_numpy()
+        vals = stored[f'c{i}_v'].to_numpy(dtype=object)
+        out = np.full(len(tags), np.nan, dtype=object)
+        out[tags == _NONE] = None
+        for tag, fn in _DECODERS.items():
+            m = tags == tag
+            if m.any():
+                out[m] = [fn(v) for v in vals[m]]
+        cols[name] = pd.Series(out, dtype=object)
+    df = pd.DataFrame(cols)
+    df.columns = meta['columns']
+    return df
+
+class SheetCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def default(cls):
+        """Caché configurada por entorno, o None si está desactivada o falta pyarrow."""
+        if os.environ.get('SHEET_CACHE', '1') == '0' or not parquet_available():
+            return None
+        max_mb = float(os.environ.get('SHEET_CACHE_MAX_MB', DEFAULT_MAX_MB))
+        return cls(max_bytes=int(max_mb * 1024 * 1024))
+
+    def _entry(self, digest):
+        return os.path.join(self.cache_dir, digest[:32])
+
+    def _touch(self, digest):
+        entry = self._entry(digest)
+        if os.path.isdir(entry):
+            os.utime(entry)
+
+    def _meta_path(self, digest):
+        return os.path.join(self._entry(digest), 'workbook.json')
+
+    def _read_meta(self, digest):
+        try:
+            with open(self._meta_path(digest), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, path, data):
+        tmp = f'{path}.tmp{os.getpid()}'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _update_meta(self, digest, **changes):
+        os.makedirs(self._entry(digest), exist_ok=True)
+        meta = self._read_meta(digest)
+        for key, value in changes.items():
+            if isinstance(value, dict):
+                meta.setdefault(key, {}).update(value)
+            else:
+                meta[key] = value
+        self._write_json(self._meta_path(digest), meta)
+
+    # --- Metadatos del libro ---
+
+    def sheet_names(self, digest):
+        return self._read_meta(digest).get('sheet_names')
+
+    def set_sheet_names(self, digest, names):
+        self._update_meta(digest, sheet_names=list(names))
+
+    def header(self, digest, sheet_name):
+        return self._read_meta(digest).get('headers', {}).get(sheet_name)
+
+    def set_header(self, digest, sheet_name, header_idx):
+        self._update_meta(digest, headers={sheet_name: header_idx})
+
+    # --- Hojas ---
+
+    def _sheet_base(self, digest, sheet_name, header):
+        return os.path.join(self._entry(digest), f'{_slug(sheet_name)}__h{header}')
+
+    def get(self, digest, sheet_name, header):
+        base = self._sheet_base(digest, sheet_name, header)
+        try:
+            with open(base + '.json', encoding='utf-8') as f:
+                meta = json.load(f)
+            stored = pd.read_parquet(base + '.parquet')
+        except (OSError, ValueError):
+            return None
+        self._touch(digest)
+        return _decode_frame(stored, meta)
+
+    def put(self, digest, sheet_name, header, df):
+        try:
+            stored, meta = _encode_frame(df)
+        except TypeError:
+            return False
+        os.makedirs(self._entry(digest), exist_ok=True)
+        base = self._sheet_base(digest, sheet_name, header)
+        tmp = f'{base}.parquet.tmp{os.getpid()}'
+        stored.to_parquet(tmp, index=False)
+        os.replace(tmp, base + '.parquet')
+        self._write_json(base + '.json', meta)
+        self._touch(digest)
+        self.evict(keep=digest)
+        return True
+
+    # --- Desalojo LRU por tamaño ---
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """Borra las versiones usadas hace más tiempo hasta quedar bajo max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        keep_path = self._entry(keep) if keep else None
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
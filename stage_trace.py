@@ -0,0 +1,222 @@
+
+"""
+Medición por etapa de la sincronización (descarga, parseo de cada hoja, limpieza,
+uniones y escritura de seeds).
+
+Desactivado por defecto y sin costo. Se activa con variables de entorno, que heredan
+los procesos hijos (modo --paralelo) y los pasos siguientes del mismo job:
+    SYNC_TRACE=ruta.ndjson      agrega una línea JSON por etapa terminada
+    SYNC_PROFILE=ruta           perfil de todo el proceso: cProfile (.prof, se abre con
+                                snakeviz o pstats) o, con SYNC_PROFILER=pyinstrument y
+                                pyinstrument instalado, un reporte .html
+extract_consolidated.py también acepta --traza RUTA y --perfil RUTA.
+
+Cada línea de la traza:
+    run, process, pid     corrida (GITHUB_RUN_ID o la del primer proceso), script y pid
+    stage, parent, depth  nombre de la etapa, la etapa que la contiene y su nivel
+    start                 hora de inicio (epoch, segundos)
+    wall_s, cpu_s         tiempo de pared y de CPU del proceso
+    rows_in, rows_out     filas que entran / salen (si la etapa las conoce)
+    rss_mb                memoria residente al terminar
+    peak_mb, peak_up_mb   pico de RSS del proceso (ru_maxrss) y cuánto lo subió la etapa
+más los datos extra de cada etapa (hoja, caché, bytes...). Los tiempos de una etapa
+incluyen los de sus hijas. El archivo es de solo agregado: download_sheet.py y
+extract_consolidated.py escriben en el mismo y se puede comparar corrida contra corrida.
+
+Uso:
+    with stage('parse', sheet='CLIENTES') as st:
+        df = ...
+        st['rows_out'] = len(df)
+
+    @traced('clean:clients')
+    def clients_columns(df): ...
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Etapas abiertas en este proceso (para registrar la etapa padre)
+_stack = []
+# Etapas terminadas en este proceso, en orden de cierre
+records = []
+
+def trace_path():
+    return os.environ.get('SYNC_TRACE') or None
+
+def enabled():
+    return trace_path() is not None
+
+def _run_id():
+    run = os.environ.get('SYNC_RUN_ID') or os.environ.get('GITHUB_RUN_ID')
+    if not run:
+        # La fija el primer proceso; los hijos la heredan
+        run = os.environ['SYNC_RUN_ID'] = time.strftime('%Y%m%dT%H%M%S')
+    return run
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        return None
+
+def _peak_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+def rows(obj):
+    """Filas de un resultado: len() de un DataFrame/lista, la primera columna de un dict de
+    listas, el primer elemento de una tupla. None si no se puede saber (p.ej. un generador)."""
+    if isinstance(obj, tuple):
+        return rows(obj[0]) if obj else None
+    if isinstance(obj, dict):
+        return rows(next(iter(obj.values()))) if obj else 0
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+def _write(record):
+    path = trace_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Una línea por write en modo append: los procesos del pool no se pisan
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+@contextmanager
+def stage(name, rows_in=None, **extra):
+    """Mide el bloque como la etapa `name`. Devuelve un dict donde se puede poner rows_out
+    (o cualquier otro dato) antes de salir."""
+    record = {'rows_in': rows_in, 'rows_out': None, **extra}
+    if not enabled():
+        yield record
+        return
+    run = _run_id()  # antes de abrir el bloque, que puede lanzar procesos hijos
+    parent = _stack[-1] if _stack else None
+    depth = len(_stack)
+    _stack.append(name)
+    start = time.time()
+    peak_before = _peak_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        yield record
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _stack.pop()
+        peak = _peak_mb()
+        record = {
+            'run': run, 'process': os.path.basename(sys.argv[0] or 'python'), 'pid': os.getpid(),
+            'stage': name, 'parent': parent, 'depth': depth, 'start': round(start, 3),
+            'wall_s': round(time.perf_counter() - wall, 4), 'cpu_s': round(time.process_time() - cpu, 4),
+            'rss_mb': _rss_mb(), 'peak_mb': peak,
+            'peak_up_mb': round(peak - peak_before, 1) if peak is not None else None,
+            **record,
+        }
+        if error:
+            record['error'] = error
+        records.append(record)
+        _write(record)
+
+def traced(name, count_in=True):
+    """Decorador: mide cada llamada como la etapa `name`, con las filas del primer argumento
+    (si count_in) y las del resultado."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            with stage(name, rows(args[0]) if count_in and args else None) as st:
+                result = fn(*args, **kwargs)
+                st['rows_out'] = rows(result)
+            return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def profiled(path=None, tool=None):
+    """Perfila el bloque si hay ruta (argumento o SYNC_PROFILE). tool: 'cprofile' (por
+    defecto) o 'pyinstrument' (SYNC_PROFILER); si pyinstrument no está, se usa cProfile."""
+    path = path or os.environ.get('SYNC_PROFILE')
+    if not path:
+        yield
+        return
+    tool = tool or os.environ.get('SYNC_PROFILER', 'cprofile')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if tool == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️ pyinstrument no está instalado: se usa cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+                print(f"🔬 Perfil (pyinstrument): {path}")
+            return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 Perfil (cProfile): {path}")
+
+def load(path=None, run=None):
+    """Etapas de una traza (por defecto SYNC_TRACE), solo las de la corrida `run` si se indica."""
+    path = path or trace_path()
+    out = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if run is None or record.get('run') == run:
+                    out.append(record)
+    return out
+
+def current_run():
+    """Etapas de la corrida actual en la traza, de todos los procesos (incluidos los del pool)."""
+    return load(run=_run_id()) if enabled() else list(records)
+
+def summary(stage_records=None):
+    """Tabla de etapas (por defecto las de este proceso), sangradas según la etapa padre."""
+    stage_records = records if stage_records is None else stage_records
+    if not stage_records:
+        return ''
+    lines = [f"{'etapa':<38}{'pared s':>9}{'CPU s':>8}{'filas in':>10}{'filas out':>10}{'pico MB':>9}"]
+    fmt = lambda v: '' if v is None else v
+    # Agrupadas por proceso (en el orden en que arrancaron) y por orden de inicio: el padre
+    # cierra después de sus hijas, pero se lista antes
+    first = {}
+    for r in sorted(stage_records, key=lambda r: r['start']):
+        first.setdefault(r['pid'], len(first))
+    labelled = {min(first, key=first.get)}
+    for r in sorted(stage_records, key=lambda r: (first[r['pid']], r['start'], r['depth'])):
+        label = '  ' * r['depth'] + r['stage']
+        if r['pid'] not in labelled:
+            labelled.add(r['pid'])
+            label += f" [{r['process']} {r['pid']}]"
+        lines.append(f"{label:<38}{r['wall_s']:>9}{r['cpu_s']:>8}{fmt(r['rows_in']):>10}"
+                     f"{fmt(r['rows_out']):>10}{fmt(r['peak_mb']):>9}")
+    return '\n'.join(lines)
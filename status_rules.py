@@ -0,0 +1,61 @@
+
+"""
+Normalización de estados (columnas ESTADO de DETA_VENTAS/CABE_VENTAS y LLEGO? de
+CABE_ENVIOS), compartida por todos los extractores.
+
+Las reglas son una tabla ordenada (gana la primera que coincide) derivada de
+REGLAS_ESTADOS.md: vacío = COMPRAR, ENCARGADO, SALIENDO, ENTREGADO, más los alias
+que ya se usan en la planilla y en la web (MIAMI, EN BSAS para el arribo a
+Argentina, EN TRANSITO, CANCELADO). Los textos que no coinciden con ninguna regla
+se devuelven tal cual, sin espacios.
+
+Las columnas tienen pocos cientos de valores distintos: normalize_statuses evalúa
+las reglas una vez por valor distinto (pd.factorize) y el resultado queda
+memorizado para los lotes siguientes.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+DEFAULT_STATUS = 'COMPRAR'
+
+# (subcadenas, estado) en orden de prioridad
+STATUS_RULES = (
+    (('ENCARGADO',), 'ENCARGADO'),
+    (('SALIENDO',), 'SALIENDO'),
+    (('MIAMI',), 'MIAMI'),
+    (('BSAS', 'LLEGÓ', 'LLEGO', 'RECIBIDO'), 'EN BSAS'),
+    (('TRANSITO',), 'EN TRANSITO'),
+    (('ENTREGADO', 'FINALIZADO'), 'ENTREGADO'),
+    (('CANCELADO',), 'CANCELADO'),
+)
+
+_COMPILED = [(re.compile('|'.join(re.escape(m) for m in markers)), status) for markers, status in STATUS_RULES]
+_memo = {}
+
+def _apply_rules(s):
+    s = s.strip()
+    if not s or s.lower() == 'nan': return DEFAULT_STATUS
+    s_up = s.upper()
+    for pattern, status in _COMPILED:
+        if pattern.search(s_up):
+            return status
+    return s
+
+def normalize_status(s):
+    """Estado normalizado de un valor de celda (texto, número o vacío)."""
+    if isinstance(s, str):
+        status = _memo.get(s)
+        if status is None:
+            status = _memo[s] = _apply_rules(s)
+        return status
+    if not s or pd.isna(s): return DEFAULT_STATUS
+    return _apply_rules(str(s))
+
+def normalize_statuses(values):
+    """Serie de estados normalizados, evaluando las reglas una sola vez por valor distinto."""
+    s = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(s.astype(object), use_na_sentinel=True)
+    mapped = np.array([normalize_status(u) for u in uniques] + [DEFAULT_STATUS], dtype=object)
+    return pd.Series(mapped[codes], index=s.index, dtype=object)
@@ -44,7 +44,7 @@ import_from_excel() {
     
     # 1. Extracción Consolidada con filtro
     echo "📊 Paso 1/2: Extrayendo datos desde Excel..."
-    python3 extract_consolidated.py $DAYS
+    python3 -m sync_cli extract $DAYS
     
     if [ $? -ne 0 ]; then
         echo "❌ Error en fase de extracción"
@@ -72,7 +72,7 @@ export_to_excel() {
     echo "📤 Exportando datos desde Base de Datos a Excel..."
     echo ""
     
-    python3 export_to_excel.py
+    python3 -m sync_cli export
     
     if [ $? -ne 0 ]; then
         echo "❌ Error al exportar a Excel"
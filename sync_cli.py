@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada único de la sincronización: python3 -m sync_cli <comando> [opciones]
+
+    download [--forzar]                 Google Drive → Excel (download_sheet.py)
+    extract [DIAS] [opciones]           Excel → seeds (extract_consolidated.py, mismas opciones)
+    export [--entidades ...] [--lectura ...]
+                                        BD → Excel (export_to_excel.py, mismas opciones)
+    resolve [--seeds DIR] [--snapshot [ARCHIVO]] [--refrescar]
+                                        ids de la BD en los seeds (seed_resolve.py)
+    load [--delta] [--seeds DIR]        seeds → BD por conjuntos (seed_load.py)
+    ledger [--seeds DIR] [--al FECHA] [--salida RUTA] [--json]
+                                        cuenta corriente por cliente y anomalías de los
+                                        pedidos (client_ledger.py)
+    inspect [--excel RUTA] [--actualizar] [--json]
+                                        hojas del Excel: filas, fila de encabezado y columnas
+    stats [--seeds DIR] [--actualizar] [--json]
+                                        registros de cada seed y totales de los pedidos
+
+Cada comando importa solo lo que usa: download no carga pandas, export carga psycopg2
+recién al conectar. inspect y stats guardan lo que calculan en .cache/meta.json con la
+huella (tamaño y fecha de modificación) de los archivos leídos: mientras el Excel o los
+seeds no cambien responden desde ahí, sin pandas y sin abrir el .xlsx. --actualizar
+recalcula igual.
+
+El código de salida es el del script: download devuelve 3 si la planilla no cambió.
+Los scripts siguen funcionando solos (python3 extract_consolidated.py 7, etc.).
+"""
+
+import json
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Los mismos que usan download_sheet.py y extract_consolidated.py
+EXCEL_PATH = os.path.join(SCRIPT_DIR, 'VENTAS COMPRAS 2023 al 2025 Para Sistema en Gemini.xlsx')
+SEEDS_DIR = os.path.join(SCRIPT_DIR, 'webapp', 'prisma')
+META_FILE = os.path.join(SCRIPT_DIR, '.cache', 'meta.json')
+
+SEEDS = ('clients_seed.json', 'products_seed.json', 'shipments_seed.json', 'orders_seed.json',
+         'suppliers_seed.json')
+
+def _pop_option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+def _pop_flag(args, name):
+    if name in args:
+        args.remove(name)
+        return True
+    return False
+
+# --- Metadatos cacheados ---
+
+def file_key(path):
+    """Huella barata de un archivo: tamaño y mtime en ns (None si no existe)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def _load_meta():
+    try:
+        with open(META_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_meta(meta):
+    os.makedirs(os.path.dirname(META_FILE), exist_ok=True)
+    tmp = META_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, META_FILE)
+
+def cached(section, path, key, compute, refresh=False):
+    """
+    Resultado de compute() para `path`, guardado en META_FILE bajo la huella `key`.
+    Devuelve (resultado, si vino de la caché).
+    """
+    meta = _load_meta()
+    entry = meta.get(section, {}).get(path)
+    if not refresh and entry and entry.get('key') == key:
+        return entry['value'], True
+    value = compute()
+    meta.setdefault(section, {})[path] = {'key': key, 'value': value}
+    _save_meta(meta)
+    return value, False
+
+# --- inspect ---
+
+def inspect_workbook(path):
+    """Filas, fila de encabezado y columnas de cada hoja (lee el libro con workbook_reader)."""
+    from workbook_reader import open_workbook
+
+    wb = open_workbook(path)
+    sheets = {}
+    for name in wb.sheet_names:
+        df = wb.read_sheet(name)
+        sheets[name] = {'rows': len(df), 'header_row': wb.header_row(name),
+                        'columns': [str(c) for c in df.columns]}
+    wb.close()
+    return sheets
+
+def cmd_inspect(args):
+    path = os.path.abspath(_pop_option(args, '--excel', EXCEL_PATH))
+    key = file_key(path)
+    if key is None:
+        print(f"❌ Error: No se encontró {path}")
+        return 1
+    sheets, from_cache = cached('inspect', path, key, lambda: inspect_workbook(path),
+                                refresh=_pop_flag(args, '--actualizar'))
+    if _pop_flag(args, '--json'):
+        print(json.dumps(sheets, ensure_ascii=False))
+        return 0
+    print(f"📗 {os.path.basename(path)} ({key[0] / 1048576:.1f} MB){' [caché]' if from_cache else ''}")
+    for name, info in sheets.items():
+        columns = ', '.join(info['columns'][:8]) + (' ...' if len(info['columns']) > 8 else '')
+        print(f"  {name}: {info['rows']} filas, encabezado en la fila {info['header_row']}, "
+              f"{len(info['columns'])} columnas ({columns})")
+    return 0
+
+# --- stats ---
+
+def seed_stats(seed_dir):
+    """Registros por seed y, para los pedidos, totales, pagos y saldo (los de client_ledger.py)."""
+    from seed_writer import existing_seed_path, iter_seed, stream_seed
+
+    stats = {}
+    for name in SEEDS:
+        path = existing_seed_path(os.path.join(seed_dir, name))
+        if path is None:
+            continue
+        if name != 'orders_seed.json':
+            stats[name] = {'records': sum(1 for _ in iter_seed(path))}
+            continue
+        # Mismas reglas de saldo que la cuenta corriente y check_json_stats.py
+        from client_ledger import build_ledger
+        totals = build_ledger(stream_seed(path))['totals']
+        stats[name] = {'records': totals['orders'], 'items': totals['items'],
+                       'total_amount': totals['debt'], 'payment_amount': totals['payments'],
+                       'balance': totals['balance'], 'unpaid_orders': totals['unpaid_orders']}
+    return stats
+
+def cmd_stats(args):
+    seed_dir = os.path.abspath(_pop_option(args, '--seeds', SEEDS_DIR))
+    # La huella incluye las dos variantes (.json / .ndjson) de cada seed
+    key = {name: file_key(os.path.join(seed_dir, variant))
+           for name in SEEDS for variant in (name, name[:-len('.json')] + '.ndjson')}
+    stats, from_cache = cached('stats', seed_dir, key, lambda: seed_stats(seed_dir),
+                               refresh=_pop_flag(args, '--actualizar'))
+    if _pop_flag(args, '--json'):
+        print(json.dumps(stats, ensure_ascii=False))
+        return 0
+    if not stats:
+        print(f"❌ No hay seeds en {seed_dir}")
+        return 1
+    print(f"📁 {seed_dir}{' [caché]' if from_cache else ''}")
+    for name, info in stats.items():
+        print(f"  {name}: {info['records']} registros")
+    orders = stats.get('orders_seed.json')
+    if orders:
+        print(f"\n🧾 Pedidos: {orders['records']} ({orders['items']} items)")
+        print(f"  Total: {orders['total_amount']:,.2f}")
+        print(f"  Pagado: {orders['payment_amount']:,.2f}")
+        print(f"  Saldo: {orders['balance']:,.2f}")
+        print(f"  Sin ningún pago: {orders['unpaid_orders']}")
+    return 0
+
+# --- Scripts de la sincronización ---
+
+def cmd_download(args):
+    import download_sheet
+    return download_sheet.download_sheet(force='--forzar' in args)
+
+def cmd_extract(args):
+    import extract_consolidated
+    return 0 if extract_consolidated.extract_all(argv=args) else 1
+
+def cmd_export(args):
+    import export_to_excel
+    entities, method = export_to_excel.parse_args(args)
+    return 0 if export_to_excel.export_to_excel(entities, method) else 1
+
+def cmd_resolve(args):
+    import seed_resolve
+    return seed_resolve.main(args)
+
+def cmd_load(args):
+    import seed_load
+    return seed_load.main(args)
+
+def cmd_ledger(args):
+    import client_ledger
+    return client_ledger.main(args)
+
+COMMANDS = {
+    'download': cmd_download,
+    'extract': cmd_extract,
+    'export': cmd_export,
+    'resolve': cmd_resolve,
+    'load': cmd_load,
+    'ledger': cmd_ledger,
+    'inspect': cmd_inspect,
+    'stats': cmd_stats,
+}
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print(__doc__.strip())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Comando desconocido: {command} (opciones: {', '.join(COMMANDS)})")
+        return 2
+    return COMMANDS[command](args) or 0
+
+if __name__ == '__main__':
+    sys.exit(main())
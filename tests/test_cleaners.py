@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from extraction.cleaners import date_window
+
+
+def test_date_window_matches_days_rule_and_keeps_undated():
+    now = datetime(2025, 12, 31, 15, 30)
+    fechas = pd.Series([now - timedelta(days=d, hours=h) for d, h in
+                        [(0, 0), (6, 23), (7, 0), (7, 20), (8, 0), (30, 0)]] + [pd.NaT])
+    expected = [pd.isna(f) or (now - f).days <= 7 for f in fechas]
+    assert date_window(fechas, now, 7).tolist() == expected
+    assert expected == [True, True, True, True, False, False, True]
+
+
+def test_supplier_address_is_city_and_state_like_the_original_script():
+    from extraction import build_suppliers
+    df = pd.DataFrame({'COMPAÑIA': ['ACME', 'nan', 'BETA'], 'VENDEDOR': ['Ana', 'x', float('nan')],
+                       'TELEFONO': ['1', '2', '3'], 'CIUDAD': ['Miami', 'x', '-'],
+                       'ESTADO': ['FL', 'x', float('nan')], 'COUNTRY': ['USA', 'x', 'China']})
+    assert build_suppliers(df) == [
+        {'name': 'ACME', 'contact': 'Ana', 'email': '', 'phone': '1', 'address': 'Miami, FL'},
+        {'name': 'BETA', 'contact': '', 'email': '', 'phone': '3', 'address': '-'},
+    ]
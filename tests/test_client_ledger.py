@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from client_ledger import build_ledger
+
+ORDERS = [
+    # Cliente 1: debe 300 de un pedido viejo
+    {'order_number': 1, 'client_old_id': 1, 'date': '2025-01-10', 'total_amount': 500, 'payment_amount': 200},
+    # Cliente 2: pagó de más, queda a favor
+    {'order_number': 2, 'client_old_id': 2, 'date': '2025-12-01', 'total_amount': 1195, 'payment_amount': 2390},
+    # Cliente 3: nota de crédito (total negativo) y un pedido sin pagar
+    {'order_number': 3, 'client_old_id': 3, 'date': '2025-12-20', 'total_amount': -100, 'payment_amount': 0},
+    {'order_number': 4, 'client_old_id': 3, 'date': '2025-12-21', 'total_amount': 1500, 'payment_amount': 0},
+    {'order_number': 4, 'client_name_match': 'Sin Codigo', 'date': None, 'total_amount': 50, 'payment_amount': 0},
+]
+
+
+def _ledger(chunk_rows=2):
+    return build_ledger(iter(ORDERS), as_of=datetime(2025, 12, 31), chunk_rows=chunk_rows)
+
+
+def _client(ledger, old_id):
+    clients = ledger['clients']
+    return clients[clients['client_old_id'] == old_id].iloc[0]
+
+
+def test_totals_are_signed_like_check_json_stats():
+    totals = _ledger()['totals']
+    debt = sum(o['total_amount'] for o in ORDERS)
+    payments = sum(o['payment_amount'] for o in ORDERS)
+    assert totals['orders'] == len(ORDERS)
+    assert totals['debt'] == debt
+    assert totals['payments'] == payments
+    assert totals['balance'] == debt - payments
+    assert totals['unpaid_orders'] == sum(1 for o in ORDERS if o['total_amount'] > 0 and o['payment_amount'] == 0)
+
+
+def test_client_in_credit_has_negative_balance():
+    client = _client(_ledger(), 2)
+    assert client['balance'] == -1195
+    assert client['credit'] == 1195
+    assert client['outstanding'] == 0
+
+
+def test_negative_total_reduces_debt_and_is_flagged():
+    ledger = _ledger()
+    client = _client(ledger, 3)
+    assert client['debt'] == 1400
+    assert client['outstanding'] == 1500
+    negative = [a['order_number'] for a in ledger['anomalies'] if a['kind'] == 'negative']
+    assert negative == [3]
+
+
+def test_aging_and_anomalies():
+    ledger = _ledger()
+    assert _client(ledger, 1)['days_180_plus'] == 300
+    assert _client(ledger, 3)['days_0_30'] == 1500
+    kinds = {(a['kind'], a['order_number']) for a in ledger['anomalies']}
+    assert ('overpaid', 2) in kinds
+    assert ('duplicate_order', 4) in kinds
+    assert [o['order_number'] for o in ledger['large_unpaid']] == [4]
+
+
+def test_chunk_size_does_not_change_the_result():
+    a, b = _ledger(chunk_rows=1), _ledger(chunk_rows=100)
+    assert a['totals'] == b['totals']
+    assert a['clients'].equals(b['clients'])
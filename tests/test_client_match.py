@@ -0,0 +1,49 @@
+from extraction.client_match import ClientNameIndex, fold_name
+
+
+def test_fold_name_strips_accents_and_punctuation():
+    assert fold_name('  José  Pérez (Rosario) ') == 'JOSE PEREZ ROSARIO'
+
+
+def test_exact_match_has_full_confidence():
+    index = ClientNameIndex([1, 2], ['Juan Pérez SRL', 'Ana Gómez'])
+    ids, conf = index.match(['juan perez srl'])
+    assert ids.tolist() == [1]
+    assert conf.tolist() == [1.0]
+
+
+def test_tie_between_rows_of_the_same_client_matches():
+    # Mismo old_id cargado con dos grafías: 'PERE' está a la misma distancia de las dos
+    index = ClientNameIndex([7, 7, 9], ['Juan Perez SRL', 'Juan Peres SRL', 'Ana Gomez'])
+    ids, conf = index.match(['Juan Pere SRL'], threshold=0.3)
+    assert ids.tolist() == [7]
+    assert conf[0] is not None
+
+
+def test_tie_between_different_clients_is_ambiguous():
+    index = ClientNameIndex([7, 8], ['Juan Perez SRL', 'Juan Peres SRL'])
+    ids, conf = index.match(['Juan Pere SRL'], threshold=0.3)
+    assert ids.tolist() == [None]
+    assert conf.tolist() == [None]
+
+
+def test_below_threshold_stays_unmatched():
+    index = ClientNameIndex([1], ['Juan Perez SRL'])
+    ids, _ = index.match(['Maria Lopez'], threshold=0.6)
+    assert ids.tolist() == [None]
+
+
+def test_exact_name_of_two_clients_is_ambiguous():
+    index = ClientNameIndex([3, 8, 8], ['Juan Pérez', 'JUAN PEREZ', 'Juan Perez'])
+    assert index.ambiguous == {'JUAN PEREZ'}
+    ids, conf = index.match(['juan pérez', 'Juan Perez.'])
+    assert ids.tolist() == [None, None]
+    assert conf.tolist() == [None, None]
+
+
+def test_placeholder_names_are_not_indexed():
+    # col_strip deja 'nan' en las celdas vacías de CLIENTES
+    index = ClientNameIndex([1, 2, 3, 4], ['nan', 'None', '', 'Ana Gomez'])
+    assert len(index) == 1
+    ids, _ = index.match(['nan', 'NaN', 'Ana Gomez'])
+    assert ids.tolist() == [None, None, 4]
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pandas as pd
+
+from db_read import read_query
+
+COLUMNS = ['order_number', 'cod_cli', 'date', 'total_amount', 'notes', 'phone']
+# Lo que devuelve psycopg2 para cada fila (texto, números, fechas, NULL)
+ROWS = [
+    (1, 10, datetime(2023, 2, 2), 1195.0, 'pago "en mano", saldo', '0011'),
+    (2, 11, datetime(2025, 6, 19, 17, 34, 17, 523000), 2390.5, 'dos\nlíneas', None),
+    (3, None, None, None, '', '00'),
+    (4, 12, datetime(2025, 6, 24, 18, 58, 15, 179000), 0.0, None, ''),
+]
+
+
+def _pg_field(value):
+    """Un campo como lo escribe COPY ... (FORMAT csv): NULL vacío, '' entre comillas."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        text = value.strftime('%Y-%m-%d %H:%M:%S')
+        return text + (f'.{value.microsecond // 1000:03d}' if value.microsecond else '')
+    text = str(value)
+    if text == '' or any(ch in text for ch in ',"\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _pg_csv(rows):
+    lines = [','.join(COLUMNS)] + [','.join(_pg_field(v) for v in row) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.description = [(c,) for c in COLUMNS]
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def copy_expert(self, sql, buf):
+        buf.write(_pg_csv(self.rows).encode('utf-8'))
+
+    def execute(self, sql):
+        pass
+
+    def fetchmany(self, n):
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+
+class FakeConnection:
+    def cursor(self, name=None):
+        return FakeCursor(ROWS)
+
+
+def _read(method, itersize=2):
+    return read_query(FakeConnection(), 'SELECT 1', method=method, itersize=itersize,
+                      numeric=['order_number', 'cod_cli', 'total_amount'], dates=['date'])
+
+
+def test_copy_and_cursor_give_the_same_frame():
+    copy, cursor = _read('copy'), _read('cursor')
+    pd.testing.assert_frame_equal(copy, cursor)
+
+
+def test_typed_values():
+    df = _read('copy')
+    assert df['date'].tolist()[1] == pd.Timestamp('2025-06-19 17:34:17.523')
+    assert pd.isna(df['date'].iloc[2])
+    # Texto: ceros a la izquierda intactos, vacío y NULL como None
+    assert df['phone'].tolist() == ['0011', None, '00', None]
+    assert df['notes'].tolist() == ['pago "en mano", saldo', 'dos\nlíneas', None, None]
+    assert pd.isna(df['cod_cli'].iloc[2])
@@ -0,0 +1,147 @@
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import download_sheet as ds
+
+
+def _xlsx_bytes():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as zf:
+        zf.writestr('xl/workbook.xml', '<workbook/>' * 2000)
+    return buf.getvalue()
+
+
+class StandIn:
+    """Servidor local con el subconjunto de Drive v3 que usa HttpDriveClient."""
+
+    def __init__(self, content):
+        self.content = content
+        self.meta = {'id': ds.SPREADSHEET_ID, 'mimeType': 'application/octet-stream',
+                     'modifiedTime': '2025-12-31T00:00:00Z', 'version': '7', 'md5Checksum': 'abc'}
+        self.ranges = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if 'alt=media' not in self.path:
+                    body = json.dumps(stand_in.meta).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                rng = self.headers.get('Range')
+                stand_in.ranges.append(rng)
+                start, end = (int(x) for x in rng.split('=')[1].split('-'))
+                total = len(stand_in.content)
+                if start >= total:
+                    self.send_response(416)
+                    self.end_headers()
+                    return
+                body = stand_in.content[start:end + 1]
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{start + len(body) - 1}/{total}')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+
+@pytest.fixture
+def stand_in(tmp_path, monkeypatch):
+    server = StandIn(_xlsx_bytes())
+    output = str(tmp_path / 'libro.xlsx')
+    monkeypatch.setattr(ds, 'OUTPUT_FILE', output)
+    monkeypatch.setattr(ds, 'PART_FILE', output + '.part')
+    monkeypatch.setattr(ds, 'STATE_FILE', str(tmp_path / '.download_state.json'))
+    monkeypatch.setenv('DRIVE_API_URL', server.url)
+    yield server
+    server.server.shutdown()
+
+
+def test_download_then_unchanged(stand_in):
+    assert ds.download_sheet() == ds.EXIT_OK
+    with open(ds.OUTPUT_FILE, 'rb') as f:
+        assert f.read() == stand_in.content
+
+    stand_in.ranges.clear()
+    assert ds.download_sheet() == ds.EXIT_UNCHANGED
+    assert stand_in.ranges == []
+
+    # Otra versión remota: se vuelve a descargar
+    stand_in.meta['version'] = '8'
+    assert ds.download_sheet() == ds.EXIT_OK
+
+
+def test_resumes_a_partial_download(stand_in):
+    half = len(stand_in.content) // 2
+    with open(ds.PART_FILE, 'wb') as f:
+        f.write(stand_in.content[:half])
+    with open(ds.PART_FILE + '.json', 'w') as f:
+        json.dump(ds.remote_version(stand_in.meta), f)
+
+    assert ds.download_sheet() == ds.EXIT_OK
+    assert stand_in.ranges[0].startswith(f'bytes={half}-')
+    with open(ds.OUTPUT_FILE, 'rb') as f:
+        assert f.read() == stand_in.content
+
+
+def test_partial_from_another_version_starts_over(stand_in):
+    with open(ds.PART_FILE, 'wb') as f:
+        f.write(b'viejo')
+    with open(ds.PART_FILE + '.json', 'w') as f:
+        json.dump({'version': '1'}, f)
+
+    assert ds.download_sheet() == ds.EXIT_OK
+    assert stand_in.ranges[0].startswith('bytes=0-')
+
+
+def test_chunked_ranges(stand_in):
+    client = ds.HttpDriveClient(stand_in.url)
+    ds.download_file(client, stand_in.meta, chunk_size=1000)
+    assert len(stand_in.ranges) == -(-len(stand_in.content) // 1000)
+    with open(ds.OUTPUT_FILE, 'rb') as f:
+        assert f.read() == stand_in.content
+
+
+class _FakeRequest:
+    def __init__(self, content, calls):
+        self.uri = 'https://drive/files/x?alt=media'
+        self.http = self
+        self.content, self.calls = content, calls
+
+    def request(self, uri, method='GET', headers=None):
+        rng = (headers or {}).get('Range')
+        self.calls.append(rng)
+        start, end = (int(x) for x in rng.split('=')[1].split('-'))
+        body = self.content[start:end + 1]
+        resp = {'content-range': f'bytes {start}-{start + len(body) - 1}/{len(self.content)}'}
+        return type('Resp', (dict,), {'status': 206})(resp), body
+
+
+def test_google_client_resumes_with_a_range_header():
+    content, calls = bytes(range(250)) * 10, []
+    client = ds.GoogleDriveClient.__new__(ds.GoogleDriveClient)
+    files = type('Files', (), {'get_media': lambda self, fileId: _FakeRequest(content, calls)})()
+    client.service = type('Service', (), {'files': lambda self: files})()
+
+    chunks = list(client.download_chunks('x', {'mimeType': 'application/octet-stream'}, 1000, 600))
+    assert calls == ['bytes=1000-1599', 'bytes=1600-2199', 'bytes=2200-2799']
+    assert chunks[0][0] == 1000
+    assert b''.join(data for _, data in chunks) == content[1000:]
+
+
+def test_drive_client_is_abstract():
+    with pytest.raises(TypeError):
+        ds.DriveClient()
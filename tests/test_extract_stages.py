@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import pytest
+
+import extract_consolidated as ec
+
+SEEDS = ['clients_seed.json', 'products_seed.json', 'shipments_seed.json', 'orders_seed.json']
+
+pytestmark = pytest.mark.skipif(not os.path.exists(ec.excel_path), reason='falta el Excel de ventas')
+
+
+def _run(capsys, fmt):
+    assert ec._extract(None, True, False, False, False, fmt, False)
+    return capsys.readouterr().out
+
+
+def test_second_run_reuses_every_stage(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ec, 'output_dir', str(tmp_path))
+    first = _run(capsys, 'ndjson')
+    assert 'se reutiliza' not in first
+    assert os.path.exists(tmp_path / 'orders_seed.ndjson')
+
+    # Como en CI: el checkout trae los seeds del repo (pretty) al lado de los de la caché
+    shutil.copy(os.path.join(ec.SCRIPT_DIR, 'webapp', 'prisma', 'orders_seed.json'), tmp_path / 'orders_seed.json')
+    second = _run(capsys, 'ndjson')
+    for name in SEEDS:
+        assert f'se reutiliza {name}' in second
+    # El .json viejo no puede quedar al lado del .ndjson reutilizado (seed_fast.ts lo preferiría)
+    assert not os.path.exists(tmp_path / 'orders_seed.json')
+
+
+def test_code_change_invalidates_stages(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ec, 'output_dir', str(tmp_path))
+    _run(capsys, 'compact')
+    monkeypatch.setattr(ec, 'code_fingerprint', lambda files=ec.CODE_FILES: 'otro')
+    assert 'se reutiliza' not in _run(capsys, 'compact')
+
+
+def test_cube_only_with_flag_and_dropped_when_stale(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ec, 'output_dir', str(tmp_path))
+    _run(capsys, 'compact')
+    assert not os.path.exists(tmp_path / ec.CUBE_FILE)
+
+    assert ec._extract(None, True, False, True, False, 'compact', False, True)
+    assert os.path.exists(tmp_path / ec.CUBE_FILE) and os.path.exists(tmp_path / ec.FACTS_FILE)
+
+    # Seeds sin cambios: el cubo sigue valiendo
+    _run(capsys, 'compact')
+    assert os.path.exists(tmp_path / ec.CUBE_FILE)
+    # Seeds regenerados sin --cubo: un delta posterior partiría de hechos viejos
+    assert ec._extract(None, True, False, True, False, 'compact', False)
+    assert not os.path.exists(tmp_path / ec.CUBE_FILE) and not os.path.exists(tmp_path / ec.FACTS_FILE)
+
+
+def test_cube_flag_from_args_or_env(monkeypatch):
+    monkeypatch.delenv('ANALYTICS_CUBE', raising=False)
+    assert not ec.parse_args([])['cube']
+    assert ec.parse_args(['--cubo'])['cube']
+    monkeypatch.setenv('ANALYTICS_CUBE', '1')
+    assert ec.parse_args([])['cube']
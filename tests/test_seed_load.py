@@ -0,0 +1,159 @@
+import io
+import os
+
+import pytest
+
+import seed_load
+from seed_delta import PENDING_FILE, SNAPSHOT_FILE
+from seed_writer import write_seed
+
+CLIENTS = [
+    {'old_id': 1, 'name': 'Óptica Ñandú', 'type': 'Mayorista', 'email': 'a@b.com'},
+    {'old_id': 2, 'name': 'Juan\tPérez', 'type': None},
+]
+PRODUCTS = [{'sku': 'A-1', 'name': 'Armazón', 'stock': 3.0, 'lp1': 10.5}]
+SHIPMENTS = [{'shipment_number': 7, 'old_client_id': 1, 'date_shipped': '2025-03-01T00:00:00',
+              'date_arrived': 'no llegó', 'weight_fw': 1.5}]
+ORDERS = [
+    {'order_number': 10, 'client_old_id': 1, 'date': '2025-03-02T10:00:00', 'total_amount': 0,
+     'payment_amount': 5, 'payment_method': 'Efectivo', 'status': 'Entregado',
+     'items': [{'sku': 'A-1', 'product_name': 'Armazón', 'quantity': 2, 'unit_price': 10.5,
+                'shipment_number': 7},
+               {'sku': 'ZZ', 'product_name': None, 'quantity': 1, 'unit_price': 4}]},
+    {'order_number': 11, 'client_name_match': ' juan\tpérez ', 'date': None, 'total_amount': 30,
+     'payment_amount': 0, 'status': 'Pendiente', 'items': []},
+]
+
+
+def test_copy_value_escapes_and_nulls():
+    assert seed_load.copy_value(None, 'text') == '\\N'
+    assert seed_load.copy_value(float('nan'), 'float8') == '\\N'
+    assert seed_load.copy_value('a\tb\nc\\d\r', 'text') == 'a\\tb\\nc\\\\d\\r'
+    assert seed_load.copy_value(3.0, 'bigint') == '3'
+    assert seed_load.copy_value(2.5, 'float8') == '2.5'
+    assert seed_load.copy_value(True, 'text') == 't'
+    assert seed_load.copy_value('2025-03-01T00:00:00', 'timestamp') == '2025-03-01 00:00:00'
+    assert seed_load.copy_value('no llegó', 'timestamp') == '\\N'
+
+
+def test_copy_stream_is_utf8_in_any_block_size():
+    lines = ['Óptica Ñandú\t1\n', 'ÿ€\n', '\n']
+    expected = ''.join(lines).encode('utf-8')
+    for size in (1, 2, 3, 7, 1 << 16):
+        stream = seed_load.CopyStream(iter(lines))
+        blocks = list(iter(lambda: stream.read(size), b''))
+        assert b''.join(blocks) == expected
+        assert all(len(b) <= size for b in blocks)
+    assert seed_load.CopyStream(iter(lines)).read() == expected
+
+
+def test_record_rows_follow_staging_columns():
+    rows = list(seed_load._record_rows(CLIENTS, 'stage_clients'))
+    # seq, old_id, name, email, phone, type, address
+    assert rows == ['0\t1\tÓptica Ñandú\ta@b.com\t\\N\tMayorista\t\\N\n',
+                    '1\t2\tJuan\\tPérez\t\\N\t\\N\t\\N\t\\N\n']
+    widths = {len(r.split('\t')) for r in seed_load._record_rows(SHIPMENTS, 'stage_shipments')}
+    assert widths == {len(seed_load.STAGING['stage_shipments']) + 1}
+
+
+class _CopyCursor:
+    """Cursor que guarda lo que recibe cada COPY."""
+
+    def __init__(self):
+        self.copied = {}
+        self._count = 0
+
+    def execute(self, sql):
+        pass
+
+    def copy_expert(self, sql, source):
+        table = sql.split()[1]
+        text = source.read().decode('utf-8')
+        self.copied[table] = text.splitlines()
+        self._count = len(self.copied[table])
+
+    def fetchone(self):
+        return (self._count,)
+
+
+def test_copy_orders_links_items_to_their_order():
+    cur = _CopyCursor()
+    assert seed_load.copy_orders(cur, iter(ORDERS)) == (2, 2)
+    orders = [line.split('\t') for line in cur.copied['stage_orders']]
+    items = [line.split('\t') for line in cur.copied['stage_items']]
+    assert [o[:3] for o in orders] == [['0', '10', '1'], ['1', '11', '\\N']]
+    assert orders[1][3] == ' juan\\tpérez '
+    # seq del pedido, posición, sku, ..., shipment_number
+    assert [i[:3] for i in items] == [['0', '0', 'A-1'], ['0', '1', 'ZZ']]
+    assert items[0][8] == '7' and items[1][3] == '\\N'
+
+
+def test_confirm_snapshot_promotes_pending(tmp_path):
+    (tmp_path / PENDING_FILE).write_text('{}')
+    seed_load.confirm_snapshot(str(tmp_path))
+    assert not (tmp_path / PENDING_FILE).exists()
+    assert (tmp_path / SNAPSHOT_FILE).read_text() == '{}'
+
+
+# --- Contra PostgreSQL (DATABASE_URL con el esquema de Prisma, p.ej. `npx prisma db push`) ---
+
+TABLES = ['Client', 'Product', 'Shipment', 'Order', 'OrderItem', 'Transaction']
+SCHEMA = 'seed_load_test'
+
+
+@pytest.fixture
+def pg_conn():
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        pytest.skip('sin DATABASE_URL')
+    psycopg2 = pytest.importorskip('psycopg2')
+    conn = psycopg2.connect(url)
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.\"Order\"')")
+        if cur.fetchone()[0] is None:
+            conn.close()
+            pytest.skip('la BD no tiene el esquema de Prisma')
+        # Copias vacías de las tablas (con sus índices únicos) en un esquema aparte:
+        # la carga no toca los datos de public
+        cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}')
+        for table in TABLES:
+            cur.execute(f'CREATE TABLE {SCHEMA}."{table}" (LIKE public."{table}" INCLUDING ALL)')
+        cur.execute(f'SET search_path TO {SCHEMA}')
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        with conn, conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+        conn.close()
+
+
+def _snapshot(conn):
+    with conn, conn.cursor() as cur:
+        rows = {}
+        for table in TABLES:
+            cur.execute(f'SELECT * FROM "{table}" ORDER BY id')
+            rows[table] = cur.fetchall()
+    return rows
+
+
+def test_second_load_changes_nothing(pg_conn, tmp_path, capsys):
+    for name, records in [('clients_seed.json', CLIENTS), ('products_seed.json', PRODUCTS),
+                          ('shipments_seed.json', SHIPMENTS), ('orders_seed.json', ORDERS)]:
+        write_seed(str(tmp_path / name), records, 'ndjson')
+
+    seed_load.load_seeds(pg_conn, str(tmp_path))
+    first = _snapshot(pg_conn)
+    assert [len(first[t]) for t in TABLES] == [2, 1, 1, 2, 2, 3]
+    capsys.readouterr()
+
+    seed_load.load_seeds(pg_conn, str(tmp_path))
+    out = capsys.readouterr().out
+    assert _snapshot(pg_conn) == first
+    assert out.count('0 nuevos, 0 actualizados') == 3
+    assert 'pedidos: 2 en el seed, 0 con cambios' in out
+
+    with pg_conn, pg_conn.cursor() as cur:
+        cur.execute('SELECT o.order_number, c.old_id, o.total_amount FROM "Order" o '
+                    'JOIN "Client" c ON c.id = o."clientId" ORDER BY 1')
+        assert cur.fetchall() == [(10, 1, 25.0), (11, 2, 30.0)]
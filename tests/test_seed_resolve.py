@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+import pandas as pd
+
+import seed_resolve
+from seed_writer import read_seed, write_seed
+
+# Tablas clave -> id como las deja fetch_snapshot, con claves repetidas
+SNAPSHOT = {
+    'taken_at': '2025-12-31T00:00:00',
+    'tables': {
+        'clients': {'id': [5, 9, 2, 7], 'old_id': [1, 1, 2, None],
+                    'name': ['Óptica Sur', 'Optica Sur 2', ' juan pérez ', 'JUAN PÉREZ']},
+        'products': {'id': [30, 31, 32], 'sku': ['A-1', 'B-2', 'A-1']},
+        'shipments': {'id': [40], 'shipment_number': [7]},
+        'suppliers': {'id': [50, 51], 'name': ['ACME', 'acme ']},
+    },
+}
+
+ORDERS = [
+    {'order_number': 10, 'client_old_id': 1, 'total_amount': 25,
+     'items': [{'sku': 'A-1', 'shipment_number': 7, 'supplier_name': 'Acme'},
+               {'sku': 'NUEVO', 'shipment_number': 8, 'supplier_name': None}]},
+    {'order_number': 11, 'client_old_id': None, 'client_name_match': 'Juan Pérez', 'items': []},
+    {'order_number': 12, 'client_old_id': 99, 'items': [{'sku': 'B-2'}]},
+]
+
+
+def _sha(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_key_index_keeps_highest_id_per_key():
+    index = seed_resolve.key_index(seed_resolve.name_keys(['b', ' A', None, 'a', 'B ']), [4, 3, 8, 1, 2])
+    assert index.to_dict() == {'A': 3, 'B': 4}
+    ids = seed_resolve.lookup(index, pd.Index(['A', 'C', 'B']))
+    assert ids.tolist() == [3, None, 4]
+
+
+def test_resolve_rewrites_seed_and_keeps_its_state_hash(tmp_path):
+    seed = tmp_path / 'orders_seed.json'
+    write_seed(str(seed), ORDERS, 'pretty')
+    write_seed(str(tmp_path / 'products_seed.json'), [{'sku': 'NUEVO'}], 'compact')
+    state_path = tmp_path / seed_resolve.EXTRACT_STATE_FILE
+    state_path.write_text(json.dumps({'orders_seed.json': {'sha256': _sha(seed), 'inputs': {}}}))
+
+    report = seed_resolve.resolve_seeds(str(tmp_path), SNAPSHOT)
+
+    orders = read_seed(str(seed))
+    assert [o['clientId'] for o in orders] == [9, 7, None]
+    assert [(i['productId'], i['shipmentId'], i['supplierId']) for i in orders[0]['items']] == \
+        [(32, 40, 51), (None, None, None)]
+    assert orders[2]['items'][0]['productId'] == 31
+    # Mismo formato que antes y la huella del estado es la del archivo reescrito
+    assert seed.read_text().startswith('[\n')
+    assert json.loads(state_path.read_text())['orders_seed.json']['sha256'] == _sha(seed)
+
+    unresolved = report['unresolved']
+    assert unresolved['sku']['keys'] == [{'key': 'NUEVO', 'records': 1, 'status': 'pending'}]
+    assert unresolved['client_old_id']['keys'] == [{'key': 99, 'records': 1, 'status': 'missing'}]
+    assert unresolved['shipment_number']['missing'] == 1
+
+
+def test_hand_edited_seed_keeps_stale_state(tmp_path):
+    seed = tmp_path / 'orders_seed.json'
+    write_seed(str(seed), ORDERS, 'compact')
+    state_path = tmp_path / seed_resolve.EXTRACT_STATE_FILE
+    state_path.write_text(json.dumps({'orders_seed.json': {'sha256': 'otro'}}))
+
+    seed_resolve.resolve_seeds(str(tmp_path), SNAPSHOT)
+
+    # El seed no era el que generó la extracción: la próxima corrida lo tiene que regenerar
+    assert json.loads(state_path.read_text())['orders_seed.json']['sha256'] == 'otro'
+    assert not seed.read_text().startswith('[\n')
@@ -0,0 +1,37 @@
+import sys
+
+import extract_consolidated
+import sync_cli
+from client_ledger import build_ledger
+from seed_writer import write_seed
+
+ORDERS = [
+    {'order_number': 1, 'client_old_id': 1, 'date': '2025-01-10', 'total_amount': 500, 'payment_amount': 200,
+     'items': [{'unit_price': 250, 'quantity': 2}]},
+    {'order_number': 2, 'client_old_id': 2, 'date': '2025-12-01', 'total_amount': 100, 'payment_amount': 300,
+     'items': []},
+    {'order_number': 3, 'client_old_id': 2, 'date': '2025-12-20', 'total_amount': -50, 'payment_amount': 0,
+     'items': [{'unit_price': -50, 'quantity': 1}, {'unit_price': 0, 'quantity': 1}]},
+    {'order_number': 4, 'client_old_id': 3, 'date': None, 'total_amount': 80, 'payment_amount': 0},
+]
+
+
+def test_stats_are_the_ledger_totals(tmp_path):
+    write_seed(str(tmp_path / 'orders_seed.json'), ORDERS, 'ndjson')
+    write_seed(str(tmp_path / 'clients_seed.json'), [{'old_id': 1}, {'old_id': 2}], 'pretty')
+    stats = sync_cli.seed_stats(str(tmp_path))
+    totals = build_ledger(iter(ORDERS))['totals']
+    assert stats['clients_seed.json'] == {'records': 2}
+    assert stats['orders_seed.json'] == {
+        'records': len(ORDERS), 'items': 3, 'total_amount': totals['debt'],
+        'payment_amount': totals['payments'], 'balance': totals['balance'],
+        'unpaid_orders': totals['unpaid_orders']}
+
+
+def test_extract_gets_its_options_without_touching_sys_argv(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(extract_consolidated, 'extract_all', lambda argv=None: seen.setdefault('argv', argv))
+    before = list(sys.argv)
+    assert sync_cli.main(['extract', '7', '--ndjson']) == 0
+    assert seen['argv'] == ['7', '--ndjson']
+    assert sys.argv == before
@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from workbook_reader import columns_frame, open_workbook
+
+
+def _write_book(path, rows, title='CABE_VENTAS'):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = title
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def test_columns_frame_types_like_read_excel():
+    columns = [['COD', 1, 2, ''], ['NOMBRE', 'Ana', 'NA', 'Luis'],
+               ['FECHA', datetime(2025, 1, 2), '', datetime(2025, 3, 4)], ['', '', '', '']]
+    df = columns_frame(columns, 0)
+    assert list(df.columns) == ['COD', 'NOMBRE', 'FECHA', 'Unnamed: 3']
+    assert df['COD'].tolist()[:2] == [1.0, 2.0] and pd.isna(df['COD'].iloc[2])
+    assert df['NOMBRE'].isna().tolist() == [False, True, False]
+    assert pd.api.types.is_datetime64_any_dtype(df['FECHA'])
+
+
+def test_duplicate_and_numeric_header_names():
+    df = columns_frame([['SKU', 'a'], ['SKU', 'b'], [14.8, 'c']], 0)
+    assert list(df.columns) == ['SKU', 'SKU.1', 14.8]
+
+
+def test_header_row_detected_and_trailing_blank_rows_dropped(tmp_path):
+    path = tmp_path / 'libro.xlsx'
+    _write_book(path, [['Ventas'], [], ['NRO_PEDIDO', 'CLIENTE'], [1, 'Ana'], [2, 'Luis'], [None, None]])
+    wb = open_workbook(str(path), cache=None)
+    assert wb.header_row('CABE_VENTAS') == 2
+    df = wb.read_sheet('CABE_VENTAS')
+    assert df['NRO_PEDIDO'].tolist() == [1, 2]
+    assert wb.raw_rows('CABE_VENTAS', 1) == [['Ventas', '']]
+
+
+def test_open_workbook_reopens_a_replaced_file(tmp_path):
+    path = tmp_path / 'libro.xlsx'
+    _write_book(path, [['NRO_PEDIDO'], [1]])
+    first = open_workbook(str(path), cache=None)
+    assert first.read_sheet('CABE_VENTAS')['NRO_PEDIDO'].tolist() == [1]
+    assert open_workbook(str(path), cache=None) is first
+
+    _write_book(path, [['NRO_PEDIDO'], [1], [2]])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = open_workbook(str(path), cache=None)
+    assert second is not first
+    assert second.read_sheet('CABE_VENTAS')['NRO_PEDIDO'].tolist() == [1, 2]
+
+
+def test_open_workbook_keys_on_cache_argument(tmp_path):
+    path = tmp_path / 'libro.xlsx'
+    _write_book(path, [['NRO_PEDIDO'], [1]])
+    assert open_workbook(str(path), cache=None) is not open_workbook(str(path), cache='default')
@@ -2,9 +2,43 @@
 import { PrismaClient } from '@prisma/client';
 import fs from 'fs';
 import path from 'path';
+import readline from 'readline';
 
 const prisma = new PrismaClient();
 
+// SEED_DELTA=1: aplicar solo altas y cambios de los *_delta.json (extract_consolidated.py --delta)
+const USE_DELTA = process.env.SEED_DELTA === '1';
+
+// Seeds en NDJSON (SEED_FORMAT=ndjson): <seed>.ndjson en vez de <seed>.json, un registro
+// por línea; se lee línea a línea sin cargar el archivo entero como texto
+async function readNdjson(file: string): Promise<any[]> {
+    const records: any[] = [];
+    const lines = readline.createInterface({ input: fs.createReadStream(file, 'utf-8'), crlfDelay: Infinity });
+    for await (const line of lines) {
+        if (line.trim()) records.push(JSON.parse(line));
+    }
+    return records;
+}
+
+async function loadSeed(prismaDir: string, name: string): Promise<any[]> {
+    const deltaPath = path.join(prismaDir, name.replace('_seed.json', '_delta.json'));
+    if (USE_DELTA && fs.existsSync(deltaPath)) {
+        const delta = JSON.parse(fs.readFileSync(deltaPath, 'utf-8'));
+        console.log(`   🔁 ${path.basename(deltaPath)}: +${delta.inserts.length} ~${delta.updates.length} -${delta.deletes.length}`);
+        if (delta.deletes.length > 0) {
+            // Las bajas se informan pero no se borran: la BD conserva el historial
+            console.log(`      ⚠️ ${delta.deletes.length} ${delta.key} ya no están en el Excel (no se eliminan)`);
+        }
+        return [...delta.inserts, ...delta.updates];
+    }
+    const jsonPath = path.join(prismaDir, name);
+    const ndjsonPath = jsonPath.replace(/\.json$/, '.ndjson');
+    if (!fs.existsSync(jsonPath) && fs.existsSync(ndjsonPath)) {
+        return readNdjson(ndjsonPath);
+    }
+    return JSON.parse(fs.readFileSync(jsonPath, 'utf-8'));
+}
+
 async function main() {
     console.log("🚀 Iniciando Sembrado Rápido (Consolidado)...");
     const startTime = Date.now();
@@ -12,10 +46,10 @@ async function main() {
     const prismaDir = path.join(process.cwd(), 'prisma');
 
     // 1. CARGAR DATOS
-    const clientsData = JSON.parse(fs.readFileSync(path.join(prismaDir, 'clients_seed.json'), 'utf-8'));
-    const productsData = JSON.parse(fs.readFileSync(path.join(prismaDir, 'products_seed.json'), 'utf-8'));
-    const shipmentsData = JSON.parse(fs.readFileSync(path.join(prismaDir, 'shipments_seed.json'), 'utf-8'));
-    const ordersData = JSON.parse(fs.readFileSync(path.join(prismaDir, 'orders_seed.json'), 'utf-8'));
+    const clientsData = await loadSeed(prismaDir, 'clients_seed.json');
+    const productsData = await loadSeed(prismaDir, 'products_seed.json');
+    const shipmentsData = await loadSeed(prismaDir, 'shipments_seed.json');
+    const ordersData = await loadSeed(prismaDir, 'orders_seed.json');
 
     // 2. PRE-CARGAR MAPAS DE MEMORIA (Para evitar miles de SELECT)
     console.log("⏳ Pre-cargando metadatos de la BD...");
@@ -198,6 +232,12 @@ async function main() {
         if (orderCounter % 100 === 0) console.log(`   ...procesados ${orderCounter} pedidos`);
     }
 
+    // Confirmar el snapshot: la próxima extracción calcula cambios desde este punto
+    const pendingSnapshot = path.join(prismaDir, '.seed_snapshot.pending.json');
+    if (fs.existsSync(pendingSnapshot)) {
+        fs.renameSync(pendingSnapshot, path.join(prismaDir, '.seed_snapshot.json'));
+    }
+
     const endTime = Date.now();
     console.log(`\n✅ Sincronización finalizada en ${(endTime - startTime) / 1000}s.`);
 }
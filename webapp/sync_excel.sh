@@ -17,25 +17,35 @@ if [ ! -f "$PYTHON_EXEC" ]; then
     PYTHON_EXEC="python3"
 fi
 
+# Download and extract run through the CLI (python3 -m sync_cli) from the project root
+cd "$APP_ROOT"
+
 # 1. Download Latest Sheet
 echo "-> Downloading latest Sheet from Google Drive..."
-"$PYTHON_EXEC" "$APP_ROOT/download_sheet.py"
-if [ $? -ne 0 ]; then
+"$PYTHON_EXEC" -m sync_cli download
+DOWNLOAD_STATUS=$?
+if [ $DOWNLOAD_STATUS -eq 3 ]; then
+   echo "Sheet unchanged since last download. Using local file..."
+elif [ $DOWNLOAD_STATUS -ne 0 ]; then
    echo "Warning: Google Sheet Sync failed or skipped. Continuing with local file..."
 fi
 
 # 2. Extract Data
 echo "-> Extracting data from Excel (Filter: $DAYS_FILTER days)..."
-"$PYTHON_EXEC" "$APP_ROOT/extract_consolidated.py" "$DAYS_FILTER"
+"$PYTHON_EXEC" -m sync_cli extract "$DAYS_FILTER"
 if [ $? -ne 0 ]; then
    echo "Error: Extraction failed."
    exit 1
 fi
 
-# 3. Seed Fast
+# 3. Seed Fast (SEED_LOADER=python: set-based COPY + upsert loader, seed_load.py)
 echo "-> Updating Database (Fast Differential Seed)..."
-cd "$DIR"
-npx tsx prisma/seed_fast.ts
+if [ "$SEED_LOADER" = "python" ]; then
+    "$PYTHON_EXEC" -m sync_cli resolve && "$PYTHON_EXEC" -m sync_cli load
+else
+    cd "$DIR"
+    npx tsx prisma/seed_fast.ts
+fi
 if [ $? -ne 0 ]; then
    echo "Error: Database update failed."
    exit 1
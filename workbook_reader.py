@@ -0,0 +1,353 @@
+
+"""
+Lector compartido del Excel de ventas/compras.
+
+Abre el .xlsx una sola vez (openpyxl en modo read-only) y recorre cada hoja
+una única vez: mientras lee las filas detecta la fila de encabezado
+('NRO ENVIO', 'NRO_PEDIDO', 'SKU'/'INV-REM') y va guardando los valores por
+columna (no se arma una lista por fila). El DataFrame sale de esas columnas con
+las mismas reglas que pd.read_excel: valores de NA_VALUES como NaN, columnas
+numéricas convertidas y el resto inferido (fechas como datetime64), así que los
+tipos son los mismos que antes. Las hojas ya leídas quedan en memoria para que
+todos los extractores del mismo proceso usen exactamente los mismos DataFrames.
+
+Entre procesos, las hojas parseadas se guardan en la caché Parquet de
+sheet_cache.py (por hash del archivo): si el .xlsx no cambió no se vuelve a abrir.
+
+Uso:
+    from workbook_reader import open_workbook
+    wb = open_workbook(excel_path)
+    df_cv = wb.read_sheet('CABE_VENTAS')
+"""
+
+import hashlib
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+from sheet_cache import SheetCache, file_digest
+from stage_trace import stage
+
+# Textos que pd.read_excel lee como NaN (los de pandas por defecto; copiados acá para no
+# depender de pandas._libs, que cambia entre versiones)
+NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+# Marcadores de encabezado y cuántas filas revisar para encontrarlos
+HEADER_MARKERS = {
+    'CABE_ENVIOS': (('NRO ENVIO',), 10),
+    'CABE_VENTAS': (('NRO_PEDIDO',), 15),
+    'DETA_VENTAS': (('SKU', 'INV-REM'), 15),
+}
+
+def normalize_columns(df):
+    """Columnas en mayúsculas y sin espacios, como esperan todos los extractores."""
+    df.columns = [str(c).upper().strip() for c in df.columns]
+    return df
+
+def _convert_cell(cell):
+    # Misma conversión que pandas (openpyxl): vacío -> '', error -> NaN, enteros como int
+    if cell.value is None:
+        return ''
+    if cell.data_type == 'e':
+        return np.nan
+    if cell.data_type == 'n':
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+def _is_header(row, markers):
+    vals = [str(x).upper().strip() for x in row]
+    return any(m in vals for m in markers)
+
+def _header_names(header, width):
+    # Mismos nombres que genera pandas: 'Unnamed: i' para vacíos, '.1', '.2' para repetidos
+    # y los números o fechas del encabezado tal cual
+    names = []
+    seen = set()
+    for i in range(width):
+        val = header[i] if i < len(header) else ''
+        name = f'Unnamed: {i}' if val == '' else val
+        base, n = name, 0
+        while name in seen:
+            n += 1
+            name = f'{base}.{n}'
+        seen.add(name)
+        names.append(name)
+    return names
+
+def _is_na(value):
+    return isinstance(value, str) and value in NA_VALUES
+
+def _column(values):
+    """Una columna como la deja pd.read_excel: NA_VALUES -> NaN, numérica si se puede."""
+    s = pd.Series(values, dtype=object)
+    s = s.mask(s.map(_is_na))
+    try:
+        return pd.to_numeric(s)
+    except (ValueError, TypeError):
+        return s.infer_objects()
+
+def columns_frame(columns, header):
+    """DataFrame a partir de las columnas de la hoja, con la fila `header` como encabezado."""
+    if not columns:
+        return pd.DataFrame()
+    names = _header_names([col[header] for col in columns], len(columns))
+    return pd.DataFrame({name: _column(col[header + 1:]) for name, col in zip(names, columns)})
+
+class WorkbookReader:
+    def __init__(self, path, cache='default'):
+        self.path = path
+        # Caché Parquet por hash del archivo (ver sheet_cache.py); None la desactiva
+        self.cache = SheetCache.default() if cache == 'default' else cache
+        self._digest = None
+        self._book = None
+        self._columns = {}   # hoja -> valores por columna (una sola lectura del XML)
+        self._headers = {}   # hoja -> índice de la fila de encabezado detectada
+        self._frames = {}    # (hoja, header) -> DataFrame parseado
+
+    @property
+    def book(self):
+        if self._book is None:
+            from openpyxl import load_workbook
+            # Abrir el libro ya lee sharedStrings y estilos de todo el archivo
+            with stage('open:xlsx', bytes=os.path.getsize(self.path)):
+                self._book = load_workbook(self.path, read_only=True, data_only=True, keep_links=False)
+        return self._book
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = file_digest(self.path)
+        return self._digest
+
+    @property
+    def sheet_names(self):
+        if self.cache:
+            names = self.cache.sheet_names(self.digest)
+            if names is not None:
+                return names
+            self.cache.set_sheet_names(self.digest, self.book.sheetnames)
+        return self.book.sheetnames
+
+    def close(self):
+        if self._book is not None:
+            self._book.close()
+            self._book = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_rows(self, sheet_name):
+        """Genera las filas de la hoja ya convertidas (sin recortar ni rellenar)."""
+        ws = self.book[sheet_name]
+        ws.reset_dimensions()
+        for row in ws.rows:
+            converted = [_convert_cell(c) for c in row]
+            while converted and converted[-1] == '':
+                converted.pop()
+            yield converted
+
+    def _load(self, sheet_name):
+        if sheet_name in self._columns:
+            return self._columns[sheet_name]
+        with stage(f'read:{sheet_name}', sheet=sheet_name) as st:
+            columns = self._read_columns(sheet_name)
+            st['rows_out'] = len(columns[0]) if columns else 0
+        self._columns[sheet_name] = columns
+        return columns
+
+    def _read_columns(self, sheet_name):
+        """
+        Valores de la hoja desde el XML (openpyxl), una lista por columna (todas del mismo
+        largo, vacíos como ''); detecta el encabezado en la misma pasada.
+        """
+        markers, scan = HEADER_MARKERS.get(sheet_name, ((), 0))
+        columns = []
+        rows = last_row_with_data = 0
+        header_idx = None
+        for i, row in enumerate(self.iter_rows(sheet_name)):
+            if row:
+                last_row_with_data = i + 1
+            # Detección de encabezado mientras se lee, sin segunda pasada
+            if header_idx is None and i < scan and _is_header(row, markers):
+                header_idx = i
+            # Una columna nueva arranca con vacíos en las filas ya leídas
+            columns.extend([''] * rows for _ in range(len(row) - len(columns)))
+            for j, col in enumerate(columns):
+                col.append(row[j] if j < len(row) else '')
+            rows += 1
+        # Las filas vacías del final no son parte de la hoja
+        for col in columns:
+            del col[last_row_with_data:]
+        self._headers[sheet_name] = header_idx or 0
+        return columns if last_row_with_data else []
+
+    def iter_batches(self, sheet_name, batch_size=5000, normalize=True):
+        """
+        Recorre la hoja en DataFrames de hasta `batch_size` filas, sin guardar la hoja
+        completa en memoria (pensado para DETA_VENTAS). El encabezado se detecta igual
+        que en read_sheet. Cada lote es de tipo object con los valores tal como están
+        en la celda (int/float/str/datetime) y las celdas vacías como NaN; no se
+        infiere un dtype por columna porque un lote no ve la columna entera.
+        """
+        markers, scan = HEADER_MARKERS.get(sheet_name, ((), 0))
+        rows = self.iter_rows(sheet_name)
+        pending = []
+        header = None
+        for i, row in enumerate(rows):
+            if i < scan and _is_header(row, markers):
+                # Las filas anteriores al encabezado se descartan (como header=N)
+                header, pending = row, []
+                break
+            pending.append(row)
+            if i + 1 >= scan:
+                break
+        if header is None:
+            # Sin marcador: primera fila como encabezado (como header=0)
+            if not pending:
+                return
+            header, pending = pending[0], pending[1:]
+
+        batch = [r for r in pending if r]
+        for row in rows:
+            if not row:
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield self._batch_frame(header, batch, normalize)
+                batch = []
+        if batch:
+            yield self._batch_frame(header, batch, normalize)
+
+    @staticmethod
+    def _batch_frame(header, batch, normalize):
+        width = max(len(header), max(len(r) for r in batch))
+        names = _header_names(header, width)
+        padded = [r + [''] * (width - len(r)) if len(r) < width else r for r in batch]
+        df = pd.DataFrame(padded, columns=names, dtype=object)
+        df = df.mask(df.isin(NA_VALUES))
+        return normalize_columns(df) if normalize else df
+
+    def raw_rows(self, sheet_name, nrows=None):
+        """Filas crudas de la hoja (equivalente a header=None)."""
+        columns = self._load(sheet_name)
+        return [list(row) for row in zip(*(col[:nrows] for col in columns))]
+
+    def header_row(self, sheet_name):
+        if sheet_name not in self._headers and self.cache:
+            cached = self.cache.header(self.digest, sheet_name)
+            if cached is not None:
+                self._headers[sheet_name] = cached
+                return cached
+        if sheet_name not in self._headers:
+            self._load(sheet_name)
+            if self.cache:
+                self.cache.set_header(self.digest, sheet_name, self._headers[sheet_name])
+        return self._headers[sheet_name]
+
+    def _parse(self, sheet_name, header):
+        """DataFrame de la hoja (de la caché o parseado) y si vino de la caché."""
+        cached = self.cache.get(self.digest, sheet_name, header) if self.cache else None
+        if cached is not None:
+            return cached, True
+        df = columns_frame(self._load(sheet_name), header)
+        if self.cache:
+            self.cache.put(self.digest, sheet_name, header, df)
+        return df, False
+
+    def read_sheet(self, sheet_name, header='auto', normalize=True):
+        """
+        DataFrame de la hoja, con el mismo resultado que pd.read_excel(sheet_name=..., header=...).
+        header='auto' usa la fila detectada por HEADER_MARKERS (0 para hojas sin marcador).
+        """
+        if header == 'auto':
+            header = self.header_row(sheet_name)
+        key = (sheet_name, header)
+        if key not in self._frames:
+            with stage(f'parse:{sheet_name}', sheet=sheet_name) as st:
+                self._frames[key], st['cache'] = self._parse(sheet_name, header)
+                st['rows_out'] = len(self._frames[key])
+        df = self._frames[key].copy(deep=False)
+        return normalize_columns(df) if normalize else df
+
+# --- Huellas por hoja (para saltear hojas sin cambios) ---
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_SHARED_REF = re.compile(rb'<c\b[^>]*\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+def _sheet_parts(zf):
+    """Nombre de hoja -> ruta de su XML dentro del zip, en el orden del libro."""
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(_NS_PKG + 'Relationship'):
+        target = rel.get('Target')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+    book = ET.fromstring(zf.read('xl/workbook.xml'))
+    return {sh.get('name'): targets[sh.get(_NS_REL + 'id')] for sh in book.iter(_NS_MAIN + 'sheet')}
+
+def _shared_strings(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    for _, el in ET.iterparse(zf.open('xl/sharedStrings.xml')):
+        if el.tag == _NS_MAIN + 'si':
+            strings.append(''.join(t.text or '' for t in el.iter(_NS_MAIN + 't')))
+            el.clear()
+    return strings
+
+def sheet_fingerprints(path, sheet_names=None):
+    """
+    Huella (sha256) de cada hoja leyendo solo su parte XML dentro del .xlsx, sin parsear
+    celdas. Incluye los textos compartidos (sharedStrings) que la hoja referencia y los
+    estilos del libro, porque de ellos dependen los valores que se leen: si la huella
+    no cambió, la hoja da exactamente el mismo DataFrame.
+    Devuelve {hoja: huella} en el orden del libro (todas, o solo `sheet_names`).
+    """
+    with zipfile.ZipFile(path) as zf:
+        parts = _sheet_parts(zf)
+        wanted = [n for n in parts if sheet_names is None or n in sheet_names]
+        styles = hashlib.sha256(zf.read('xl/styles.xml')).digest() if 'xl/styles.xml' in zf.namelist() else b''
+        shared = None
+        result = {}
+        for name in wanted:
+            xml = zf.read(parts[name])
+            h = hashlib.sha256(xml)
+            h.update(styles)
+            refs = _SHARED_REF.findall(xml)
+            if refs:
+                if shared is None:
+                    shared = _shared_strings(zf)
+                for ref in refs:
+                    idx = int(ref)
+                    h.update(b'\0' + (shared[idx] if idx < len(shared) else '').encode('utf-8'))
+            result[name] = h.hexdigest()
+        return result
+
+_readers = {}
+
+def open_workbook(path, cache='default'):
+    """
+    Lector compartido: dentro de un proceso cada archivo se abre una vez. La clave incluye
+    tamaño y fecha de modificación (un archivo reemplazado, p.ej. por una descarga, abre
+    un lector nuevo) y la caché pedida.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, cache)
+    if key not in _readers:
+        # Los lectores de versiones anteriores del mismo archivo ya no sirven
+        for old in [k for k in _readers if k[0] == key[0]]:
+            _readers.pop(old).close()
+        _readers[key] = WorkbookReader(path, cache=cache)
+    return _readers[key]
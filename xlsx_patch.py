@@ -0,0 +1,213 @@
+
+"""
+Escritura de cambios puntuales en una hoja del .xlsx, sin reescribir el libro.
+
+pd.ExcelWriter (igual que openpyxl.load_workbook + save) vuelve a generar todas las
+hojas: tarda lo que tarda leer el libro completo y se pierden formatos, fórmulas,
+tablas dinámicas y validaciones. Acá el .xlsx se trata como el zip que es:
+    - de cada hoja modificada se reescriben solo las filas con celdas cambiadas
+      (el resto del XML de la hoja se copia tal cual, sin parsearlo);
+    - las demás partes del zip (otras hojas, estilos, sharedStrings, pivots...) se
+      copian comprimidas, byte a byte, sin descomprimirlas.
+Los textos nuevos van como inlineStr, así no hace falta reescribir sharedStrings.xml,
+y cada celda conserva su estilo (atributo s).
+
+Uso:
+    from xlsx_patch import frame_changes, patch_workbook
+    changes = frame_changes(df_antes, df_despues, first_row=2)
+    patch_workbook(excel_path, {'CLIENTES': changes})
+"""
+
+import datetime as dt
+import math
+import os
+import re
+import struct
+import zipfile
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import to_excel
+from workbook_reader import _sheet_parts
+
+_SHEET_DATA = re.compile(rb'<sheetData\s*/>|<sheetData\b[^>]*>(.*?)</sheetData>', re.S)
+_ROW = re.compile(rb'<row\b([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_CELL = re.compile(rb'<c\b([^>]*?)(?:/>|>.*?</c>)', re.S)
+_REF = re.compile(rb'\br="([A-Z]+)(\d+)"')
+_ROW_NUM = re.compile(rb'\br="(\d+)"')
+_STYLE = re.compile(rb'\bs="(\d+)"')
+_SPANS = re.compile(rb'\s+spans="[^"]*"')
+_DIMENSION = re.compile(rb'<dimension\b[^>]*\bref="([^"]*)"')
+
+def frame_changes(before, after, first_row=2):
+    """
+    Celdas que difieren entre dos DataFrames de la misma hoja (mismas columnas y en el
+    mismo orden; `after` puede tener filas agregadas al final).
+    first_row: fila de la hoja (1-based) que corresponde a la primera fila del DataFrame,
+    p.ej. 2 si el encabezado está en la fila 1. La columna i del DataFrame es la i+1 de
+    la hoja, como la lee workbook_reader.
+    Devuelve {(fila, columna): valor} con fila y columna 1-based; NaN = celda vacía.
+    """
+    old = before.to_numpy(dtype=object)
+    new = after.to_numpy(dtype=object)
+    n = len(old)
+    same = (new[:n] == old) | (pd.isna(new[:n]) & pd.isna(old))
+    changes = {}
+    for r, c in zip(*np.nonzero(~same)):
+        changes[(first_row + r, c + 1)] = new[r, c]
+    # Filas agregadas: solo las celdas con valor
+    for r, c in zip(*np.nonzero(pd.notna(new[n:]))):
+        changes[(first_row + n + r, c + 1)] = new[n + r, c]
+    return changes
+
+def _is_empty(value):
+    if value is None or value is pd.NaT:
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+def _cell_xml(ref, value, style):
+    attrs = b' r="' + ref + b'"' + (b' s="' + style + b'"' if style else b'')
+    if _is_empty(value):
+        return b'<c' + attrs + b'/>'
+    if isinstance(value, (bool, np.bool_)):
+        return b'<c' + attrs + b' t="b"><v>' + (b'1' if value else b'0') + b'</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return b'<c' + attrs + b'><v>' + str(int(value)).encode() + b'</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if math.isinf(value):
+            return b'<c' + attrs + b'/>'
+        return b'<c' + attrs + b'><v>' + repr(float(value)).encode() + b'</v></c>'
+    if isinstance(value, (dt.datetime, dt.date)):
+        # Fecha como número de serie; el formato lo da el estilo que ya tenía la celda
+        if isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+        return b'<c' + attrs + b'><v>' + repr(to_excel(value)).encode() + b'</v></c>'
+    text = ILLEGAL_CHARACTERS_RE.sub('', str(value))
+    return (b'<c' + attrs + b' t="inlineStr"><is><t xml:space="preserve">'
+            + escape(text).encode('utf-8') + b'</t></is></c>')
+
+def _patch_row(row_num, attrs, body, cells):
+    """Reescribe una fila reemplazando/agregando las celdas de `cells` ({columna: valor})."""
+    existing = {}
+    for m in _CELL.finditer(body or b''):
+        ref = _REF.search(m.group(1))
+        existing[column_index_from_string(ref.group(1).decode())] = m
+    out = {col: m.group(0) for col, m in existing.items()}
+    for col, value in cells.items():
+        style = None
+        if col in existing:
+            s = _STYLE.search(existing[col].group(1))
+            style = s.group(1) if s else None
+        ref = f'{get_column_letter(col)}{row_num}'.encode()
+        out[col] = _cell_xml(ref, value, style)
+    # spans es solo una pista de lectura y puede quedar corta: se quita
+    attrs = _SPANS.sub(b'', attrs or b' r="' + str(row_num).encode() + b'"')
+    return b'<row' + attrs + b'>' + b''.join(out[c] for c in sorted(out)) + b'</row>'
+
+def _update_dimension(xml, max_row, max_col):
+    m = _DIMENSION.search(xml)
+    if not m:
+        return xml
+    ref = m.group(1).decode()
+    first, _, last = ref.partition(':')
+    last = last or first
+    cm = re.match(r'([A-Z]+)(\d+)', last)
+    if not cm:
+        return xml
+    new_last = (f'{get_column_letter(max(column_index_from_string(cm.group(1)), max_col))}'
+                f'{max(int(cm.group(2)), max_row)}')
+    return xml[:m.start(1)] + f'{first}:{new_last}'.encode() + xml[m.end(1):]
+
+def patch_sheet_xml(xml, changes):
+    """XML de la hoja con los cambios ({(fila, columna): valor}) aplicados."""
+    by_row = {}
+    for (r, c), value in changes.items():
+        by_row.setdefault(r, {})[c] = value
+    pending = sorted(by_row)
+
+    m = _SHEET_DATA.search(xml)
+    if m is None:
+        raise ValueError('la hoja no tiene <sheetData>')
+    body = m.group(1) or b''
+    pieces = []
+    pos = 0
+    i = 0
+    for row in _ROW.finditer(body):
+        num = int(_ROW_NUM.search(row.group(1)).group(1))
+        # Filas nuevas que van antes de esta (no existían en el XML)
+        while i < len(pending) and pending[i] < num:
+            pieces.append(body[pos:row.start()])
+            pos = row.start()
+            pieces.append(_patch_row(pending[i], None, None, by_row[pending[i]]))
+            i += 1
+        if i < len(pending) and pending[i] == num:
+            pieces.append(body[pos:row.start()])
+            pieces.append(_patch_row(num, row.group(1), row.group(2), by_row[num]))
+            pos = row.end()
+            i += 1
+    pieces.append(body[pos:])
+    for r in pending[i:]:
+        pieces.append(_patch_row(r, None, None, by_row[r]))
+
+    new_data = b'<sheetData>' + b''.join(pieces) + b'</sheetData>'
+    xml = xml[:m.start()] + new_data + xml[m.end():]
+    if changes:
+        xml = _update_dimension(xml, max(by_row), max(c for _, c in changes))
+    return xml
+
+def _copy_raw(zin, zout, info):
+    """
+    Copia una parte de `zin` a `zout` con sus bytes comprimidos tal cual. zipfile no lo
+    ofrece: se escribe el encabezado local y se registra la entrada como lo hace
+    ZipFile.writestr, así el directorio central sale bien al cerrar.
+    """
+    src = zin.fp
+    src.seek(info.header_offset)
+    name_len, extra_len = struct.unpack('<HH', src.read(30)[26:30])
+    src.seek(info.header_offset + 30 + name_len + extra_len)
+    out = zipfile.ZipInfo(info.filename, info.date_time)
+    out.compress_type = info.compress_type
+    out.external_attr = info.external_attr
+    out.create_system = info.create_system
+    # Sin descriptor de datos: CRC y tamaños ya se conocen y van en el encabezado
+    out.flag_bits = info.flag_bits & ~0x08
+    out.CRC, out.compress_size, out.file_size = info.CRC, info.compress_size, info.file_size
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.read(min(remaining, 1 << 20))
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
+
+def patch_workbook(path, changes_by_sheet, output=None):
+    """
+    Aplica los cambios de varias hojas ({hoja: {(fila, columna): valor}}, 1-based) en una
+    sola reescritura del zip. Escribe en `output` (por defecto sobre el mismo archivo, vía
+    temporal + os.replace). Devuelve {hoja: celdas escritas}.
+    """
+    output = output or path
+    tmp = f'{output}.tmp{os.getpid()}'
+    with zipfile.ZipFile(path) as zin:
+        parts = _sheet_parts(zin)
+        missing = [name for name in changes_by_sheet if name not in parts]
+        if missing:
+            raise KeyError(f"hojas inexistentes en {path}: {', '.join(missing)}")
+        patched = {parts[name]: changes for name, changes in changes_by_sheet.items() if changes}
+        with zipfile.ZipFile(tmp, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in patched:
+                    zout.writestr(info, patch_sheet_xml(zin.read(info), patched[info.filename]))
+                else:
+                    _copy_raw(zin, zout, info)
+    os.replace(tmp, output)
+    return {name: len(changes) for name, changes in changes_by_sheet.items()}
+
+def patch_sheet(path, sheet_name, changes, output=None):
+    """Como patch_workbook, para una sola hoja. Devuelve la cantidad de celdas escritas."""
+    return patch_workbook(path, {sheet_name: changes}, output)[sheet_name]